@@ -0,0 +1,64 @@
+"""Add generation_jobs
+
+Revision ID: e507dc0e68f8
+Revises: bb4254f3b1a2
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e507dc0e68f8"
+down_revision: Union[str, None] = "bb4254f3b1a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "generation_jobs",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("QUEUED", "RUNNING", "SUCCESS", "FAILED", name="generationjobstatus"),
+            nullable=False,
+        ),
+        sa.Column("params", sa.JSON(), nullable=False),
+        sa.Column("progress", sa.Integer(), nullable=False),
+        sa.Column("route_id", sa.Integer(), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["route_id"],
+            ["routes.id"],
+            name=op.f("fk_generation_jobs_route_id_routes"),
+            ondelete="SET NULL",
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+            name=op.f("fk_generation_jobs_user_id_users"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_generation_jobs")),
+    )
+    op.create_index(op.f("ix_generation_jobs_id"), "generation_jobs", ["id"], unique=False)
+    op.create_index(op.f("ix_generation_jobs_status"), "generation_jobs", ["status"], unique=False)
+    op.create_index(op.f("ix_generation_jobs_user_id"), "generation_jobs", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_generation_jobs_user_id"), table_name="generation_jobs")
+    op.drop_index(op.f("ix_generation_jobs_status"), table_name="generation_jobs")
+    op.drop_index(op.f("ix_generation_jobs_id"), table_name="generation_jobs")
+    op.drop_table("generation_jobs")
+    op.execute("DROP TYPE IF EXISTS generationjobstatus")
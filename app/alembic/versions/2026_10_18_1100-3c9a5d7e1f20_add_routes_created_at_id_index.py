@@ -0,0 +1,29 @@
+"""Add routes (created_at, id) index for keyset pagination
+
+Revision ID: 3c9a5d7e1f20
+Revises: e507dc0e68f8
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9a5d7e1f20"
+down_revision: Union[str, None] = "e507dc0e68f8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_routes_created_at_id", "routes", ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_routes_created_at_id", table_name="routes")
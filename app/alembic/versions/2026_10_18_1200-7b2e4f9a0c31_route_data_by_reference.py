@@ -0,0 +1,46 @@
+"""Store route_data by reference to ai_cache.result
+
+Revision ID: 7b2e4f9a0c31
+Revises: 3c9a5d7e1f20
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7b2e4f9a0c31"
+down_revision: Union[str, None] = "3c9a5d7e1f20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column("routes", "route_data", existing_type=sa.JSON(), nullable=True)
+    # drop copies identical to the cache entry the route was built from
+    op.execute(
+        """
+        UPDATE routes SET route_data = NULL
+        FROM ai_cache
+        WHERE routes.ai_cache_id = ai_cache.id
+          AND routes.route_data::jsonb = ai_cache.result::jsonb
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        UPDATE routes SET route_data = ai_cache.result
+        FROM ai_cache
+        WHERE routes.ai_cache_id = ai_cache.id AND routes.route_data IS NULL
+        """
+    )
+    op.execute("""UPDATE routes SET route_data = '{}' WHERE route_data IS NULL""")
+    op.alter_column("routes", "route_data", existing_type=sa.JSON(), nullable=False)
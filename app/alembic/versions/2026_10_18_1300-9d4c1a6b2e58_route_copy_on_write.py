@@ -0,0 +1,55 @@
+"""Copy-on-write routes: days are written on the first edit
+
+Revision ID: 9d4c1a6b2e58
+Revises: 7b2e4f9a0c31
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4c1a6b2e58"
+down_revision: Union[str, None] = "7b2e4f9a0c31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("routes", sa.Column("materialized", sa.Boolean(), server_default=sa.true(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # write the days of routes that still read them from their plan
+    op.execute(
+        """
+        INSERT INTO route_days (route_id, day_number, description, date)
+        SELECT r.id, (day->>'day_number')::int, day->>'description', (day->>'date')::date
+        FROM routes r
+        JOIN ai_cache c ON c.id = r.ai_cache_id
+        CROSS JOIN LATERAL jsonb_array_elements(COALESCE(r.route_data, c.result)::jsonb->'days') AS day
+        WHERE NOT r.materialized
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO activities (
+            day_id, name, description, start_time, end_time, location, cost, notes, activity_type, external_link
+        )
+        SELECT d.id, a->>'name', a->>'description', a->>'start_time', a->>'end_time', a->>'location',
+               (a->>'cost')::float, a->>'notes', a->>'activity_type', a->>'external_link'
+        FROM routes r
+        JOIN ai_cache c ON c.id = r.ai_cache_id
+        CROSS JOIN LATERAL jsonb_array_elements(COALESCE(r.route_data, c.result)::jsonb->'days') AS day
+        JOIN route_days d ON d.route_id = r.id AND d.day_number = (day->>'day_number')::int
+        CROSS JOIN LATERAL jsonb_array_elements(COALESCE(day->'activities', '[]'::jsonb)) AS a
+        WHERE NOT r.materialized
+        """
+    )
+    op.drop_column("routes", "materialized")
@@ -0,0 +1,121 @@
+"""Precomputed itinerary aggregates on routes and route_days
+
+Revision ID: 5f8e2b7c9d14
+Revises: 9d4c1a6b2e58
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5f8e2b7c9d14"
+down_revision: Union[str, None] = "9d4c1a6b2e58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("route_days", sa.Column("total_cost", sa.Float(), server_default="0", nullable=False))
+    op.add_column("route_days", sa.Column("activity_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("routes", sa.Column("total_cost", sa.Float(), server_default="0", nullable=False))
+    op.add_column("routes", sa.Column("activity_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("routes", sa.Column("activity_types", sa.JSON(), server_default="{}", nullable=False))
+    op.add_column("routes", sa.Column("first_date", sa.Date(), nullable=True))
+    op.add_column("routes", sa.Column("last_date", sa.Date(), nullable=True))
+
+    # materialized routes: from their own days and activities
+    op.execute(
+        """
+        UPDATE route_days d SET total_cost = s.total_cost, activity_count = s.activity_count
+        FROM (
+            SELECT day_id, COALESCE(SUM(cost), 0) AS total_cost, COUNT(*) AS activity_count
+            FROM activities GROUP BY day_id
+        ) s
+        WHERE s.day_id = d.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE routes r
+        SET total_cost = s.total_cost, activity_count = s.activity_count,
+            first_date = s.first_date, last_date = s.last_date
+        FROM (
+            SELECT route_id, SUM(total_cost) AS total_cost, SUM(activity_count) AS activity_count,
+                   MIN(date) AS first_date, MAX(date) AS last_date
+            FROM route_days GROUP BY route_id
+        ) s
+        WHERE s.route_id = r.id AND r.materialized
+        """
+    )
+    op.execute(
+        """
+        UPDATE routes r SET activity_types = s.activity_types::json
+        FROM (
+            SELECT route_id, jsonb_object_agg(activity_type, n) AS activity_types
+            FROM (
+                SELECT d.route_id, a.activity_type, COUNT(*) AS n
+                FROM activities a JOIN route_days d ON d.id = a.day_id
+                WHERE a.activity_type IS NOT NULL
+                GROUP BY d.route_id, a.activity_type
+            ) t
+            GROUP BY route_id
+        ) s
+        WHERE s.route_id = r.id AND r.materialized
+        """
+    )
+
+    # copy-on-write routes: from the plan they read their days from
+    plan = """
+        SELECT r.id AS route_id, day, a
+        FROM routes r
+        JOIN ai_cache c ON c.id = r.ai_cache_id
+        CROSS JOIN LATERAL jsonb_array_elements(COALESCE(r.route_data, c.result)::jsonb->'days') AS day
+        LEFT JOIN LATERAL jsonb_array_elements(COALESCE(day->'activities', '[]'::jsonb)) AS a ON true
+        WHERE NOT r.materialized
+    """
+    op.execute(
+        f"""
+        UPDATE routes r
+        SET total_cost = s.total_cost, activity_count = s.activity_count,
+            first_date = s.first_date, last_date = s.last_date
+        FROM (
+            SELECT route_id, COALESCE(SUM((a->>'cost')::float), 0) AS total_cost, COUNT(a) AS activity_count,
+                   MIN((day->>'date')::date) AS first_date, MAX((day->>'date')::date) AS last_date
+            FROM ({plan}) p GROUP BY route_id
+        ) s
+        WHERE s.route_id = r.id
+        """
+    )
+    op.execute(
+        f"""
+        UPDATE routes r SET activity_types = s.activity_types::json
+        FROM (
+            SELECT route_id, jsonb_object_agg(activity_type, n) AS activity_types
+            FROM (
+                SELECT route_id, a->>'activity_type' AS activity_type, COUNT(*) AS n
+                FROM ({plan}) p
+                WHERE a->>'activity_type' IS NOT NULL
+                GROUP BY route_id, a->>'activity_type'
+            ) t
+            GROUP BY route_id
+        ) s
+        WHERE s.route_id = r.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("routes", "last_date")
+    op.drop_column("routes", "first_date")
+    op.drop_column("routes", "activity_types")
+    op.drop_column("routes", "activity_count")
+    op.drop_column("routes", "total_cost")
+    op.drop_column("route_days", "activity_count")
+    op.drop_column("route_days", "total_cost")
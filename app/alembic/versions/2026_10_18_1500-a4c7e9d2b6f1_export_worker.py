@@ -0,0 +1,43 @@
+"""Export worker: PROCESSING status and updated_at on exports
+
+Revision ID: a4c7e9d2b6f1
+Revises: 5f8e2b7c9d14
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c7e9d2b6f1"
+down_revision: Union[str, None] = "5f8e2b7c9d14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # enum values are stored by name; ADD VALUE can't run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE exportstatus ADD VALUE IF NOT EXISTS 'PROCESSING' AFTER 'QUEUED'")
+    op.add_column(
+        "exports",
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index(op.f("ix_exports_status"), "exports", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_exports_status"), table_name="exports")
+    op.drop_column("exports", "updated_at")
+    # PostgreSQL can't drop an enum value: requeue unfinished exports and recreate the type
+    op.execute("UPDATE exports SET status = 'QUEUED' WHERE status = 'PROCESSING'")
+    op.execute("ALTER TYPE exportstatus RENAME TO exportstatus_old")
+    op.execute("CREATE TYPE exportstatus AS ENUM ('QUEUED', 'SUCCESS', 'FAILED')")
+    op.execute("ALTER TABLE exports ALTER COLUMN status TYPE exportstatus USING status::text::exportstatus")
+    op.execute("DROP TYPE exportstatus_old")
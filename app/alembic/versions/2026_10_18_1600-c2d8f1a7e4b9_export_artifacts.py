@@ -0,0 +1,33 @@
+"""Export artifacts: content_hash and route_version on exports
+
+Revision ID: c2d8f1a7e4b9
+Revises: a4c7e9d2b6f1
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c2d8f1a7e4b9"
+down_revision: Union[str, None] = "a4c7e9d2b6f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("exports", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.add_column("exports", sa.Column("route_version", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f("ix_exports_route_id"), "exports", ["route_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_exports_route_id"), table_name="exports")
+    op.drop_column("exports", "route_version")
+    op.drop_column("exports", "content_hash")
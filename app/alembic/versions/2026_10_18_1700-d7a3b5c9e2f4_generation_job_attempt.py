@@ -0,0 +1,29 @@
+"""Generation jobs: attempt counter of claims
+
+Revision ID: d7a3b5c9e2f4
+Revises: c2d8f1a7e4b9
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d7a3b5c9e2f4"
+down_revision: Union[str, None] = "c2d8f1a7e4b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("generation_jobs", sa.Column("attempt", sa.Integer(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("generation_jobs", "attempt")
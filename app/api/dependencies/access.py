@@ -16,6 +16,10 @@ from exceptions.route_access import RouteAccessNotFoundError
 
 
 async def get_route_access_service(session: AsyncSession = Depends(get_session)) -> RouteAccessService:
+    """
+    One RouteAccessService per request (FastAPI caches dependencies within a request),
+    so require_route_access and the endpoint share its memoized permissions.
+    """
     return RouteAccessService(
         access_repo=RouteAccessRepository(session),
         route_repo=RouteRepository(session),
@@ -7,9 +7,8 @@ from jose import JWTError
 from db.sessions import get_session
 from exceptions.user import UserNotFoundError
 from repositories.user import UserRepository
-from schemas.token import TokenPayload
 from services.crud.user_service import UserService
-from utils.security import decode_access_token
+from utils.security import verify_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -28,8 +27,7 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = TokenPayload(**decode_access_token(token))
-        # sub = payload.get("sub")
+        payload = verify_access_token(token)
         sub = payload.sub
         if sub is None:
             raise credentials_exc
@@ -37,8 +35,10 @@ async def get_current_user(
         raise credentials_exc
 
     try:
-        user = await svc.get_user_by_id(int(sub))
+        user = await svc.get_principal(int(sub))
     except UserNotFoundError:
         raise credentials_exc
+    if not user.is_active:
+        raise credentials_exc
 
     return user
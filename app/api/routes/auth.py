@@ -18,6 +18,7 @@ from exceptions.user import (
     UserAlreadyExistsError,
     InvalidUserDataError,
     AuthenticationError,
+    PasswordHasherBusyError,
 )
 
 logger = logging.getLogger(__name__)
@@ -54,6 +55,8 @@ async def login(
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except PasswordHasherBusyError as e:
+        raise HTTPException(status_code=503, detail=e.message, headers={"Retry-After": "1"})
     except Exception as e:
         logger.warning(str(e))
         raise HTTPException(status_code=500, detail=str(e))
@@ -102,3 +105,5 @@ async def register(
     except InvalidUserDataError as e:
         logger.warning(str(e))
         raise HTTPException(status_code=422, detail=e.message)
+    except PasswordHasherBusyError as e:
+        raise HTTPException(status_code=503, detail=e.message, headers={"Retry-After": "1"})
@@ -0,0 +1,16 @@
+# app/api/routes/internal.py
+
+from fastapi import APIRouter
+
+from utils.metrics import collect_metrics
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Snapshot of in-process metrics (cache tiers, etc.) for monitoring.
+    Not meant to be exposed publicly: restrict /internal/* at the proxy.
+    """
+    return collect_metrics()
@@ -1,25 +1,41 @@
 # app/api/routes/route.py
 
+import json
 import logging
-from typing import List
+import os
+from datetime import date
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from api.dependencies.access import require_route_access
 from constants.roles import RouteRole
-from db.sessions import get_session
+from db.sessions import get_session, get_session_factory
 from api.dependencies import get_current_user
-from schemas.route import RouteRead, RouteShort, RouteGenerateRequest
-from services.crud.route_service import RouteService
-from repositories.route import RouteRepository
-from repositories.user import UserRepository
-from repositories.ai_cache import AICacheRepository
-from repositories import RouteAccessRepository
+from schemas.route import RouteRead, RouteShort, RouteGenerateRequest, RouteDayRead, RouteDayUpdate
+from schemas.route_import import RouteImportReport
+from utils.ndjson import iter_lines
+from utils.streaming import file_stream, gzip_stream
+from utils.route_json import parse_fields, route_response, routes_response
+from services.crud.route_service import RouteService, build_route_service
+from services.crud.route_import_service import RouteImportService
+from repositories.route_import import RouteImportRepository
+from services.crud.generation_job_service import GenerationJobService
+from repositories.generation_job import GenerationJobRepository
+from schemas.generation_job import GenerationJobRead
+from exceptions.generation_job import GenerationJobNotFoundError
+from services.crud.export_service import ExportService
+from repositories.export import ExportRepository
+from schemas.export import ExportRead, ExportRequest
+from exceptions.export import ExportNotFoundError, ExportNotReadyError
 from exceptions.route import (
     RouteAlreadyExistsError,
     RouteNotFoundError,
+    RouteDayNotFoundError,
     InvalidRouteDataError,
+    InvalidCursorError,
     PermissionDeniedError,
 )
 
@@ -29,39 +45,84 @@ router = APIRouter(prefix="/routes", tags=["Routes"])
 
 def get_route_service(session: AsyncSession = Depends(get_session)) -> RouteService:
     """Dependency injection for RouteService."""
-    return RouteService(
-        route_repo=RouteRepository(session),
-        user_repo=UserRepository(session),
-        cache_repo=AICacheRepository(session),
-        access_repo=RouteAccessRepository(session),
-    )
+    return build_route_service(session)
+
+
+def get_route_fields(
+    fields: Optional[str] = Query(
+        None, description="Comma-separated RouteRead fields to return, e.g. id,name,days (default: all)"
+    ),
+) -> Optional[frozenset[str]]:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def get_route_import_service(session: AsyncSession = Depends(get_session)) -> RouteImportService:
+    """Dependency injection for RouteImportService."""
+    return RouteImportService(RouteImportRepository(session))
+
+
+def get_generation_job_service(
+    session: AsyncSession = Depends(get_session),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+) -> GenerationJobService:
+    """Dependency injection for GenerationJobService."""
+    return GenerationJobService(GenerationJobRepository(session), session_factory)
+
+
+def get_export_service(
+    session: AsyncSession = Depends(get_session),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+) -> ExportService:
+    """Dependency injection for ExportService."""
+    return ExportService(ExportRepository(session), session_factory)
 
 
 @router.get("/", response_model=List[RouteShort])
 async def list_routes(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    destination: Optional[str] = None,
+    is_public: Optional[bool] = None,
     current_user=Depends(get_current_user),
     svc: RouteService = Depends(get_route_service),
 ):
     """
-    Get a list of all routes for the current user (short info). No role checking.
+    Get a page of routes the current user has access to (short info), newest first. No role checking.
+    The cursor of the next page is returned in the X-Next-Cursor header (absent on the last page).
     """
-    return await svc.list_routes_for_user(current_user.id)
+    try:
+        routes, next_cursor = await svc.list_routes_for_user(
+            current_user.id, limit=limit, cursor=cursor, destination=destination, is_public=is_public
+        )
+    except InvalidCursorError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=400, detail=e.message)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return routes
 
 
 @router.get("/{id}", response_model=RouteRead)
 async def get_route(
     id: int,
     _=Depends(require_route_access([RouteRole.VIEWER, RouteRole.EDITOR, RouteRole.CREATOR])),
+    fields: Optional[frozenset[str]] = Depends(get_route_fields),
     svc: RouteService = Depends(get_route_service),
 ):
     """
     Get detailed information about a route by ID and check access.
     Role check for VIEWER, EDITOR and CREATOR.
+    The body is rendered by utils.route_json, response_model only documents it.
     Raises:
         RouteNotFoundError: If route does not exist.
     """
     try:
-        return await svc.get_route_by_id(id)
+        with_route_data = fields is None or "route_data" in fields
+        return route_response(await svc.get_route_by_id(id, with_route_data=with_route_data), fields)
     except PermissionDeniedError as e:
         logger.warning(str(e))
         raise HTTPException(status_code=403, detail=e.message)
@@ -74,6 +135,7 @@ async def get_route(
 @router.get("/by_code/{share_code}", response_model=RouteRead)
 async def get_route_by_code(
     share_code: str,
+    fields: Optional[frozenset[str]] = Depends(get_route_fields),
     svc: RouteService = Depends(get_route_service),
 ):
     """
@@ -82,7 +144,8 @@ async def get_route_by_code(
         RouteNotFoundError: If route does not exist.
     """
     try:
-        return await svc.get_route_by_code(share_code)
+        with_route_data = fields is None or "route_data" in fields
+        return route_response(await svc.get_route_by_code(share_code, with_route_data=with_route_data), fields)
     except RouteNotFoundError as e:
         logger.warning(str(e))
         raise HTTPException(status_code=404, detail=e.message)
@@ -92,6 +155,7 @@ async def get_route_by_code(
 async def get_routes_by_owner(
     owner_id: int,
     current_user=Depends(get_current_user),
+    fields: Optional[frozenset[str]] = Depends(get_route_fields),
     svc: RouteService = Depends(get_route_service),
 ):
     """
@@ -102,7 +166,42 @@ async def get_routes_by_owner(
             status_code=403,
             detail="You can view only your own routes.",
         )
-    return await svc.get_route_by_owner(owner_id)
+    with_route_data = fields is None or "route_data" in fields
+    return routes_response(await svc.get_route_by_owner(owner_id, with_route_data=with_route_data), fields)
+
+
+@router.get("/by_owner/{owner_id}/export")
+async def export_routes_by_owner(
+    owner_id: int,
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="ndjson - RouteRead per line, csv - route rows"),
+    current_user=Depends(get_current_user),
+    fields: Optional[frozenset[str]] = Depends(get_route_fields),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+):
+    """
+    Stream all routes owned by the current user, read through a server-side cursor,
+    so memory doesn't grow with the number of routes (unlike GET /routes/by_owner/{owner_id}).
+    `fields` applies to NDJSON. Gzipped on the fly if the client accepts it.
+    """
+    if current_user.id != owner_id:
+        raise HTTPException(
+            status_code=403,
+            detail="You can export only your own routes.",
+        )
+
+    async def body():
+        # the request-scoped session is gone by the time the body is streamed
+        async with session_factory() as session:
+            async for chunk in build_route_service(session).export_routes_by_owner(owner_id, format, fields):
+                yield chunk
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    headers = {"Content-Disposition": f'attachment; filename="routes-{owner_id}.{format}"', "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(gzip_stream(body()), media_type=media_type, headers=headers)
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
 
 
 @router.post(
@@ -131,6 +230,106 @@ async def create_route(
         raise HTTPException(status_code=422, detail=e.message)
 
 
+@router.post("/import", response_model=RouteImportReport)
+async def import_routes(
+    request: Request,
+    current_user=Depends(get_current_user),
+    svc: RouteImportService = Depends(get_route_import_service),
+):
+    """
+    Bulk import of routes from an NDJSON body (application/x-ndjson), one RouteImportRecord per line.
+    The body is read and validated as it arrives and written in chunks; failed lines are listed
+    in the report and don't stop the import. Superusers only, records may belong to anyone.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Only superusers can import routes.")
+    return await svc.import_ndjson(iter_lines(request.stream()))
+
+
+@router.post("/stream")
+async def stream_route(
+    route_in: RouteGenerateRequest,
+    current_user=Depends(get_current_user),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+):
+    """
+    Create a new travel route, streaming its days as NDJSON while the plan is generated:
+    one {"event": "day"} line per day, then {"event": "route"} with the created route,
+    or {"event": "error"} if generation fails after the response has started.
+    """
+    owner_id = current_user.id
+
+    async def lines():
+        # the request-scoped session is gone by the time the body is streamed
+        async with session_factory() as session:
+            try:
+                async for event in build_route_service(session).stream_route(route_in, owner_id=owner_id):
+                    yield json.dumps(event) + "\n"
+            except (RouteAlreadyExistsError, InvalidRouteDataError) as e:
+                logger.warning(str(e))
+                yield json.dumps({"event": "error", "data": {"detail": e.message}}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/jobs",
+    response_model=GenerationJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def enqueue_route_generation(
+    route_in: RouteGenerateRequest,
+    current_user=Depends(get_current_user),
+    svc: GenerationJobService = Depends(get_generation_job_service),
+):
+    """
+    Queue generation of a new travel route and return immediately.
+    Poll GET /routes/jobs/{job_id} or subscribe to GET /routes/jobs/{job_id}/events for the result.
+    """
+    return await svc.enqueue_route(route_in, owner_id=current_user.id)
+
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobRead)
+async def get_generation_job(
+    job_id: int,
+    current_user=Depends(get_current_user),
+    svc: GenerationJobService = Depends(get_generation_job_service),
+):
+    """
+    Get status of a route generation job.
+    Raises:
+        GenerationJobNotFoundError: If job does not exist or belongs to another user.
+    """
+    try:
+        return await svc.get_job(job_id, current_user.id)
+    except GenerationJobNotFoundError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=404, detail=e.message)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_generation_job(
+    job_id: int,
+    current_user=Depends(get_current_user),
+    svc: GenerationJobService = Depends(get_generation_job_service),
+):
+    """
+    Server-sent events with job progress and the final RouteRead.
+    Raises:
+        GenerationJobNotFoundError: If job does not exist or belongs to another user.
+    """
+    try:
+        await svc.get_job(job_id, current_user.id)
+    except GenerationJobNotFoundError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=404, detail=e.message)
+    return StreamingResponse(
+        svc.stream_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.put("/{id}", response_model=RouteShort)
 async def rebuild_route(
     id: int,
@@ -163,6 +362,153 @@ async def rebuild_route(
         raise HTTPException(status_code=422, detail=e.message)
 
 
+@router.put("/{id}/days/{day_number}", response_model=RouteDayRead)
+async def update_route_day(
+    id: int,
+    day_number: int,
+    day_in: RouteDayUpdate,
+    current_user=Depends(get_current_user),
+    _=Depends(require_route_access([RouteRole.CREATOR, RouteRole.EDITOR])),
+    svc: RouteService = Depends(get_route_service),
+):
+    """
+    Replace date, description and activities of one day of a route.
+    The first edit of a route created from a cached plan gives it its own copy of the days.
+    Role check for CREATOR and EDITOR.
+    Raises:
+        RouteNotFoundError: If route does not exist.
+        RouteDayNotFoundError: If the route has no such day.
+    """
+    try:
+        return await svc.update_day(id, day_number, day_in, editor_id=current_user.id)
+    except PermissionDeniedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=403, detail=e.message)
+    except (RouteNotFoundError, RouteDayNotFoundError) as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=404, detail=e.message)
+
+
+@router.get("/{id}/calendar.ics")
+async def export_route_calendar(
+    id: int,
+    request: Request,
+    start: Optional[date] = Query(None, description="date of day 1 for days without a date (default: today)"),
+    _=Depends(require_route_access([RouteRole.CREATOR, RouteRole.EDITOR, RouteRole.VIEWER])),
+    svc: RouteService = Depends(get_route_service),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+):
+    """
+    Stream the route as an iCalendar file, one event per activity, read through a server-side
+    cursor so memory doesn't grow with the length of the itinerary.
+    Gzipped on the fly if the client accepts it.
+    Role check for CREATOR, EDITOR and VIEWER.
+    Raises:
+        RouteNotFoundError: If route does not exist.
+    """
+    try:
+        await svc.get_route_by_id(id, load="bare")
+    except RouteNotFoundError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=404, detail=e.message)
+
+    async def body():
+        # the request-scoped session is gone by the time the body is streamed
+        async with session_factory() as session:
+            async for chunk in build_route_service(session).export_route_calendar(id, start):
+                yield chunk
+
+    media_type = "text/calendar; charset=utf-8"
+    headers = {"Content-Disposition": f'attachment; filename="route-{id}.ics"', "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(gzip_stream(body()), media_type=media_type, headers=headers)
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
+
+
+@router.post(
+    "/{id}/exports",
+    response_model=ExportRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def enqueue_route_export(
+    id: int,
+    export_in: ExportRequest,
+    current_user=Depends(get_current_user),
+    _=Depends(require_route_access([RouteRole.CREATOR, RouteRole.EDITOR, RouteRole.VIEWER])),
+    svc: ExportService = Depends(get_export_service),
+):
+    """
+    Queue an export of the route and return immediately.
+    Poll GET /routes/{id}/exports/{export_id}; a PDF is downloaded from .../file once it succeeded.
+    Role check for CREATOR, EDITOR and VIEWER.
+    """
+    return await svc.enqueue_export(id, current_user.id, export_in.export_type)
+
+
+@router.get("/{id}/exports", response_model=List[ExportRead])
+async def list_route_exports(
+    id: int,
+    _=Depends(require_route_access([RouteRole.CREATOR, RouteRole.EDITOR, RouteRole.VIEWER])),
+    svc: ExportService = Depends(get_export_service),
+):
+    """
+    List exports of the route, newest first.
+    Role check for CREATOR, EDITOR and VIEWER.
+    """
+    return await svc.list_exports(id)
+
+
+@router.get("/{id}/exports/{export_id}", response_model=ExportRead)
+async def get_route_export(
+    id: int,
+    export_id: int,
+    _=Depends(require_route_access([RouteRole.CREATOR, RouteRole.EDITOR, RouteRole.VIEWER])),
+    svc: ExportService = Depends(get_export_service),
+):
+    """
+    Get status of an export of the route.
+    Role check for CREATOR, EDITOR and VIEWER.
+    Raises:
+        ExportNotFoundError: If export does not exist or belongs to another route.
+    """
+    try:
+        return await svc.get_export(id, export_id)
+    except ExportNotFoundError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=404, detail=e.message)
+
+
+@router.get("/{id}/exports/{export_id}/file")
+async def download_route_export(
+    id: int,
+    export_id: int,
+    _=Depends(require_route_access([RouteRole.CREATOR, RouteRole.EDITOR, RouteRole.VIEWER])),
+    svc: ExportService = Depends(get_export_service),
+):
+    """
+    Download the rendered PDF of an export.
+    Role check for CREATOR, EDITOR and VIEWER.
+    Raises:
+        ExportNotFoundError: If export does not exist or belongs to another route.
+        ExportNotReadyError: If export has not been rendered (yet), or its file was evicted
+            from the artifact store - then it is rendered again and can be downloaded once done.
+    """
+    try:
+        file = await svc.open_export_file(id, export_id)
+    except ExportNotFoundError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=404, detail=e.message)
+    except ExportNotReadyError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=409, detail=e.message)
+    headers = {
+        "Content-Disposition": f'attachment; filename="route-{id}-{export_id}.pdf"',
+        "Content-Length": str(os.fstat(file.fileno()).st_size),
+    }
+    return StreamingResponse(file_stream(file), media_type="application/pdf", headers=headers)
+
+
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_route(
     id: int,
@@ -1,29 +1,19 @@
 # app/api/routes/route_access.py
 
 from fastapi import APIRouter, Depends, HTTPException, Body
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from constants.roles import RouteRole
-from db.sessions import get_session
 from schemas.route_access import RouteAccessRead
 from schemas.user import UserRead
 from services.crud.route_access_service import RouteAccessService
-from repositories.route_access import RouteAccessRepository
-from repositories.route import RouteRepository
 from api.dependencies import get_current_user
+from api.dependencies.access import get_route_access_service
 from exceptions.route import RouteNotFoundError, PermissionDeniedError
 from exceptions.route_access import RouteAccessAlreadyExistsError, RouteAccessNotFoundError
 
 router = APIRouter(prefix="/route-access", tags=["Route Access"])
 
 
-def get_route_access_service(session: AsyncSession = Depends(get_session)) -> RouteAccessService:
-    return RouteAccessService(
-        access_repo=RouteAccessRepository(session),
-        route_repo=RouteRepository(session),
-    )
-
-
 @router.get("/{route_id}/get-share-code")
 async def get_share_code(
     route_id: int,
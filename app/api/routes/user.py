@@ -6,6 +6,7 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.dependencies import get_current_user
 from db.sessions import get_session
 from schemas.user import UserCreate, UserRead, UserShort
 from services.crud.user_service import UserService
@@ -88,3 +89,23 @@ async def delete_user(
     except UserNotFoundError as e:
         logger.warning(str(e))
         raise HTTPException(status_code=404, detail=e.message)
+
+
+@router.post("/{user_id}/deactivate", response_model=UserRead)
+async def deactivate_user(
+    user_id: int,
+    svc: UserService = Depends(get_user_service),
+    current_user=Depends(get_current_user),
+):
+    """
+    Deactivate a user: their tokens are rejected from now on. Superusers only.
+    Raises:
+        UserNotFoundError: If user not found.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Only superusers can deactivate users.")
+    try:
+        return await svc.set_active(user_id, False)
+    except UserNotFoundError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=404, detail=e.message)
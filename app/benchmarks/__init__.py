@@ -0,0 +1,10 @@
+# app/benchmarks/__init__.py
+
+"""
+Micro-benchmarks. Run from the app directory, e.g.:
+
+    python -m benchmarks.bench_create_route
+
+By default every benchmark uses an in-memory SQLite database;
+set BENCH_DATABASE_URL to run against PostgreSQL.
+"""
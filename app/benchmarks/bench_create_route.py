@@ -0,0 +1,76 @@
+# app/benchmarks/bench_create_route.py
+
+"""
+Per-request latency of route persistence:
+the old per-day commit path vs RouteRepository.create_with_days,
+and a copy-on-write route that shares a cached plan (a single-row insert).
+"""
+
+import asyncio
+
+from benchmarks.common import Timer, bench_database, create_bench_user, make_plan
+from constants.roles import RouteRole
+from repositories import RouteAccessRepository, RouteRepository
+from schemas.route import RouteCreate, RouteDayCreate
+from schemas.route_access import RouteAccessCreate
+from utils.utils import generate_nanoid_code
+
+ITERATIONS = 50
+
+
+def build_route_create(plan: dict, owner_id: int) -> RouteCreate:
+    return RouteCreate(
+        name=plan["name"],
+        origin="Bench",
+        destination="Bench",
+        duration_days=len(plan["days"]),
+        budget=1000.0,
+        route_data=plan,
+        days=[RouteDayCreate(**day) for day in plan["days"]],
+        share_code=generate_nanoid_code(),
+        owner_id=owner_id,
+    )
+
+
+async def legacy_create(session, data: RouteCreate):
+    route_repo = RouteRepository(session)
+    access_repo = RouteAccessRepository(session)
+    route = await route_repo.create(data, commit=True)
+    for day in data.days:
+        await route_repo.create_day(route.id, day, commit=True)
+    await access_repo.create(RouteAccessCreate(user_id=data.owner_id, route_id=route.id, role=RouteRole.CREATOR))
+    return await route_repo.get(route.id)
+
+
+async def batched_create(session, data: RouteCreate):
+    return await RouteRepository(session).create_with_days(data, creator_id=data.owner_id, commit=True)
+
+
+async def copy_on_write_create(session, data: RouteCreate):
+    data = data.model_copy(update={"route_data": None, "materialized": False})
+    return await RouteRepository(session).create_with_days(data, creator_id=data.owner_id, commit=True)
+
+
+async def main():
+    async with bench_database() as session_factory:
+        async with session_factory() as session:
+            owner = await create_bench_user(session)
+
+        for days in (3, 14, 30):
+            plan = make_plan(days)
+            for label, create in (
+                ("per-day commits", legacy_create),
+                ("single transaction", batched_create),
+                ("copy-on-write", copy_on_write_create),
+            ):
+                timer = Timer(f"{days:>2} days / {label}")
+                for _ in range(ITERATIONS):
+                    data = build_route_create(plan, owner.id)
+                    async with session_factory() as session:
+                        async with timer.measure():
+                            await create(session, data)
+                timer.report()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
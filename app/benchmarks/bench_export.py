@@ -0,0 +1,113 @@
+# app/benchmarks/bench_export.py
+
+"""
+PDF export throughput in exports/minute with N export workers (and as many
+render processes), against rendering on the event loop; the longest event loop
+stall seen by a probe task shows what the process pool keeps off the API loop.
+Every route is different, so each export renders; a last round exports the same
+unchanged routes again and is served from the artifact store.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+# concurrent workers need separate connections: the default in-memory SQLite database is a single
+# shared connection, where one session's rollback undoes another's claim
+os.environ.setdefault("BENCH_DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.gettempdir()}/bench_export.db")
+
+from benchmarks.common import bench_database, create_bench_user, make_plan
+from benchmarks.bench_create_route import build_route_create
+from models.export import ExportType
+from repositories import ExportRepository, RouteRepository
+from services.export_worker import ExportWorkerPool
+from utils.artifacts import ArtifactStore
+from utils.pdf import render_route_pdf
+
+EXPORTS = 48
+DAYS = 90
+ACTIVITIES_PER_DAY = 6
+PROBE_INTERVAL = 0.01
+
+
+class InlineExportWorkerPool(ExportWorkerPool):
+    """Layout right on the event loop, as a handler rendering the PDF itself would."""
+
+    async def _render_pdf(self, data: dict, file_path: str) -> None:
+        render_route_pdf(data, file_path)
+
+
+def make_pool(pool_class, workers: int, directory: str) -> ExportWorkerPool:
+    artifacts = ArtifactStore(directory, suffix=".pdf", max_bytes=0, max_age=0)
+    return pool_class(workers, workers, poll_interval=60, stale_after=600, artifacts=artifacts)
+
+
+async def run(session_factory, route_ids: list[int], owner_id: int, pool: ExportWorkerPool, label: str) -> None:
+    async with session_factory() as session:
+        repo = ExportRepository(session)
+        exports = [await repo.create(route_id, owner_id, ExportType.PDF) for route_id in route_ids]
+
+    stall = 0.0
+
+    async def probe(done: asyncio.Event):
+        nonlocal stall
+        loop = asyncio.get_running_loop()
+        while not done.is_set():
+            due = loop.time() + PROBE_INTERVAL
+            await asyncio.sleep(PROBE_INTERVAL)
+            stall = max(stall, loop.time() - due)
+
+    # spawn the render processes outside the measurement
+    if not isinstance(pool, InlineExportWorkerPool):
+        loop = asyncio.get_running_loop()
+        warmup = [loop.run_in_executor(pool._render_pool(), time.sleep, 0.1) for _ in range(pool.processes)]
+        await asyncio.gather(*warmup)
+
+    done = asyncio.Event()
+    probing = asyncio.create_task(probe(done))
+    started = time.perf_counter()
+    pool.start(session_factory)
+    for export in exports:
+        pool.submit(export.id)
+    await pool.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probing
+    await pool.stop()
+    print(
+        f"{label:<40} {pool.completed:>3} exports in {elapsed:6.2f}s = {pool.completed * 60 / elapsed:8.1f}/min, "
+        f"longest loop stall {stall * 1000:7.1f}ms, artifact hit rate {pool.artifacts.stats()['hit_rate']:.0%}"
+    )
+    assert pool.completed == EXPORTS and not pool.failed
+
+
+async def main():
+    plan = make_plan(DAYS, ACTIVITIES_PER_DAY)
+    route = {"name": plan["name"], "origin": "Bench", "destination": "Bench", "days": plan["days"]}
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory:
+        render_route_pdf(route, f"{directory}/probe.pdf")
+    print(f"one {DAYS}-day PDF renders in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    async with bench_database() as session_factory:
+        async with session_factory() as session:
+            owner = await create_bench_user(session)
+            repo = RouteRepository(session)
+            route_ids = []
+            for n in range(EXPORTS):
+                data = build_route_create({**plan, "name": f"{plan['name']} #{n}"}, owner.id)
+                route_ids.append((await repo.create_with_days(data, creator_id=owner.id, commit=True)).id)
+
+        with tempfile.TemporaryDirectory() as directory:
+            pool = make_pool(InlineExportWorkerPool, 1, f"{directory}/inline")
+            await run(session_factory, route_ids, owner.id, pool, "inline render, 1 worker")
+            for workers in (1, 2, 4):
+                pool = make_pool(ExportWorkerPool, workers, f"{directory}/{workers}")
+                await run(session_factory, route_ids, owner.id, pool, f"process pool, {workers} workers")
+            pool = make_pool(ExportWorkerPool, 4, f"{directory}/4")
+            await run(session_factory, route_ids, owner.id, pool, "unchanged routes again, 4 workers")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+# app/benchmarks/bench_ical.py
+
+"""
+iCalendar export of a 365-day route with thousands of activities: streamed from
+a server-side cursor (RouteService.export_route_calendar) vs building the whole
+calendar from the fully loaded route graph. Reports time to the first chunk,
+total time and peak Python memory (tracemalloc) of each.
+"""
+
+import asyncio
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta, timezone
+
+from benchmarks.common import bench_database, create_bench_user, make_plan
+from benchmarks.bench_create_route import build_route_create
+from repositories import RouteRepository
+from services.crud.route_service import build_route_service
+from utils.ical import CALENDAR_FOOTER, calendar_header, format_stamp, vevent
+from utils.route_json import route_to_dict
+
+DAYS = 365
+ACTIVITIES_PER_DAY = 10
+
+
+async def in_memory(session, route_id: int) -> bytes:
+    """The whole itinerary loaded and the calendar built as one string."""
+    route = route_to_dict(await RouteRepository(session).get(route_id, load="summary"), frozenset({"name", "days"}))
+    stamp, start = format_stamp(datetime.now(timezone.utc)), date.today()
+    events = []
+    for day in route["days"]:
+        day_date = day["date"] or start + timedelta(days=day["day_number"] - 1)
+        events.extend(vevent(f"activity-{a['id']}@route-{route_id}", day_date, a, stamp) for a in day["activities"])
+    return (calendar_header(route["name"]) + "".join(events) + CALENDAR_FOOTER).encode()
+
+
+async def streamed(session, route_id: int):
+    async for chunk in build_route_service(session).export_route_calendar(route_id):
+        yield chunk
+
+
+async def measure(label: str, session_factory, chunks) -> None:
+    async with session_factory() as session:
+        tracemalloc.start()
+        started = time.perf_counter()
+        first, size, events = None, 0, 0
+        try:
+            async for chunk in chunks(session):
+                first = first or time.perf_counter() - started
+                size += len(chunk)
+                events += chunk.count(b"BEGIN:VEVENT")
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    print(
+        f"{label:<40} {events} events, {size / 1024:7.0f} KiB: first chunk {first * 1000:7.1f}ms, "
+        f"total {elapsed * 1000:7.1f}ms, peak memory {peak / 1024:7.0f} KiB"
+    )
+
+
+async def main():
+    plan = make_plan(DAYS, ACTIVITIES_PER_DAY)
+    async with bench_database() as session_factory:
+        async with session_factory() as session:
+            owner = await create_bench_user(session)
+            repo = RouteRepository(session)
+            materialized = await repo.create_with_days(build_route_create(plan, owner.id), owner.id, commit=True)
+            data = build_route_create(plan, owner.id).model_copy(update={"materialized": False})
+            shared = await repo.create_with_days(data, owner.id, commit=True)
+
+        async def whole(session):
+            yield await in_memory(session, materialized.id)
+
+        for route, kind in ((materialized, "materialized"), (shared, "shared plan")):
+            await measure(f"{kind} / streamed", session_factory, lambda session: streamed(session, route.id))
+        await measure("materialized / built in memory", session_factory, whole)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+# app/benchmarks/bench_import.py
+
+"""
+Throughput of ingesting partner itineraries, in rows/sec (routes + days + activities + access):
+one create_with_days commit per route vs the chunked bulk import.
+Set BENCH_DATABASE_URL=postgresql+asyncpg://... to measure the COPY path.
+"""
+
+import asyncio
+import json
+import time
+
+from benchmarks.common import bench_database, create_bench_user, make_plan
+from repositories import RouteImportRepository, RouteRepository
+from schemas.route_import import RouteImportRecord
+from services.crud.route_import_service import RouteImportService
+from utils.ndjson import aiter_sync
+
+ROUTES = 2000
+DAYS = 5
+
+
+def build_lines(owner_id: int, prefix: str) -> list[str]:
+    plan = make_plan(DAYS)
+    return [
+        json.dumps(
+            {
+                "name": plan["name"],
+                "origin": "Bench",
+                "destination": "Bench",
+                "duration_days": DAYS,
+                "budget": 1000.0,
+                "days": plan["days"],
+                "share_code": f"{prefix}-{n}",
+                "owner_id": owner_id,
+            }
+        )
+        for n in range(ROUTES)
+    ]
+
+
+def report(label: str, rows: int, elapsed: float) -> None:
+    print(f"{label:<40} rows={rows:<8} {elapsed:7.2f}s {rows / elapsed:10.0f} rows/s")
+
+
+async def main():
+    async with bench_database() as session_factory:
+        async with session_factory() as session:
+            owner = await create_bench_user(session)
+        rows_per_route = 1 + DAYS + DAYS * len(make_plan(DAYS)["days"][0]["activities"]) + 1
+
+        lines = build_lines(owner.id, "single")
+        started = time.perf_counter()
+        async with session_factory() as session:
+            repo = RouteRepository(session)
+            for line in lines:
+                record = RouteImportRecord.model_validate_json(line)
+                await repo.create_with_days(record, creator_id=record.owner_id, commit=True)
+                session.expunge_all()
+        report("create_with_days per route", ROUTES * rows_per_route, time.perf_counter() - started)
+
+        for chunk_size in (100, 1000):
+            lines = build_lines(owner.id, f"bulk{chunk_size}")
+            started = time.perf_counter()
+            async with session_factory() as session:
+                svc = RouteImportService(RouteImportRepository(session), chunk_size=chunk_size)
+                result = await svc.import_ndjson(aiter_sync(lines))
+            assert result.failed == 0, result.errors
+            report(f"bulk import (chunks of {chunk_size})", result.rows, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+# app/benchmarks/bench_jwt.py
+
+"""
+Access-token verification throughput on one core: python-jose vs the lean HMAC
+backend, each with and without the verified-token cache (TokenPayload included).
+"""
+
+import time
+
+import benchmarks.common  # noqa: F401 - sets the required settings
+from schemas.token import TokenPayload
+from utils.config import settings
+from utils.security import JWT_BACKENDS, verified_tokens, verify_access_token
+import utils.security as security_mod
+
+TOKENS = 1000
+ROUNDS = 20
+
+
+def throughput(label: str, verify, tokens: list[str]) -> None:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for token in tokens:
+            verify(token)
+    per_token = (time.perf_counter() - started) / (ROUNDS * len(tokens))
+    print(f"{label:<40} {per_token * 1e6:8.2f}us/token {1 / per_token:>12,.0f} tokens/s")
+
+
+def main():
+    exp = int(time.time()) + 3600
+    for name, backend_cls in JWT_BACKENDS.items():
+        backend = backend_cls(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+        tokens = [backend.encode({"sub": str(n), "telegram": False, "exp": exp}) for n in range(TOKENS)]
+        throughput(f"{name} / decode + TokenPayload", lambda t: TokenPayload(**backend.decode(t)), tokens)
+
+        security_mod.jwt_backend = backend
+        verified_tokens.clear()
+        for token in tokens:
+            verify_access_token(token)
+        throughput(f"{name} / cached verify", verify_access_token, tokens)
+
+
+if __name__ == "__main__":
+    main()
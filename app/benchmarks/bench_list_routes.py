@@ -0,0 +1,91 @@
+# app/benchmarks/bench_list_routes.py
+
+"""
+Listing routes of a user with 10k accessible routes:
+the old "all ids + IN list + full ORM entities" path vs keyset pages of RouteShort columns.
+"""
+
+import asyncio
+
+from sqlalchemy import insert, select
+
+from benchmarks.common import Timer, bench_database, create_bench_user, make_plan
+from constants.roles import RouteRole
+from models import Route, RouteAccess
+from repositories import RouteAccessRepository, RouteRepository
+from schemas.route import RouteShort
+from services.crud.route_service import build_route_service
+from utils.utils import generate_nanoid_code
+
+ROUTES = 10_000
+ITERATIONS = 10
+
+
+async def seed_routes(session, owner_id: int) -> None:
+    plan = make_plan(3)
+    await session.execute(
+        insert(Route),
+        [
+            {
+                "name": f"Route {n}",
+                "share_code": generate_nanoid_code(),
+                "origin": "Bench",
+                "destination": "Paris" if n % 10 == 0 else "Rome",
+                "duration_days": 3,
+                "budget": 1000.0,
+                "interests": ["food"],
+                "route_data": plan,
+                "is_public": n % 2 == 0,
+                "owner_id": owner_id,
+            }
+            for n in range(ROUTES)
+        ],
+    )
+    route_ids = (await session.execute(select(Route.id))).scalars().all()
+    await session.execute(
+        insert(RouteAccess),
+        [{"user_id": owner_id, "route_id": route_id, "role": RouteRole.CREATOR} for route_id in route_ids],
+    )
+    await session.commit()
+
+
+async def legacy_list(session, user_id: int):
+    ids = await RouteAccessRepository(session).get_route_ids_by_user(user_id)
+    routes = await RouteRepository(session).get_all_by_ids(ids)
+    return [RouteShort.model_validate(route) for route in routes]
+
+
+async def main():
+    async with bench_database() as session_factory:
+        async with session_factory() as session:
+            owner = await create_bench_user(session)
+            await seed_routes(session, owner.id)
+
+        legacy = Timer(f"{ROUTES} routes / all at once (legacy)")
+        first_page = Timer("first page of 50")
+        filtered = Timer("first page of 50, destination=paris")
+        all_pages = Timer("all pages of 200")
+        for _ in range(ITERATIONS):
+            async with session_factory() as session:
+                async with legacy.measure():
+                    await legacy_list(session, owner.id)
+            async with session_factory() as session:
+                svc = build_route_service(session)
+                async with first_page.measure():
+                    await svc.list_routes_for_user(owner.id, limit=50)
+                async with filtered.measure():
+                    await svc.list_routes_for_user(owner.id, limit=50, destination="paris")
+                async with all_pages.measure():
+                    cursor, total = None, 0
+                    while True:
+                        page, cursor = await svc.list_routes_for_user(owner.id, limit=200, cursor=cursor)
+                        total += len(page)
+                        if cursor is None:
+                            break
+                    assert total == ROUTES
+        for timer in (legacy, first_page, filtered, all_pages):
+            timer.report()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
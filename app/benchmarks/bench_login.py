@@ -0,0 +1,86 @@
+# app/benchmarks/bench_login.py
+
+"""
+Latency of an unrelated endpoint during a login storm: bcrypt on the event loop
+vs the bounded password hasher pool.
+"""
+
+import asyncio
+
+import httpx
+
+from benchmarks.common import Timer, bench_database
+import services.crud.user_service as user_service_mod
+from db.sessions import get_session
+from main import app
+from schemas.user import UserCreate
+from services.crud.user_service import UserService
+from repositories.user import UserRepository
+from utils.config import settings
+from utils.security import PasswordHasher, pwd_context
+
+LOGINS = 40
+PROBE_INTERVAL = 0.05
+
+
+class InlineHasher(PasswordHasher):
+    """The old behaviour: bcrypt runs right in the request handler."""
+
+    async def _run(self, fn, *args):
+        return fn(*args)
+
+
+async def storm(client: httpx.AsyncClient, hasher: PasswordHasher, label: str) -> None:
+    user_service_mod.password_hasher = hasher
+    login_timer = Timer(f"{label} / login")
+    # a client hitting GET / every PROBE_INTERVAL: time from when it wants to send until the response
+    probe_timer = Timer(f"{label} / GET / during logins")
+    form = {"username": "bench@example.com", "password": "secret"}
+
+    async def login():
+        async with login_timer.measure():
+            resp = await client.post("/auth/login", data=form)
+        assert resp.status_code in (200, 503), resp.text
+
+    async def probe(done: asyncio.Event):
+        loop = asyncio.get_running_loop()
+        while not done.is_set():
+            due = loop.time() + PROBE_INTERVAL
+            await asyncio.sleep(PROBE_INTERVAL)
+            await client.get("/")
+            probe_timer.samples.append(loop.time() - due)
+
+    async def logins(done: asyncio.Event):
+        await asyncio.sleep(PROBE_INTERVAL)
+        await asyncio.gather(*(login() for _ in range(LOGINS)))
+        done.set()
+
+    done = asyncio.Event()
+    await asyncio.gather(probe(done), logins(done))
+    login_timer.report()
+    probe_timer.report()
+    hasher.shutdown()
+
+
+async def main():
+    async with bench_database() as session_factory:
+
+        async def bench_session():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_session] = bench_session
+        async with session_factory() as session:
+            await UserService(UserRepository(session)).register(UserCreate(email="bench@example.com", password="secret"))
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await storm(client, InlineHasher(pwd_context, 1, 0, rehash=False), "inline bcrypt")
+            pool = PasswordHasher(pwd_context, settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE)
+            await storm(client, pool, f"pool ({pool.workers} workers)")
+            print(f"{'pool stats':<40} {pool.stats()}")
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+# app/benchmarks/bench_route_json.py
+
+"""
+Rendering GET /routes/{id} bodies: the response_model path (RouteRead validated
+from ORM attributes, dumped and encoded by JSONResponse) vs utils.route_json.
+"""
+
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+
+from benchmarks.common import make_plan
+from constants.roles import RouteRole
+from models import Activity, Export, ExportType, Route, RouteAccess, RouteDay
+from models.export import ExportStatus
+from schemas.route import RouteRead
+from utils.route_json import route_response
+
+ACTIVITIES_PER_DAY = 5
+
+
+def build_route(days: int) -> Route:
+    """Detached ORM graph shaped like a route loaded with the "full" profile."""
+    now = datetime.now()
+    plan = make_plan(days, ACTIVITIES_PER_DAY)
+    ids = iter(range(1, 1_000_000))
+    return Route(
+        id=1,
+        name=plan["name"],
+        owner_id=1,
+        share_code="bench",
+        origin="Paris",
+        destination="Rome",
+        duration_days=days,
+        budget=1000.0,
+        interests=["food", "museums"],
+        route_data=plan,
+        ai_cache_id=None,
+        last_edited_by=None,
+        is_public=False,
+        created_at=now,
+        updated_at=now,
+        days=[
+            RouteDay(
+                id=next(ids),
+                day_number=day["day_number"],
+                date=None,
+                description=day["description"],
+                activities=[
+                    Activity(id=next(ids), notes=None, external_link=None, **activity) for activity in day["activities"]
+                ],
+            )
+            for day in plan["days"]
+        ],
+        access_list=[RouteAccess(user_id=1, route_id=1, role=RouteRole.CREATOR)],
+        exports=[
+            Export(
+                id=1,
+                route_id=1,
+                user_id=1,
+                export_type=ExportType.PDF,
+                status=ExportStatus.QUEUED,
+                file_path=None,
+                external_id=None,
+                error_message=None,
+                created_at=now,
+            )
+        ],
+    )
+
+
+def per_call(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    for days in (1, 7, 30, 90):
+        route = build_route(days)
+        iterations = max(20, 2000 // days)
+        baseline = per_call(lambda: JSONResponse(RouteRead.model_validate(route).model_dump(mode="json")), iterations)
+        fast = per_call(lambda: route_response(route), iterations)
+        print(
+            f"{days:>2} days ({days * ACTIVITIES_PER_DAY:>3} activities)   response_model {baseline * 1000:7.3f}ms   "
+            f"route_json {fast * 1000:7.3f}ms   x{baseline / fast:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
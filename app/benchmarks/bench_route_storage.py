@@ -0,0 +1,66 @@
+# app/benchmarks/bench_route_storage.py
+
+"""
+Storage and response size of routes built from one cached plan:
+route_data copied into every route ("inline") vs referencing AICache.result ("reference"),
+and GET /routes/{id} bodies with and without route_data (?fields=...).
+"""
+
+import asyncio
+
+from sqlalchemy import String, cast, func, select
+
+from benchmarks.common import bench_database, create_bench_user, make_plan
+from models import Route
+from repositories import AICacheRepository, RouteRepository
+from schemas.ai_cache import AICacheCreate
+from schemas.route import RouteGenerateRequest
+from services.crud.route_service import build_route_service
+from utils.cache_keys import build_cache_key
+from utils.config import settings
+from utils.route_json import ROUTE_READ_FIELDS, route_response
+
+ROUTES = 200
+
+
+async def main():
+    for days in (7, 30):
+        for storage in ("inline", "reference"):
+            settings.ROUTE_DATA_STORAGE = storage
+            async with bench_database() as session_factory:
+                async with session_factory() as session:
+                    owner = await create_bench_user(session)
+                    await AICacheRepository(session).create(
+                        AICacheCreate(
+                            cache_key=build_cache_key("Bench", "Rome", days, 1000.0),
+                            origin="Bench",
+                            destination="Rome",
+                            duration_days=days,
+                            budget=1000.0,
+                            interests=[],
+                            original_prompt="bench",
+                            prompt_hash="bench",
+                            result=make_plan(days),
+                        )
+                    )
+                payload = RouteGenerateRequest(origin="Bench", destination="Rome", duration_days=days, budget=1000.0)
+                for _ in range(ROUTES):
+                    async with session_factory() as session:
+                        route_id = (await build_route_service(session).create_route(payload, owner.id)).id
+
+                async with session_factory() as session:
+                    stored = await session.scalar(select(func.sum(func.length(cast(Route.route_data, String)))))
+                    svc = build_route_service(session)
+                    full = len(route_response(await svc.get_route_by_id(route_id)).body)
+                    session.expunge_all()
+                    fields = ROUTE_READ_FIELDS - {"route_data"}
+                    route = await RouteRepository(session).get(route_id)
+                    without = len(route_response(route, fields).body)
+                print(
+                    f"{days:>2} days / {storage:<9}  route_data in {ROUTES} routes: {(stored or 0) / 1024:8.1f} KiB   "
+                    f"GET body: {full / 1024:6.1f} KiB, without route_data: {without / 1024:6.1f} KiB"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+# app/benchmarks/bench_stream_route.py
+
+"""
+Time to first day vs time to the whole plan when the completion is streamed
+from a local fake LLM server (real HTTP, simulated generation speed).
+"""
+
+import asyncio
+import json
+import os
+
+import uvicorn
+
+from benchmarks.common import Timer, make_plan
+from fixtures.fake_llm import chunk_text, create_fake_llm_app
+from services.ai_service import AIService
+
+ITERATIONS = 5
+# seconds per ~4 character delta, roughly 100 tokens/s
+CHUNK_DELAY = float(os.getenv("BENCH_CHUNK_DELAY", "0.01"))
+PORT = int(os.getenv("BENCH_FAKE_LLM_PORT", "8765"))
+
+
+async def main():
+    for days in (3, 7, 14):
+        fake = create_fake_llm_app(chunk_text(json.dumps(make_plan(days, activities_per_day=3))), delay=CHUNK_DELAY)
+        server = uvicorn.Server(uvicorn.Config(fake, host="127.0.0.1", port=PORT, log_level="warning"))
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+
+        ai = AIService(api_key="bench", base_url=f"http://127.0.0.1:{PORT}", model="fake")
+        first_day = Timer(f"{days:>2} days / first day")
+        whole_plan = Timer(f"{days:>2} days / whole plan")
+        for _ in range(ITERATIONS):
+            async with whole_plan.measure():
+                async with first_day.measure():
+                    stream = ai.stream_route("bench")
+                    await anext(stream)
+                async for _ in stream:
+                    pass
+        first_day.report()
+        whole_plan.report()
+
+        await ai.aclose()
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+# app/benchmarks/common.py
+
+import os
+import statistics
+import time
+from contextlib import asynccontextmanager
+
+# benchmarks don't need real credentials, but Settings requires them
+os.environ.setdefault("POSTGRES_USER", "admin")
+os.environ.setdefault("POSTGRES_PASSWORD", "password")
+os.environ.setdefault("POSTGRES_DB", "travel_ai_db")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("TELEGRAM_TOKEN", "bench_telegram_token")
+os.environ.setdefault("CHATGPT_API_KEY", "bench_chatgpt_key")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from db.base import Base
+from models import User
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+
+@asynccontextmanager
+async def bench_database():
+    """
+    Create a fresh schema and yield a session factory bound to it.
+    """
+    engine = create_async_engine(BENCH_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+async def create_bench_user(session: AsyncSession, email: str = "bench@example.com") -> User:
+    user = User(email=email, username=email.split("@")[0])
+    session.add(user)
+    await session.commit()
+    return user
+
+
+def make_plan(days: int, activities_per_day: int = 4) -> dict:
+    """
+    Build an AI-like itinerary with the given number of days.
+    """
+    return {
+        "name": f"Bench trip ({days} days)",
+        "days": [
+            {
+                "day_number": day,
+                "date": None,
+                "description": f"Day {day}",
+                "activities": [
+                    {
+                        "name": f"Activity {day}.{n}",
+                        "description": "Benchmark activity",
+                        "start_time": f"{9 + n:02d}:00",
+                        "end_time": f"{10 + n:02d}:00",
+                        "location": "Somewhere",
+                        "cost": 10.0 * n,
+                        "activity_type": "Sightseeing",
+                    }
+                    for n in range(activities_per_day)
+                ],
+            }
+            for day in range(1, days + 1)
+        ],
+    }
+
+
+class Timer:
+    """
+    Collect wall-clock samples and print a one-line summary.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.samples: list[float] = []
+
+    @asynccontextmanager
+    async def measure(self):
+        started = time.perf_counter()
+        yield
+        self.samples.append(time.perf_counter() - started)
+
+    def report(self) -> None:
+        ms = sorted(s * 1000 for s in self.samples)
+        p95 = ms[int(len(ms) * 0.95) - 1] if len(ms) >= 20 else ms[-1]
+        print(
+            f"{self.label:<40} n={len(ms):<5} mean={statistics.mean(ms):8.2f}ms "
+            f"median={statistics.median(ms):8.2f}ms p95={p95:8.2f}ms"
+        )
@@ -0,0 +1,143 @@
+# app/db/pool.py
+
+"""
+Connection pool modes of the application engine, and pool telemetry.
+
+"queue" keeps up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections per process;
+with N worker processes that is N times as many server connections, which has
+to stay below Postgres max_connections. "null" opens a connection per checkout
+and closes it on return, for use behind PgBouncer, which does the pooling.
+
+Both modes measure how long a checkout waits for a connection, count timeouts
+and log (at most once per interval) when every connection is checked out.
+"""
+
+import logging
+import time
+from bisect import bisect_left
+from typing import Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool
+
+logger = logging.getLogger(__name__)
+
+POOL_CLASSES = {"queue": AsyncAdaptedQueuePool, "null": NullPool}
+
+# upper bounds of the checkout wait histogram buckets, in seconds
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolMetrics:
+    """
+    Checkout counters of one engine's pool. `capacity` is the most connections
+    the pool hands out at once (0 - unbounded, no saturation).
+    """
+
+    def __init__(self, mode: str, capacity: int, log_interval: float):
+        self.mode = mode
+        self.capacity = capacity
+        self.log_interval = log_interval
+        self.checked_out = 0
+        self.checkouts = 0
+        self.saturated = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_counts = [0] * (len(WAIT_BUCKETS) + 1)
+        self._logged_at: Optional[float] = None
+
+    def _wait(self, waited: float) -> None:
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.wait_counts[bisect_left(WAIT_BUCKETS, waited)] += 1
+
+    def _log(self, message: str, *args) -> None:
+        now = time.monotonic()
+        if self._logged_at is None or now - self._logged_at >= self.log_interval:
+            self._logged_at = now
+            logger.warning(message, *args)
+
+    def checkout(self, waited: float) -> None:
+        self.checkouts += 1
+        self.checked_out += 1
+        self._wait(waited)
+        if self.capacity and self.checked_out >= self.capacity:
+            self.saturated += 1
+            self._log(
+                "DB pool: all %s connections checked out (this checkout waited %.3fs, %s timeouts so far)",
+                self.capacity,
+                waited,
+                self.timeouts,
+            )
+
+    def checkin(self) -> None:
+        self.checked_out -= 1
+
+    def timeout(self, waited: float) -> None:
+        self.timeouts += 1
+        self._wait(waited)
+        self._log("DB pool: checkout timed out after %.3fs, all %s connections in use", waited, self.capacity)
+
+    def stats(self, pool: Optional[Pool] = None) -> dict:
+        waits = sum(self.wait_counts)
+        histogram = {f"{bound * 1000:g}ms": count for bound, count in zip(WAIT_BUCKETS, self.wait_counts)}
+        histogram["inf"] = self.wait_counts[-1]
+        return {
+            "mode": self.mode,
+            "capacity": self.capacity,
+            "checked_out": self.checked_out,
+            # connections opened beyond pool_size, closed again when returned
+            "overflow": max(pool.overflow(), 0) if isinstance(pool, AsyncAdaptedQueuePool) else 0,
+            "idle": pool.checkedin() if isinstance(pool, AsyncAdaptedQueuePool) else 0,
+            "checkouts": self.checkouts,
+            "saturated_checkouts": self.saturated,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total * 1000 / waits, 3) if waits else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "wait_histogram": histogram,
+        }
+
+
+class _MonitoredPool:
+    """Times Pool._do_get - the wait for a free connection or a new one - for `metrics`."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeout(time.perf_counter() - started)
+            raise
+        self.metrics.checkout(time.perf_counter() - started)
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        self.metrics.checkin()
+        super()._do_return_conn(record)
+
+
+def pool_options(
+    mode: str,
+    metrics: PoolMetrics,
+    size: int,
+    max_overflow: int,
+    timeout: float,
+    recycle: int,
+    pre_ping: bool,
+) -> dict:
+    """
+    create_async_engine() arguments of a pool in `mode` reporting to `metrics`.
+    The pool class is made per engine: Pool.recreate() (on dispose) builds a new
+    instance of the same class, which then keeps reporting to the same metrics.
+    """
+    base = POOL_CLASSES[mode]
+    options = {
+        "poolclass": type(f"Monitored{base.__name__}", (_MonitoredPool, base), {"metrics": metrics}),
+        "pool_pre_ping": pre_ping,
+    }
+    if mode == "queue":
+        options.update(pool_size=size, max_overflow=max_overflow, pool_timeout=timeout, pool_recycle=recycle)
+    return options
@@ -0,0 +1,213 @@
+# app/db/routing.py
+
+"""
+Read replica routing.
+
+Repository methods marked with @read_only may run their SELECTs on a read
+replica; everything else - writes, and reads of unmarked methods - goes to the
+primary. A session that has written (a flush or a DML statement), or was pinned
+with use_primary(), reads from the primary for the rest of its life, so a
+request sees its own writes and read-modify-write flows never start from a
+lagging copy.
+
+Replicas are used round-robin. One that fails to connect or drops its
+connection is skipped until a health check reaches it again.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+from typing import Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from db.pool import PoolMetrics
+
+logger = logging.getLogger(__name__)
+
+# Session.info keys
+READ_ONLY = "read_only"
+USE_PRIMARY = "use_primary"
+
+
+def read_only(method):
+    """
+    Mark a repository method as read-only: its statements may run on a replica.
+    An async generator method is read-only while it produces an item, not while
+    the caller holds it between items.
+    """
+    if inspect.isasyncgenfunction(method):
+        return _read_only_stream(method)
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        info = self.session.info
+        if info.get(READ_ONLY):
+            return await method(self, *args, **kwargs)
+        info[READ_ONLY] = True
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            info[READ_ONLY] = False
+
+    return wrapper
+
+
+def _read_only_stream(method):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        info = self.session.info
+        stream = method(self, *args, **kwargs)
+        try:
+            while True:
+                nested = info.get(READ_ONLY)
+                info[READ_ONLY] = True
+                try:
+                    item = await stream.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    if not nested:
+                        info[READ_ONLY] = False
+                yield item
+        finally:
+            await stream.aclose()
+
+    return wrapper
+
+
+def use_primary(session: AsyncSession) -> None:
+    """Send every further statement of the session to the primary."""
+    session.info[USE_PRIMARY] = True
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine, metrics: Optional[PoolMetrics] = None):
+        self.name = name
+        self.engine = engine
+        self.metrics = metrics
+        self.healthy = True
+        self.reads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "reads": self.reads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "pool": self.metrics.stats(self.engine.pool) if self.metrics else None,
+        }
+
+
+class ReplicaSet:
+    """
+    The read replicas of the primary, handed out round-robin, and their health checks.
+    `check_interval` is also the timeout of a check.
+    """
+
+    def __init__(self, replicas: list[Replica], check_interval: float = 5.0):
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self._next = 0
+        self._monitor: Optional[asyncio.Task] = None
+        # read-only statements served by the primary: the session was pinned, or no replica was healthy
+        self.pinned_reads = 0
+        self.fallback_reads = 0
+        for replica in replicas:
+            event.listen(replica.engine.sync_engine, "handle_error", functools.partial(self._on_error, replica))
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def choose(self) -> Optional[Replica]:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if replica.healthy:
+                replica.reads += 1
+                return replica
+        return None
+
+    def mark_down(self, replica: Replica, error: BaseException) -> None:
+        replica.failures += 1
+        replica.last_error = str(error) or type(error).__name__
+        if replica.healthy:
+            replica.healthy = False
+            logger.warning("DB replicas: %s is down, reads go elsewhere: %s", replica.name, replica.last_error)
+
+    def mark_up(self, replica: Replica) -> None:
+        if not replica.healthy:
+            replica.healthy = True
+            logger.info("DB replicas: %s is back", replica.name)
+
+    def _on_error(self, replica: Replica, context) -> None:
+        # a failed connect or a dropped connection; statement errors say nothing about the replica
+        if context.connection is None or context.is_disconnect:
+            self.mark_down(replica, context.original_exception)
+
+    async def _ping(self, replica: Replica) -> None:
+        async with replica.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def check(self) -> None:
+        for replica in self.replicas:
+            try:
+                await asyncio.wait_for(self._ping(replica), timeout=self.check_interval)
+            except Exception as e:
+                self.mark_down(replica, e)
+            else:
+                self.mark_up(replica)
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+    def start(self) -> None:
+        if self._monitor is None and self.replicas:
+            self._monitor = asyncio.create_task(self._run(), name="replica-health-check")
+
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [replica.stats() for replica in self.replicas],
+            "pinned_reads": self.pinned_reads,
+            "fallback_reads": self.fallback_reads,
+        }
+
+
+class RoutingSession(Session):
+    """
+    Session sending the SELECTs of read-only repository methods to a replica of `replicas`.
+    Used as the sync_session_class of the application's AsyncSessions.
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or (clause is not None and clause.is_dml):
+            self.info[USE_PRIMARY] = True
+        elif self.replicas and self.info.get(READ_ONLY) and clause is not None and clause.is_select:
+            if self.info.get(USE_PRIMARY):
+                self.replicas.pinned_reads += 1
+            elif (replica := self.replicas.choose()) is not None:
+                return replica.engine.sync_engine
+            else:
+                self.replicas.fallback_reads += 1
+        return super().get_bind(mapper, clause=clause, **kwargs)
@@ -1,21 +1,77 @@
 # app/db/sessions.py
 
+import logging
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from db.pool import PoolMetrics, pool_options
+from db.routing import Replica, ReplicaSet, RoutingSession
 from utils.config import settings
+from utils.metrics import register_metrics
 
-engine = create_async_engine(
-    settings.db_async_url,
-    connect_args={"timeout": settings.DB_CONNECT_TIMEOUT},
-    echo=settings.DB_ECHO,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-    future=True,
+logger = logging.getLogger(__name__)
+
+connect_args = {"timeout": settings.DB_CONNECT_TIMEOUT}
+if settings.DB_POOL_MODE == "null":
+    # behind PgBouncer in transaction mode consecutive statements may run on different server
+    # connections: no per-connection statement caches, and prepared statement names that never collide
+    connect_args.update(
+        statement_cache_size=0,
+        prepared_statement_cache_size=0,
+        prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+    )
+else:
+    connect_args.update(
+        statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+        prepared_statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+    )
+
+
+def create_engine(url: str) -> tuple[AsyncEngine, PoolMetrics]:
+    """An engine with the configured pool, and the metrics of that pool."""
+    metrics = PoolMetrics(
+        mode=settings.DB_POOL_MODE,
+        capacity=settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW if settings.DB_POOL_MODE == "queue" else 0,
+        log_interval=settings.DB_POOL_LOG_INTERVAL,
+    )
+    engine = create_async_engine(
+        url,
+        connect_args=connect_args,
+        echo=settings.DB_ECHO,
+        future=True,
+        **pool_options(
+            settings.DB_POOL_MODE,
+            metrics,
+            size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            timeout=settings.DB_POOL_TIMEOUT,
+            recycle=settings.DB_POOL_RECYCLE,
+            pre_ping=settings.DB_POOL_PRE_PING,
+        ),
+    )
+    return engine, metrics
+
+
+engine, pool_metrics = create_engine(settings.db_async_url)
+# read replicas, each with a pool of its own
+replicas = ReplicaSet(
+    [Replica(host, *create_engine(url)) for host, url in settings.db_replica_urls.items()],
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL,
 )
+logger.info(
+    "DB pool: mode=%s, at most %s connections per process to the primary and each of %s replicas",
+    settings.DB_POOL_MODE,
+    pool_metrics.capacity or "unbounded",
+    len(replicas),
+)
+register_metrics("db_pool", lambda: pool_metrics.stats(engine.pool))
+register_metrics("db_replicas", replicas.stats)
 
 async_session_factory = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=replicas,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -28,3 +84,11 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """
     async with async_session_factory() as session:
         yield session
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Dependency that returns the session factory, for work that outlives
+    the request-scoped session (background jobs, streaming responses).
+    """
+    return async_session_factory
@@ -0,0 +1,17 @@
+# app/exceptions/export.py
+
+
+class ExportNotFoundError(Exception):
+    """Raised when an export is not found (or belongs to another route)."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+
+class ExportNotReadyError(Exception):
+    """Raised when the file of an export is requested before it has been rendered."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
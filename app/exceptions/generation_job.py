@@ -0,0 +1,9 @@
+# app/exceptions/generation_job.py
+
+
+class GenerationJobNotFoundError(Exception):
+    """Raised when a generation job is not found (or belongs to another user)."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
@@ -31,3 +31,19 @@ class PermissionDeniedError(Exception):
     def __init__(self, message: str):
         self.message = message
         super().__init__(message)
+
+
+class InvalidCursorError(Exception):
+    """Raised when a pagination cursor can't be decoded."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
+
+
+class RouteDayNotFoundError(Exception):
+    """Raised when a route has no day with the given number."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
@@ -31,3 +31,11 @@ class AuthenticationError(Exception):
     def __init__(self, detail: str = "Incorrect username or password"):
         self.message = detail
         super().__init__(self.message)
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when too many password hashes are already queued."""
+
+    def __init__(self, detail: str = "Too many login attempts in progress, try again later"):
+        self.message = detail
+        super().__init__(self.message)
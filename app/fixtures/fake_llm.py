@@ -0,0 +1,65 @@
+# app/fixtures/fake_llm.py
+
+"""
+Fake OpenAI-compatible chat completions server replaying recorded completions.
+
+Used by tests and benchmarks; can also be run locally with
+`uvicorn fixtures.fake_llm:app --port 9000` and AI_API_BASE_URL=http://localhost:9000.
+"""
+
+import asyncio
+import json
+import os
+from typing import List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(__file__), "recorded_completions")
+
+
+def load_recorded_completion(name: str) -> List[str]:
+    """
+    Content deltas of a recorded completion, in the order they were streamed.
+    """
+    with open(os.path.join(RECORDINGS_DIR, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)["chunks"]
+
+
+def chunk_text(text: str, size: int = 4) -> List[str]:
+    """
+    Split any completion into deltas of roughly token size.
+    """
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def create_fake_llm_app(chunks: List[str], delay: float = 0.0) -> FastAPI:
+    """
+    :param chunks: content deltas to replay for every request
+    :param delay: pause before each delta, in seconds (simulates generation speed)
+    """
+    fake = FastAPI()
+    fake.state.requests = []
+
+    async def events(model: str):
+        for chunk in chunks:
+            if delay:
+                await asyncio.sleep(delay)
+            data = {"object": "chat.completion.chunk", "model": model, "choices": [{"index": 0, "delta": {"content": chunk}}]}
+            yield f"data: {json.dumps(data)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @fake.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        fake.state.requests.append(body)
+        model = body.get("model", "fake")
+        if body.get("stream"):
+            return StreamingResponse(events(model), media_type="text/event-stream")
+        message = {"role": "assistant", "content": "".join(chunks)}
+        return JSONResponse({"object": "chat.completion", "model": model, "choices": [{"index": 0, "message": message}]})
+
+    return fake
+
+
+app = create_fake_llm_app(load_recorded_completion("rome_3_days"), delay=0.01)
@@ -1,14 +1,44 @@
 # app/main.py
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from utils.logging_config import setup_logging
 from utils.logging_middleware import LoggingMiddleware
 
 from api.routes import api_router
+from db.sessions import async_session_factory, replicas
+from services.generation_worker import generation_workers
+from services.export_worker import export_workers
+from services.ai_service import get_ai_service
+from utils.invalidation import invalidation_bus
+from utils.security import password_hasher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # pick up generation jobs left queued by a previous run
+    generation_workers.start(async_session_factory)
+    # ...and exports
+    export_workers.start(async_session_factory)
+    # cross-worker invalidation of in-process caches (route ACLs)
+    invalidation_bus.start()
+    # read replica health checks
+    replicas.start()
+    yield
+    await generation_workers.stop()
+    await export_workers.stop()
+    await invalidation_bus.stop()
+    await replicas.stop()
+    password_hasher.shutdown()
+    ai_svc = get_ai_service()
+    if ai_svc is not None:
+        await ai_svc.aclose()
+
 
 setup_logging()
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(LoggingMiddleware)
 app.include_router(api_router)
 
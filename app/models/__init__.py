@@ -5,6 +5,7 @@ from .route import Route, RouteDay, Activity
 from .export import Export, ExportType
 from .ai_cache import AICache
 from .route_access import RouteAccess
+from .generation_job import GenerationJob, GenerationJobStatus
 
 
 __all__ = [
@@ -16,4 +17,6 @@ __all__ = [
     "ExportType",
     "AICache",
     "RouteAccess",
+    "GenerationJob",
+    "GenerationJobStatus",
 ]
@@ -1,7 +1,8 @@
 # app/models/export.py
 
+from datetime import datetime
 from enum import Enum
-from sqlalchemy import ForeignKey, String, Enum as PgEnum, Text
+from sqlalchemy import ForeignKey, String, Enum as PgEnum, Text, DateTime, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.base_class import Base
@@ -16,6 +17,7 @@ class ExportType(Enum):
 
 class ExportStatus(Enum):
     QUEUED = "queued"
+    PROCESSING = "processing"
     SUCCESS = "success"
     FAILED = "failed"
 
@@ -26,6 +28,7 @@ class Export(CreatedAtMixin, Base):
     route_id: Mapped[int] = mapped_column(
         ForeignKey("routes.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
@@ -41,12 +44,22 @@ class Export(CreatedAtMixin, Base):
         PgEnum(ExportStatus),
         nullable=False,
         default=ExportStatus.QUEUED,
+        index=True,
     )
 
     file_path: Mapped[str | None] = mapped_column(
         String,
         nullable=True,
     )  # For PDF exports
+    # artifact key (content hash + template version) and Route.updated_at the export was rendered from
+    content_hash: Mapped[str | None] = mapped_column(
+        String(64),
+        nullable=True,
+    )
+    route_version: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
     external_id: Mapped[str | None] = mapped_column(
         String,
         nullable=True,
@@ -56,6 +69,13 @@ class Export(CreatedAtMixin, Base):
         nullable=True,
     )
 
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=func.now(),
+        onupdate=func.now(),
+    )
+
     user: Mapped["User"] = relationship(
         back_populates="exports",
     )
@@ -0,0 +1,61 @@
+# app/models/generation_job.py
+
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import ForeignKey, Enum as PgEnum, Text, JSON, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from db.base_class import Base
+from models.mixins import CreatedAtMixin
+
+
+class GenerationJobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILED = "failed"
+
+
+class GenerationJob(CreatedAtMixin, Base):
+    __tablename__ = "generation_jobs"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    status: Mapped[GenerationJobStatus] = mapped_column(
+        PgEnum(GenerationJobStatus),
+        nullable=False,
+        default=GenerationJobStatus.QUEUED,
+        index=True,
+    )
+
+    # RouteGenerateRequest payload
+    params: Mapped[dict] = mapped_column(JSON, nullable=False)
+    progress: Mapped[int] = mapped_column(nullable=False, default=0)  # 0..100
+    # number of claims; a worker only stores results while the job is still on its claim
+    attempt: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
+
+    route_id: Mapped[int | None] = mapped_column(
+        ForeignKey("routes.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    error_message: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=func.now(),
+        onupdate=func.now(),
+    )
+
+    user: Mapped["User"] = relationship(
+        back_populates="generation_jobs",
+    )
+
+    def __repr__(self) -> str:
+        return f"<GenerationJob(id={self.id}, status={self.status}, progress={self.progress})>"
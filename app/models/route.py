@@ -2,9 +2,9 @@
 
 from typing import List
 
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 from sqlalchemy import Date
-from sqlalchemy import ForeignKey, String, Integer, DateTime, JSON, func
+from sqlalchemy import ForeignKey, String, Integer, DateTime, JSON, Index, func, true
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.base_class import Base
@@ -24,8 +24,21 @@ class Route(CreatedAtMixin, Base):
     budget: Mapped[float] = mapped_column(nullable=False)
     interests: Mapped[list[str]] = mapped_column(JSON, nullable=False, default=[])
 
-    # Route data - stores the actual AI-generated route == AICache.result
-    route_data: Mapped[dict] = mapped_column(JSON, nullable=False, default=[])
+    # Route data - the AI-generated plan. NULL when it is AICache.result of ai_cache_id
+    # (ROUTE_DATA_STORAGE="reference"), it is then attached on read by RouteRepository.attach_route_data
+    route_data: Mapped[dict | None] = mapped_column(JSON(none_as_null=True), nullable=True, default=None)
+    # copy-on-write: False while the route has no RouteDay/Activity rows of its own and its days
+    # are read from the plan; they are written on the first edit
+    materialized: Mapped[bool] = mapped_column(nullable=False, default=True, server_default=true())
+
+    # itinerary aggregates, maintained by RouteRepository whenever days or activities are written,
+    # so listings show them without loading activities
+    total_cost: Mapped[float] = mapped_column(nullable=False, default=0.0, server_default="0")
+    activity_count: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
+    # activity_type -> number of activities (untyped ones are only in activity_count)
+    activity_types: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict, server_default="{}")
+    first_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    last_date: Mapped[date | None] = mapped_column(Date, nullable=True)
 
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     owner: Mapped["User"] = relationship(
@@ -44,11 +57,13 @@ class Route(CreatedAtMixin, Base):
         foreign_keys=[last_edited_by],
     )
 
+    # the route's version (export artifacts are reused while it is unchanged): set by the application,
+    # as CURRENT_TIMESTAMP has only second precision on SQLite
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
         default=func.now(),
-        onupdate=func.now(),
+        onupdate=lambda: datetime.now(timezone.utc),
     )
 
     access_list: Mapped[list["RouteAccess"]] = relationship(
@@ -66,6 +81,9 @@ class Route(CreatedAtMixin, Base):
         cascade="all, delete-orphan",
     )
 
+    # keyset pagination of route listings: ORDER BY created_at DESC, id DESC
+    __table_args__ = (Index("ix_routes_created_at_id", "created_at", "id"),)
+
     def __repr__(self) -> str:
         return f"<Route(id={self.id}, destination={self.destination})>"
 
@@ -77,6 +95,9 @@ class RouteDay(Base):
     day_number: Mapped[int] = mapped_column(nullable=False)
     description: Mapped[str | None] = mapped_column(nullable=True)
     date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    # aggregates of the day's activities, see Route.total_cost
+    total_cost: Mapped[float] = mapped_column(nullable=False, default=0.0, server_default="0")
+    activity_count: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
 
     route: Mapped["Route"] = relationship(
         back_populates="days",
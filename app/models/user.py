@@ -55,5 +55,10 @@ class User(CreatedAtMixin, Base):
         cascade="all, delete-orphan",
     )
 
+    generation_jobs: Mapped[list["GenerationJob"]] = relationship(
+        back_populates="user",
+        cascade="all, delete-orphan",
+    )
+
     def __repr__(self) -> str:
         return f"<User(id={self.id}, telegram_id={self.telegram_id}, username={self.username})>"
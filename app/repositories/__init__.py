@@ -4,10 +4,16 @@ from .user import UserRepository
 from .route import RouteRepository
 from .route_access import RouteAccessRepository
 from .ai_cache import AICacheRepository
+from .generation_job import GenerationJobRepository
+from .route_import import RouteImportRepository
+from .export import ExportRepository
 
 __all__ = [
     "UserRepository",
     "RouteRepository",
     "RouteAccessRepository",
     "AICacheRepository",
+    "GenerationJobRepository",
+    "RouteImportRepository",
+    "ExportRepository",
 ]
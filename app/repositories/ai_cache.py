@@ -7,10 +7,12 @@ from datetime import datetime
 
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, exists, func
 
 from models.ai_cache import AICache
+from models.route import Route
 from schemas.ai_cache import AICacheCreate
+from utils.cache_keys import normalize_location, normalize_budget, build_cache_key
 from .base import BaseRepository
 
 logger = logging.getLogger(__name__)
@@ -69,6 +71,47 @@ class AICacheRepository(BaseRepository[AICache]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def find_near(
+        self,
+        origin: str,
+        destination: str,
+        duration_days: int,
+        budget: float,
+        budget_tolerance: float,
+        duration_tolerance: int,
+        limit: int = 20,
+    ) -> list[AICache]:
+        """
+        Find entries for the same origin and destination whose duration and budget lie within
+        the tolerance bands (±duration_tolerance days, ±budget_tolerance as a fraction of budget).
+        Range predicates on the trailing columns of ix_cache_from_to_days_budget keep this an index scan.
+        Closest candidates come first.
+        """
+        budget_low = math.floor(budget * (1 - budget_tolerance))
+        budget_high = math.ceil(budget * (1 + budget_tolerance))
+        logger.debug(
+            "AICache Repo: fetching near origin=%s, destination=%s, days=%s±%s, budget=%s..%s",
+            origin,
+            destination,
+            duration_days,
+            duration_tolerance,
+            budget_low,
+            budget_high,
+        )
+        stmt = (
+            select(AICache)
+            .where(
+                AICache.origin == origin,
+                AICache.destination == destination,
+                AICache.duration_days.between(duration_days - duration_tolerance, duration_days + duration_tolerance),
+                AICache.budget.between(budget_low, budget_high),
+            )
+            .order_by(func.abs(AICache.duration_days - duration_days), func.abs(AICache.budget - budget))
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
     async def create(self, obj_in: AICacheCreate) -> AICache:
         """
         Create a new cache entry.
@@ -77,12 +120,13 @@ class AICacheRepository(BaseRepository[AICache]):
 
         data = obj_in.model_dump()
         # compute cache_key = f"{origin}:{destination}:{days}:{budget}"
-        data["origin"] = data["origin"].strip().lower()
-        data["destination"] = data["destination"].strip().lower()
-        budget_raw = data["budget"]
-        budget_num = float(budget_raw) if isinstance(budget_raw, str) else budget_raw
-        data["budget"] = math.ceil(budget_num)
-        data["cache_key"] = f"{data['origin']}:{data['destination']}:{data['duration_days']}:{data['budget']}"
+        # from exact names and aliases only: a fuzzy match is a guess, it is never stored
+        data["cache_key"] = build_cache_key(
+            data["origin"], data["destination"], data["duration_days"], data["budget"], fuzzy=False
+        )
+        data["origin"] = normalize_location(data["origin"], fuzzy=False)
+        data["destination"] = normalize_location(data["destination"], fuzzy=False)
+        data["budget"] = normalize_budget(data["budget"])
 
         new_cache = AICache(**data)
         self.session.add(new_cache)
@@ -96,7 +140,44 @@ class AICacheRepository(BaseRepository[AICache]):
             await self.session.rollback()
             raise
 
-    async def increment_hit_count(self, cache_id: int) -> None:
+    async def get_key_fields(self) -> list:
+        """
+        (id, cache_key, origin, destination, duration_days, budget, hit_count) of all entries, oldest first.
+        """
+        stmt = select(
+            AICache.id,
+            AICache.cache_key,
+            AICache.origin,
+            AICache.destination,
+            AICache.duration_days,
+            AICache.budget,
+            AICache.hit_count,
+        ).order_by(AICache.id)
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def merge_into(self, keeper_id: int, duplicate_ids: list[int], **values) -> None:
+        """
+        Collapse duplicate entries into `keeper_id`: routes are repointed to the keeper,
+        duplicates are deleted and the keeper is updated with `values`. Not committed.
+        Routes referencing a duplicate's plan get their own copy of it first.
+        """
+        logger.debug("AICache Repo: merging %s into id=%s", duplicate_ids, keeper_id)
+        if duplicate_ids:
+            result = select(AICache.result).where(AICache.id == Route.ai_cache_id).scalar_subquery()
+            await self.session.execute(
+                update(Route)
+                .where(Route.ai_cache_id.in_(duplicate_ids), Route.route_data.is_(None))
+                .values(route_data=result)
+            )
+            await self.session.execute(
+                update(Route).where(Route.ai_cache_id.in_(duplicate_ids)).values(ai_cache_id=keeper_id)
+            )
+            await self.session.execute(delete(AICache).where(AICache.id.in_(duplicate_ids)))
+        if values:
+            await self.session.execute(update(AICache).where(AICache.id == keeper_id).values(**values))
+
+    async def increment_hit_count(self, cache_id: int, commit: bool = True) -> None:
         """
         Atomically increment hit_count and update expires_at.
         """
@@ -111,18 +192,38 @@ class AICacheRepository(BaseRepository[AICache]):
             )
         )
         await self.session.execute(stmt)
-        await self.session.commit()
+        if commit:
+            await self.session.commit()
 
     async def delete_expired(self, before: Optional[datetime] = None) -> int:
         """
         Delete all cache entries with expires_at <= now (or `before` if provided).
         Returns the number of rows deleted.
         """
+        return len(await self.delete_expired_keys(before))
+
+    async def delete_expired_keys(self, before: Optional[datetime] = None) -> list[str]:
+        """
+        Same as delete_expired, but returns cache keys of the deleted entries
+        so that cache tiers in front of the table can be invalidated.
+        """
+        return [cache_key for _, cache_key in await self.delete_expired_entries(before)]
+
+    async def delete_expired_entries(self, before: Optional[datetime] = None) -> list[tuple[int, str]]:
+        """
+        Same as delete_expired, but returns (id, cache_key) of the deleted entries.
+        """
         cutoff = before or datetime.utcnow()
         logger.info("AICache Repo: deleting expired entries before %s", cutoff)
-        stmt = delete(AICache).where(AICache.expires_at != None, AICache.expires_at <= cutoff)
+        # entries holding the plan of a route (route_data stored by reference) are kept
+        referenced = exists().where(Route.ai_cache_id == AICache.id, Route.route_data.is_(None))
+        stmt = (
+            delete(AICache)
+            .where(AICache.expires_at != None, AICache.expires_at <= cutoff, ~referenced)
+            .returning(AICache.id, AICache.cache_key)
+        )
         result = await self.session.execute(stmt)
+        deleted = [(row.id, row.cache_key) for row in result.all()]
         await self.session.commit()
-        deleted = result.rowcount or 0
-        logger.info("AICache Repo: deleted %d expired entries", deleted)
+        logger.info("AICache Repo: deleted %d expired entries", len(deleted))
         return deleted
@@ -6,6 +6,7 @@ from typing import Generic, TypeVar, Type
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from db.base_class import Base
+from db.routing import use_primary
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,7 @@ class BaseRepository(Generic[ModelType]):
     """
     Basic repository with common CRUD operations:
     - get(id)
+    - exists(id)
     - get_all()
     - delete(id)
     """
@@ -35,6 +37,13 @@ class BaseRepository(Generic[ModelType]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def exists(self, id: int) -> bool:
+        """Check that an object with the given ID exists without loading it"""
+        logger.debug("Base repo: checking %s (id=%s) exists", self.model.__name__, id)
+        stmt = select(self.model.id).where(self.model.id == id)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
     async def get_all(self) -> list[ModelType]:
         """Get all objects in the model"""
         logger.debug("Base repo: fetching all records of %s", self.model.__name__)
@@ -45,6 +54,7 @@ class BaseRepository(Generic[ModelType]):
     async def delete(self, id: int, commit: bool = True) -> bool:
         """Delete object by ID"""
         logger.debug("Base repo: attempting to delete %s (id=%s)", self.model.__name__, id)
+        use_primary(self.session)
         obj = await self.get(id)
         if not obj:
             logger.debug("Base repo: %s (id=%s) not found", self.model.__name__, id)
@@ -0,0 +1,139 @@
+# app/repositories/export.py
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.export import Export, ExportStatus, ExportType
+from models.route import Route
+from repositories.base import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ExportRepository(BaseRepository[Export]):
+    """
+    Repository for the Export model - a durable queue of route exports.
+    """
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(Export, session)
+
+    async def create(self, route_id: int, user_id: int, export_type: ExportType) -> Export:
+        """
+        Create a new QUEUED export and commit it, so a worker can claim it right away.
+        """
+        export = Export(route_id=route_id, user_id=user_id, export_type=export_type, status=ExportStatus.QUEUED)
+        self.session.add(export)
+        await self.session.commit()
+        logger.debug("Export repo: Export (id=%s) queued", export.id)
+        return export
+
+    async def list_by_route(self, route_id: int) -> List[Export]:
+        stmt = select(Export).where(Export.route_id == route_id).order_by(Export.id.desc())
+        return list((await self.session.scalars(stmt)).all())
+
+    async def route_version(self, route_id: int) -> Optional[datetime]:
+        """Route.updated_at of a route, None if the route does not exist."""
+        return await self.session.scalar(select(Route.updated_at).where(Route.id == route_id))
+
+    async def artifact_key(self, route_id: int, route_version: datetime) -> Optional[str]:
+        """Content hash of the latest successful export of the route rendered from this version of it."""
+        stmt = (
+            select(Export.content_hash)
+            .where(
+                Export.route_id == route_id,
+                Export.route_version == route_version,
+                Export.status == ExportStatus.SUCCESS,
+                Export.content_hash.is_not(None),
+            )
+            .order_by(Export.id.desc())
+            .limit(1)
+        )
+        return await self.session.scalar(stmt)
+
+    async def claim_next(self, stale_after: float) -> Optional[Export]:
+        """
+        Claim the oldest export that is QUEUED, or PROCESSING but not updated for `stale_after`
+        seconds (its worker most likely died), and move it to PROCESSING.
+        The row is selected FOR UPDATE SKIP LOCKED, so concurrent workers - in this process or
+        another - never wait for each other and never get the same export; the status guard on
+        the UPDATE covers databases without row locks (SQLite).
+        """
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+        pending = or_(
+            Export.status == ExportStatus.QUEUED,
+            and_(Export.status == ExportStatus.PROCESSING, Export.updated_at < stale_before),
+        )
+        stmt = select(Export).where(pending).order_by(Export.id).limit(1).with_for_update(skip_locked=True)
+        while True:
+            export = (await self.session.scalars(stmt)).first()
+            if export is None:
+                await self.session.commit()
+                return None
+            if export.status == ExportStatus.PROCESSING:
+                logger.warning("Export repo: reclaiming stale Export (id=%s)", export.id)
+            result = await self.session.execute(
+                update(Export)
+                .where(Export.id == export.id, pending)
+                .values(status=ExportStatus.PROCESSING, updated_at=datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            )
+            await self.session.commit()
+            if result.rowcount == 1:
+                break
+            # taken by a concurrent claim that didn't lock the row, try the next one
+        await self.session.refresh(export)
+        logger.debug("Export repo: claimed Export (id=%s)", export.id)
+        return export
+
+    async def requeue(self, export_id: int) -> bool:
+        """
+        Move a SUCCESS export whose file was evicted back to QUEUED, to be rendered again.
+        Returns False if the export is no longer SUCCESS (requeued by another request).
+        """
+        stmt = (
+            update(Export)
+            .where(Export.id == export_id, Export.status == ExportStatus.SUCCESS)
+            .values(status=ExportStatus.QUEUED, file_path=None)
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        requeued = result.rowcount == 1
+        logger.debug("Export repo: Export (id=%s) requeued -> %s", export_id, requeued)
+        return requeued
+
+    async def finish(
+        self,
+        export_id: int,
+        status: ExportStatus,
+        file_path: Optional[str] = None,
+        external_id: Optional[str] = None,
+        error_message: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        route_version: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Store the outcome of an export - status and file_path in one UPDATE, so a SUCCESS
+        export always has its file. Returns False if the export is no longer PROCESSING.
+        """
+        stmt = (
+            update(Export)
+            .where(Export.id == export_id, Export.status == ExportStatus.PROCESSING)
+            .values(
+                status=status,
+                file_path=file_path,
+                external_id=external_id,
+                error_message=error_message,
+                content_hash=content_hash,
+                route_version=route_version,
+            )
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        finished = result.rowcount == 1
+        logger.debug("Export repo: Export (id=%s) finished with %s -> %s", export_id, status, finished)
+        return finished
@@ -0,0 +1,135 @@
+# app/repositories/generation_job.py
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import select, update, or_, and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.generation_job import GenerationJob, GenerationJobStatus
+from repositories.base import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationJobRepository(BaseRepository[GenerationJob]):
+    """
+    Repository for the GenerationJob model - a durable queue of AI route generations.
+    """
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(GenerationJob, session)
+
+    async def create(self, user_id: int, params: dict) -> GenerationJob:
+        """
+        Create a new QUEUED job.
+        Server defaults come back with the INSERT, so no refresh is needed and
+        no transaction is left open once the job is handed over to a worker.
+        """
+        job = GenerationJob(user_id=user_id, params=params, status=GenerationJobStatus.QUEUED, progress=0)
+        self.session.add(job)
+        await self.session.commit()
+        logger.debug("Generation job repo: GenerationJob (id=%s) queued", job.id)
+        return job
+
+    async def claim(self, job_id: int) -> Optional[int]:
+        """
+        Atomically move a job from QUEUED to RUNNING and count the attempt.
+        Returns the attempt - the claim touch() and finish() are guarded by -
+        or None if somebody else has already claimed it.
+        """
+        stmt = (
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id, GenerationJob.status == GenerationJobStatus.QUEUED)
+            .values(status=GenerationJobStatus.RUNNING, progress=10, attempt=GenerationJob.attempt + 1)
+        )
+        result = await self.session.execute(stmt)
+        attempt = None
+        if result.rowcount == 1:
+            attempt = await self.session.scalar(select(GenerationJob.attempt).where(GenerationJob.id == job_id))
+        await self.session.commit()
+        logger.debug("Generation job repo: claim GenerationJob (id=%s) -> attempt %s", job_id, attempt)
+        return attempt
+
+    def _claimed(self, job_id: int, attempt: int):
+        return and_(
+            GenerationJob.id == job_id,
+            GenerationJob.status == GenerationJobStatus.RUNNING,
+            GenerationJob.attempt == attempt,
+        )
+
+    async def touch(self, job_id: int, attempt: int, progress: int) -> bool:
+        """
+        Heartbeat of a RUNNING job: refreshes updated_at, so the job isn't requeued as stale.
+        Returns False if the job is no longer RUNNING on this attempt.
+        """
+        stmt = (
+            update(GenerationJob)
+            .where(self._claimed(job_id, attempt))
+            .values(progress=progress, updated_at=func.now())
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount == 1
+
+    async def finish(
+        self,
+        job_id: int,
+        attempt: int,
+        status: GenerationJobStatus,
+        route_id: Optional[int] = None,
+        error_message: Optional[str] = None,
+    ) -> bool:
+        """
+        Store the outcome of a job and commit it together with everything else pending
+        in the session (the generated route). If the job is no longer RUNNING on this
+        attempt (it was requeued as stale) the transaction is rolled back instead and
+        False is returned, so the result of the run is dropped as a whole.
+        """
+        stmt = (
+            update(GenerationJob)
+            .where(self._claimed(job_id, attempt))
+            .values(status=status, progress=100, route_id=route_id, error_message=error_message)
+        )
+        result = await self.session.execute(stmt)
+        finished = result.rowcount == 1
+        if finished:
+            await self.session.commit()
+        else:
+            await self.session.rollback()
+        logger.debug("Generation job repo: GenerationJob (id=%s) finished with %s -> %s", job_id, status, finished)
+        return finished
+
+    async def next_pending_id(self, stale_after: float) -> Optional[int]:
+        """
+        Oldest job that is still QUEUED, or RUNNING but not updated for `stale_after` seconds
+        (its worker most likely died). Stale jobs are put back to QUEUED so they can be claimed.
+        """
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+        stmt = (
+            select(GenerationJob.id, GenerationJob.status)
+            .where(
+                or_(
+                    GenerationJob.status == GenerationJobStatus.QUEUED,
+                    and_(
+                        GenerationJob.status == GenerationJobStatus.RUNNING,
+                        GenerationJob.updated_at < stale_before,
+                    ),
+                )
+            )
+            .order_by(GenerationJob.id)
+            .limit(1)
+        )
+        row = (await self.session.execute(stmt)).first()
+        if row is None:
+            return None
+        if row.status == GenerationJobStatus.RUNNING:
+            logger.warning("Generation job repo: requeueing stale GenerationJob (id=%s)", row.id)
+            await self.session.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == row.id, GenerationJob.status == GenerationJobStatus.RUNNING)
+                .values(status=GenerationJobStatus.QUEUED, progress=0)
+            )
+            await self.session.commit()
+        return row.id
@@ -1,21 +1,76 @@
 # app/repositories/route.py
 
 import logging
-from typing import Optional, List
+from collections import Counter
+from typing import AsyncIterator, Iterable, Optional, List, Literal
 from typing import Callable, Awaitable, TypeVar
 
-from sqlalchemy import select, delete
+from datetime import datetime, timezone
+
+from sqlalchemy import select, delete, update, and_, or_, case, exists, func
 from sqlalchemy.exc import IntegrityError
 
+from constants.roles import RouteRole
+from db.routing import read_only, use_primary
+from models.ai_cache import AICache
 from models.route import Route, RouteDay, Activity
-from schemas.route import RouteCreate, RouteDayCreate
+from models.route_access import RouteAccess
+from schemas.route import RouteCreate, RouteDayCreate, RouteDayUpdate, RouteShort
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from .base import BaseRepository
 
 logger = logging.getLogger(__name__)
 
+# how much of the Route graph a query loads:
+#   bare    - route columns only (permission checks, share codes, existence)
+#   summary - days with activities (itinerary consumers)
+#   full    - days with activities, access_list and exports (RouteRead)
+# relationships outside of a profile raise on access instead of lazy loading
+RouteLoad = Literal["bare", "summary", "full"]
+
+ROUTE_LOAD_PROFILES = {
+    "bare": (raiseload("*"),),
+    "summary": (
+        selectinload(Route.days).selectinload(RouteDay.activities),
+        raiseload("*"),
+    ),
+    "full": (
+        selectinload(Route.days).selectinload(RouteDay.activities),
+        selectinload(Route.access_list),
+        selectinload(Route.exports),
+    ),
+}
+
+
+def route_aggregates(days: Iterable[RouteDay]) -> dict:
+    """
+    Route aggregate columns of the given days (their own aggregates must be set, see _build_day).
+    """
+    days = list(days)
+    types = Counter(activity.activity_type for day in days for activity in day.activities if activity.activity_type)
+    dates = [day.date for day in days if day.date is not None]
+    return {
+        "total_cost": sum(day.total_cost for day in days),
+        "activity_count": sum(day.activity_count for day in days),
+        "activity_types": dict(types),
+        "first_date": min(dates, default=None),
+        "last_date": max(dates, default=None),
+    }
+
+
+def day_aggregates(activities: Iterable) -> dict:
+    """
+    RouteDay aggregate columns of the activities (Activity rows or ActivityCreate records).
+    """
+    activities = list(activities)
+    return {
+        "total_cost": sum(activity.cost or 0.0 for activity in activities),
+        "activity_count": len(activities),
+    }
+
 
 class RouteRepository(BaseRepository[Route]):
     """
@@ -32,7 +87,9 @@ class RouteRepository(BaseRepository[Route]):
     async def transaction(self, func: Callable[..., Awaitable[T]], *args, **kwargs):
         """
         Execute actions in one transaction.
+        Read-modify-write flows: from here on the session reads from the primary.
         """
+        use_primary(self.session)
         if self.session.in_transaction():
             # tx_ctx = self.session.begin_nested()  # SAVEPOINT
             await self.session.rollback()  # rollback any previous transaction
@@ -40,56 +97,145 @@ class RouteRepository(BaseRepository[Route]):
         async with self.session.begin():
             return await func(*args, **kwargs)
 
-    async def get(self, id: int) -> Optional[Route]:
-        """Get route by ID"""
-        logger.debug("Route repo: fetching Route (id=%s)", id)
-        stmt = (
-            select(Route)
-            .where(Route.id == id)
-            .options(
-                selectinload(Route.days).selectinload(RouteDay.activities),
-                selectinload(Route.access_list),
-                selectinload(Route.exports),
-            )
-        )
+    @read_only
+    async def get(self, id: int, load: RouteLoad = "full") -> Optional[Route]:
+        """Get route by ID with the given load profile"""
+        logger.debug("Route repo: fetching Route (id=%s, load=%s)", id, load)
+        stmt = select(Route).where(Route.id == id).options(*ROUTE_LOAD_PROFILES[load])
         result = await self.session.execute(stmt)
         route = result.scalar_one_or_none()
         return route
 
-    async def get_by_share_code(self, share_code: str) -> Optional[Route]:
+    @read_only
+    async def get_by_share_code(self, share_code: str, load: RouteLoad = "full") -> Optional[Route]:
         """
-        Get route by its unique share code.
+        Get route by its unique share code with the given load profile.
         """
-        logger.debug("Route repo: fetching Route (share_code=%s)", share_code)
-        stmt = (
-            select(Route)
-            .where(Route.share_code == share_code)
-            .options(
-                selectinload(Route.days).selectinload(RouteDay.activities),
-                selectinload(Route.access_list),
-                selectinload(Route.exports),
-            )
-        )
+        logger.debug("Route repo: fetching Route (share_code=%s, load=%s)", share_code, load)
+        stmt = select(Route).where(Route.share_code == share_code).options(*ROUTE_LOAD_PROFILES[load])
         result = await self.session.execute(stmt)
         route = result.scalar_one_or_none()
         return route
 
-    async def get_by_owner_id(self, owner_id: int) -> list[Route]:
+    @read_only
+    async def get_by_owner_id(self, owner_id: int, load: RouteLoad = "full") -> list[Route]:
+        """
+        Get all routes created by a specific user with the given load profile.
+        """
+        logger.debug("Route repo: fetching all Routes (owner_id=%s, load=%s)", owner_id, load)
+        stmt = select(Route).where(Route.owner_id == owner_id).options(*ROUTE_LOAD_PROFILES[load])
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    @read_only
+    async def stream_by_owner(
+        self, owner_id: int, load: RouteLoad = "full", batch_size: int = 200
+    ) -> AsyncIterator[List[Route]]:
         """
-        Get all routes created by a specific user.
+        Routes of an owner in batches, read through a server-side cursor (yield_per): eager loads
+        run per batch and a batch is expunged when the next one is requested, so memory stays
+        bounded by the batch size however many routes there are.
         """
-        logger.debug("Route repo: fetching all Routes (owner_id=%s)", owner_id)
+        logger.debug("Route repo: streaming Routes (owner_id=%s, load=%s)", owner_id, load)
         stmt = (
             select(Route)
             .where(Route.owner_id == owner_id)
-            .options(
-                selectinload(Route.days).selectinload(RouteDay.activities),
-                selectinload(Route.access_list),
-                selectinload(Route.exports),
+            .order_by(Route.id)
+            .options(*ROUTE_LOAD_PROFILES[load])
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream_scalars(stmt)
+        try:
+            async for batch in result.partitions():
+                yield batch
+                for route in batch:
+                    self.session.expunge(route)  # cascades to the loaded days, activities, access and exports
+        finally:
+            await result.close()
+
+    @read_only
+    async def stream_rows_by_owner(
+        self, owner_id: int, columns: Iterable[str], batch_size: int = 1000
+    ) -> AsyncIterator[list]:
+        """
+        Rows of the given Route columns of an owner's routes in batches, through a server-side cursor.
+        """
+        logger.debug("Route repo: streaming Route rows (owner_id=%s)", owner_id)
+        stmt = (
+            select(*(getattr(Route, name) for name in columns))
+            .where(Route.owner_id == owner_id)
+            .order_by(Route.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(stmt)
+        try:
+            async for batch in result.partitions():
+                yield batch
+        finally:
+            await result.close()
+
+    @read_only
+    async def stream_activities(self, route_id: int, batch_size: int = 1000) -> AsyncIterator[list]:
+        """
+        Activities of a materialized route with day_number and date of their day, in itinerary
+        order, as rows in batches through a server-side cursor - no ORM objects are built.
+        """
+        logger.debug("Route repo: streaming Activities of Route (id=%s)", route_id)
+        stmt = (
+            select(
+                RouteDay.day_number,
+                RouteDay.date,
+                *(column for column in Activity.__table__.columns if column.key != "day_id"),
             )
+            .join(Activity, Activity.day_id == RouteDay.id)
+            .where(RouteDay.route_id == route_id)
+            .order_by(RouteDay.day_number, Activity.id)
+            .execution_options(yield_per=batch_size)
         )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        result = await self.session.stream(stmt)
+        try:
+            async for batch in result.partitions():
+                yield batch
+        finally:
+            await result.close()
+
+    @read_only
+    async def get_plan(self, route: Route) -> Optional[dict]:
+        """
+        The plan (route_data) of a route, read from its cache entry if it stores none itself.
+        """
+        if route.route_data is not None or route.ai_cache_id is None:
+            return route.route_data
+        return await self.session.scalar(select(AICache.result).where(AICache.id == route.ai_cache_id))
+
+    async def attach_route_data(self, routes: Iterable[Route]) -> None:
+        """
+        Fill route_data of routes that reference their cache entry, with one query for all of them.
+        If the entry is gone, the plan is rebuilt from the days (needs a "summary" or "full" load).
+        Routes that aren't materialized get their days built from the plan, ids left None.
+        Values are set as loaded, so they are never written back.
+        """
+        pending = [route for route in routes if route.route_data is None or not route.materialized]
+        if not pending:
+            return
+        cache_ids = {
+            route.ai_cache_id for route in pending if route.route_data is None and route.ai_cache_id is not None
+        }
+        results = {}
+        if cache_ids:
+            logger.debug("Route repo: attaching route_data of AICache %s", cache_ids)
+            stmt = select(AICache.id, AICache.result).where(AICache.id.in_(cache_ids))
+            results = dict((await self.session.execute(stmt)).all())
+        for route in pending:
+            route_data = route.route_data
+            if route_data is None:
+                route_data = results.get(route.ai_cache_id)
+            if route_data is None:
+                days = [RouteDayCreate.model_validate(day, from_attributes=True) for day in route.days]
+                route_data = {"name": route.name, "days": [day.model_dump(mode="json") for day in days]}
+            set_committed_value(route, "route_data", route_data)
+            if not route.materialized:
+                set_committed_value(route, "days", self._plan_days(route_data))
 
     async def create(self, obj_in: RouteCreate, commit: bool = True) -> Route:
         """
@@ -119,6 +265,86 @@ class RouteRepository(BaseRepository[Route]):
         )  # in case commit=False still needs to be logged
         return new_route
 
+    async def create_with_days(self, obj_in: RouteCreate, creator_id: int, commit: bool = True) -> Route:
+        """
+        Create a route together with its days, activities and the CREATOR access entry.
+        Days of a route that isn't materialized are not written, they are read from its plan.
+        The whole graph is written by a single flush: the unit of work groups rows per table
+        into multi-row INSERT ... RETURNING statements, so the returned Route is fully
+        populated and doesn't need to be re-read.
+        """
+        logger.debug("Route repo: creating new Route with %s days", len(obj_in.days))
+        days = [self._build_day(day_data) for day_data in obj_in.days]
+        new_route = Route(
+            **obj_in.model_dump(exclude={"days"}),
+            **route_aggregates(days),
+            days=days if obj_in.materialized else [],
+            access_list=[RouteAccess(user_id=creator_id, role=RouteRole.CREATOR)],
+            exports=[],
+        )
+        self.session.add(new_route)
+        await self.session.flush()
+        if commit:  # in case commit=False all exceptions are caught in the service layer
+            try:
+                await self.session.commit()
+            except IntegrityError as e:
+                logger.debug("Route repo: IntegrityError on Route creation: %s", e)
+                await self.session.rollback()
+                raise
+            except Exception as e:
+                logger.debug("Route repo: error: %s", e)
+                await self.session.rollback()
+                raise
+
+        logger.debug("Route repo: created new Route (id=%s) with %s days", new_route.id, len(new_route.days))
+        return new_route
+
+    @read_only
+    async def list_page(
+        self,
+        limit: int,
+        user_id: Optional[int] = None,
+        after: Optional[tuple[datetime, int]] = None,
+        destination: Optional[str] = None,
+        is_public: Optional[bool] = None,
+    ) -> list:
+        """
+        One page of routes, newest first, keyset-paginated on (created_at, id).
+        Only the RouteShort columns (plus created_at for the next cursor) are selected.
+
+        :param user_id: only routes the user has any access to (EXISTS over route_access,
+            so several roles on one route don't duplicate it)
+        :param after: (created_at, id) of the last row of the previous page
+        """
+        logger.debug("Route repo: fetching page of %s Routes (user_id=%s, after=%s)", limit, user_id, after)
+        columns = [getattr(Route, name) for name in RouteShort.model_fields]
+        stmt = select(*columns, Route.created_at)
+        if user_id is not None:
+            stmt = stmt.where(
+                exists().where(RouteAccess.route_id == Route.id, RouteAccess.user_id == user_id)
+            )
+        if destination:
+            stmt = stmt.where(func.lower(Route.destination) == destination.strip().lower())
+        if is_public is not None:
+            stmt = stmt.where(Route.is_public == is_public)
+        if after is not None:
+            after_created_at, after_id = after
+            # compare with the stored timestamp of the cursor row, so the comparison is exact
+            # whatever precision the driver binds datetimes with; fall back to the cursor value
+            # if that row has been deleted meanwhile
+            stored = select(Route.created_at).where(Route.id == after_id).scalar_subquery()
+            boundary = func.coalesce(stored, after_created_at)
+            stmt = stmt.where(
+                or_(
+                    Route.created_at < boundary,
+                    and_(Route.created_at == boundary, Route.id < after_id),
+                )
+            )
+        stmt = stmt.order_by(Route.created_at.desc(), Route.id.desc()).limit(limit)
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    @read_only
     async def get_all_by_ids(self, route_ids: list[int]) -> list[Route]:
         if not route_ids:
             return []
@@ -136,14 +362,18 @@ class RouteRepository(BaseRepository[Route]):
         #     logger.debug(message, route_id)
         #     raise ValueError(message % route_id)
 
-        new_day = RouteDay(route_id=route_id, **day_data.model_dump(exclude={"activities"}))
+        activities = [Activity(**activity_data.model_dump()) for activity_data in day_data.activities]
+        new_day = RouteDay(
+            route_id=route_id, **day_data.model_dump(exclude={"activities"}), **day_aggregates(activities)
+        )
         self.session.add(new_day)
         await self.session.flush()  # flush to get day.id
 
-        for activity_data in day_data.activities:
-            activity = Activity(day_id=new_day.id, **activity_data.model_dump())
+        for activity in activities:
+            activity.day_id = new_day.id
             self.session.add(activity)
         # await self.session.flush()
+        await self._add_to_aggregates(route_id, new_day, activities)
 
         if commit:
             try:
@@ -162,6 +392,98 @@ class RouteRepository(BaseRepository[Route]):
         logger.debug("Route repo: created RouteDay (id=%s) for Route (id=%s)", new_day.id, route_id)
         return new_day
 
+    async def _add_to_aggregates(self, route_id: int, day: RouteDay, activities: List[Activity]) -> None:
+        """
+        Add a new day to the route's aggregates: the counters are incremented in SQL,
+        activity_types is merged under the route's row lock.
+        """
+        types = Counter(activity.activity_type for activity in activities if activity.activity_type)
+        values = {
+            "total_cost": Route.total_cost + day.total_cost,
+            "activity_count": Route.activity_count + day.activity_count,
+        }
+        if types:
+            stmt = select(Route.activity_types).where(Route.id == route_id).with_for_update()
+            values["activity_types"] = dict(Counter(await self.session.scalar(stmt) or {}) + types)
+        if day.date is not None:
+            values["first_date"] = case(
+                (or_(Route.first_date.is_(None), Route.first_date > day.date), day.date), else_=Route.first_date
+            )
+            values["last_date"] = case(
+                (or_(Route.last_date.is_(None), Route.last_date < day.date), day.date), else_=Route.last_date
+            )
+        stmt = update(Route).where(Route.id == route_id).values(**values).execution_options(synchronize_session="fetch")
+        await self.session.execute(stmt)
+
+    @staticmethod
+    def _build_day(day_data: RouteDayCreate) -> RouteDay:
+        """
+        Build a transient RouteDay with its activities attached and aggregated.
+        """
+        activities = [Activity(**activity_data.model_dump()) for activity_data in day_data.activities]
+        return RouteDay(
+            **day_data.model_dump(exclude={"activities"}),
+            **day_aggregates(activities),
+            activities=activities,
+        )
+
+    @classmethod
+    def _plan_days(cls, route_data: dict) -> List[RouteDay]:
+        """
+        Transient days of a plan - what a route that isn't materialized shows.
+        """
+        return [cls._build_day(RouteDayCreate(**day)) for day in route_data["days"]]
+
+    async def materialize(self, route: Route) -> None:
+        """
+        Copy-on-write: give a route its own days and activities, built from its plan.
+        The route must have been passed through attach_route_data. The guarded UPDATE
+        serializes concurrent materializations, the loser takes the winner's rows.
+        Not committed, call within a transaction.
+        """
+        if route.materialized:
+            return
+        stmt = (
+            update(Route)
+            .where(Route.id == route.id, Route.materialized.is_(False))
+            .values(materialized=True)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        set_committed_value(route, "materialized", True)
+        if result.rowcount == 0:
+            logger.debug("Route repo: Route (id=%s) materialized concurrently", route.id)
+            set_committed_value(route, "days", await self.get_days_by_route(route.id))
+            return
+        days = self._plan_days(route.route_data)
+        set_committed_value(route, "days", [])
+        route.days = days
+        await self.session.flush()
+        logger.debug("Route repo: materialized Route (id=%s) with %s days", route.id, len(days))
+
+    async def replace_day(self, route: Route, day_number: int, day_data: RouteDayUpdate) -> Optional[RouteDay]:
+        """
+        Overwrite date, description and activities of a day of a materialized route
+        and update the aggregates. Old activities are removed by the delete-orphan cascade. Not committed.
+        """
+        day = next((day for day in route.days if day.day_number == day_number), None)
+        if day is None:
+            return None
+        day.date = day_data.date
+        day.description = day_data.description
+        day.activities = [Activity(**activity_data.model_dump()) for activity_data in day_data.activities]
+        for name, value in day_aggregates(day.activities).items():
+            setattr(day, name, value)
+        # all days are loaded here, re-aggregating them is cheaper than another query
+        for name, value in route_aggregates(route.days).items():
+            setattr(route, name, value)
+        # a new version even if no route column changed (exports are cached by it)
+        route.updated_at = datetime.now(timezone.utc)
+        await self.session.flush()
+        logger.debug("Route repo: replaced RouteDay (id=%s) of Route (id=%s)", day.id, route.id)
+        return day
+
+    @read_only
     async def get_days_by_route(self, route_id: int) -> List[RouteDay]:
         """
         Get all RouteDay entries for a given route with activities.
@@ -1,14 +1,16 @@
 # app/repositories/route_access.py
 
 import logging
+from collections import defaultdict
 
-from typing import Optional, List
+from typing import Dict, Optional, List, Set
 
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from constants.roles import RouteRole
+from db.routing import read_only
 from models.route_access import RouteAccess
 from schemas.route_access import RouteAccessCreate
 from repositories.base import BaseRepository
@@ -38,6 +40,28 @@ class RouteAccessRepository(BaseRepository[RouteAccess]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_roles(self, user_id: int, route_id: int) -> List[RouteRole]:
+        """
+        All roles of a user on a route in one query
+        (served by the uq_user_route (user_id, route_id, role) index).
+        """
+        logger.debug("Route access repo: fetching roles (user_id=%s, route_id=%s)", user_id, route_id)
+        stmt = select(RouteAccess.role).where(RouteAccess.user_id == user_id, RouteAccess.route_id == route_id)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_acl(self, user_id: int) -> Dict[int, Set[RouteRole]]:
+        """
+        The whole ACL of a user in one query: route_id -> roles.
+        """
+        logger.debug("Route access repo: fetching ACL (user_id=%s)", user_id)
+        stmt = select(RouteAccess.route_id, RouteAccess.role).where(RouteAccess.user_id == user_id)
+        acl: Dict[int, Set[RouteRole]] = defaultdict(set)
+        for route_id, role in (await self.session.execute(stmt)).all():
+            acl[route_id].add(role)
+        return dict(acl)
+
+    @read_only
     async def get_all_by_user(self, user_id: int) -> List[RouteAccess]:
         """
         Get all route access entries for a given user.
@@ -47,6 +71,7 @@ class RouteAccessRepository(BaseRepository[RouteAccess]):
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    @read_only
     async def get_all_by_route(self, route_id: int) -> List[RouteAccess]:
         """
         Get all route access entries for a given route.
@@ -0,0 +1,183 @@
+# app/repositories/route_import.py
+
+import json
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import JSON, Enum, Table, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from constants.roles import RouteRole
+from models.ai_cache import AICache
+from models.route import Route, RouteDay, Activity
+from models.route_access import RouteAccess
+from models.user import User
+from schemas.route_import import RouteImportRecord
+
+from .base import BaseRepository
+from .route import day_aggregates
+
+logger = logging.getLogger(__name__)
+
+
+def _encoder(column):
+    """
+    How a value of the column is passed to COPY: JSON as text, enums by name (as SQLAlchemy stores them).
+    """
+    if isinstance(column.type, JSON):
+        return lambda value: None if value is None else json.dumps(value)
+    if isinstance(column.type, Enum):
+        return lambda value: value.name if value is not None else None
+    return None
+
+
+def _default(column, now: datetime):
+    default = column.default
+    if default is None:
+        return None
+    if default.is_scalar:
+        return default.arg
+    if default.is_callable:
+        return default.arg(None)
+    return now  # func.now()
+
+
+class RouteImportRepository(BaseRepository[Route]):
+    """
+    Bulk writes of imported routes with their days, activities and access entries.
+    Ids are assigned up front (drawn from the sequences on PostgreSQL), so every table of
+    a chunk is written with one statement without RETURNING: COPY on asyncpg, an executemany
+    INSERT elsewhere. Nothing is committed here.
+    """
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(Route, session)
+
+    async def existing_user_ids(self, ids: Iterable[int]) -> set[int]:
+        ids = set(ids)
+        if not ids:
+            return set()
+        return set((await self.session.scalars(select(User.id).where(User.id.in_(ids)))).all())
+
+    async def existing_cache_ids(self, ids: Iterable[int]) -> set[int]:
+        ids = set(ids)
+        if not ids:
+            return set()
+        return set((await self.session.scalars(select(AICache.id).where(AICache.id.in_(ids)))).all())
+
+    async def existing_share_codes(self, codes: Iterable[str]) -> set[str]:
+        codes = set(codes)
+        if not codes:
+            return set()
+        return set((await self.session.scalars(select(Route.share_code).where(Route.share_code.in_(codes)))).all())
+
+    async def insert(self, records: List[RouteImportRecord]) -> int:
+        """
+        Write the records, return the number of rows written.
+        """
+        copy = self.session.get_bind().dialect.driver == "asyncpg"
+        now = datetime.now(timezone.utc)
+        tables = await self._build_rows(records, self._next_ids if copy else self._next_ids_unsequenced)
+        for table, rows in tables:
+            if copy:
+                await self._copy_rows(table, rows, now)
+            else:
+                await self._insert_rows(table, rows, now)
+        count = sum(len(rows) for _, rows in tables)
+        logger.debug("Route import repo: wrote %s routes (%s rows)", len(records), count)
+        return count
+
+    async def _next_ids(self, table: Table, count: int) -> List[int]:
+        if not count:
+            return []
+        stmt = text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)")
+        return list((await self.session.scalars(stmt, {"table": table.name, "count": count})).all())
+
+    async def _next_ids_unsequenced(self, table: Table, count: int) -> List[int]:
+        # databases without sequences (SQLite in development and tests) have a single writer
+        last = await self.session.scalar(select(func.max(table.c.id)))
+        return list(range((last or 0) + 1, (last or 0) + 1 + count))
+
+    async def _build_rows(self, records: List[RouteImportRecord], next_ids) -> List[Tuple[Table, List[dict]]]:
+        """
+        Column values of all rows of the records, per table in insert order, with ids assigned.
+        """
+        route_rows, day_rows, activity_rows, access_rows = [], [], [], []
+        route_ids = iter(await next_ids(Route.__table__, len(records)))
+        day_ids = iter(await next_ids(RouteDay.__table__, sum(len(r.days) for r in records if r.materialized)))
+        for record in records:
+            route_id = next(route_ids)
+            total_cost, types, dates = 0.0, Counter(), []
+            for day in record.days:
+                aggregates = day_aggregates(day.activities)
+                total_cost += aggregates["total_cost"]
+                types.update(activity.activity_type for activity in day.activities if activity.activity_type)
+                if day.date is not None:
+                    dates.append(day.date)
+                if not record.materialized:
+                    continue
+                day_id = next(day_ids)
+                day_rows.append(
+                    {**day.model_dump(exclude={"activities"}), **aggregates, "id": day_id, "route_id": route_id}
+                )
+                activity_rows.extend({**activity.model_dump(), "day_id": day_id} for activity in day.activities)
+            route_rows.append(
+                {
+                    **record.model_dump(exclude={"days", "access"}),
+                    "id": route_id,
+                    "total_cost": total_cost,
+                    "activity_count": sum(len(day.activities) for day in record.days),
+                    "activity_types": dict(types),
+                    "first_date": min(dates, default=None),
+                    "last_date": max(dates, default=None),
+                }
+            )
+            access_rows.append({"route_id": route_id, "user_id": record.owner_id, "role": RouteRole.CREATOR})
+            access_rows.extend({"route_id": route_id, "user_id": g.user_id, "role": g.role} for g in record.access)
+
+        for row, activity_id in zip(activity_rows, await next_ids(Activity.__table__, len(activity_rows))):
+            row["id"] = activity_id
+        for row, access_id in zip(access_rows, await next_ids(RouteAccess.__table__, len(access_rows))):
+            row["id"] = access_id
+        return [
+            (Route.__table__, route_rows),
+            (RouteDay.__table__, day_rows),
+            (Activity.__table__, activity_rows),
+            (RouteAccess.__table__, access_rows),
+        ]
+
+    @staticmethod
+    def _complete(table: Table, rows: List[dict], now: datetime, encode: bool) -> List[list]:
+        """
+        Rows as lists of all column values of the table, column defaults filled in.
+        """
+        columns = list(table.columns)
+        defaults = [_default(column, now) for column in columns]
+        encoders = [_encoder(column) if encode else None for column in columns]
+        records = []
+        for row in rows:
+            record = []
+            for column, default, encoder in zip(columns, defaults, encoders):
+                value = row.get(column.key, default)
+                record.append(encoder(value) if encoder is not None else value)
+            records.append(record)
+        return records
+
+    async def _copy_rows(self, table: Table, rows: List[dict], now: datetime) -> None:
+        if not rows:
+            return
+        connection = await (await self.session.connection()).get_raw_connection()
+        await connection.driver_connection.copy_records_to_table(
+            table.name,
+            records=self._complete(table, rows, now, encode=True),
+            columns=[column.name for column in table.columns],
+        )
+
+    async def _insert_rows(self, table: Table, rows: List[dict], now: datetime) -> None:
+        if not rows:
+            return
+        keys = [column.key for column in table.columns]
+        values = [dict(zip(keys, record)) for record in self._complete(table, rows, now, encode=False)]
+        await self.session.execute(insert(table), values)
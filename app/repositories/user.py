@@ -3,9 +3,10 @@
 import logging
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 
+from db.routing import read_only
 from models.user import User
 from schemas.user import UserCreate
 from repositories.base import BaseRepository
@@ -41,6 +42,7 @@ class UserRepository(BaseRepository[User]):
             await self.session.rollback()
             raise
 
+    @read_only
     async def get_by_telegram_id(self, telegram_id: int) -> User | None:
         """Get user by telegram_id"""
         logger.debug("User repo: fetching User (telegram_id=%s)", telegram_id)
@@ -48,6 +50,7 @@ class UserRepository(BaseRepository[User]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    @read_only
     async def get_by_username(self, username: str) -> User | None:
         """Get user by username"""
         logger.debug("User repo: fetching User (username=%s)", username)
@@ -55,11 +58,28 @@ class UserRepository(BaseRepository[User]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    @read_only
     async def get_by_email(self, email: str) -> User | None:
         stmt = select(User).where(User.email == email)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def set_active(self, user_id: int, is_active: bool) -> User | None:
+        user = await self.get(user_id)
+        if not user:
+            logger.debug("User repo: User (id=%s) not found", user_id)
+            return None
+        user.is_active = is_active
+        await self.session.commit()
+        await self.session.refresh(user)
+        logger.debug("User repo: User (id=%s) is_active=%s", user_id, is_active)
+        return user
+
+    async def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        await self.session.execute(update(User).where(User.id == user_id).values(password_hash=password_hash))
+        await self.session.commit()
+        logger.debug("User repo: updated password hash of User (id=%s)", user_id)
+
     async def delete_by_telegram_id(self, telegram_id: int) -> bool:
         """
         Delete a RouteDay by ID.
@@ -22,6 +22,10 @@ class ExportCreate(ExportBase):
         return v
 
 
+class ExportRequest(BaseModel):
+    export_type: ExportType = ExportType.PDF
+
+
 class ExportRead(ExportBase):
     id: int
     status: ExportStatus
@@ -0,0 +1,20 @@
+# app/schemas/generation_job.py
+
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+from models.generation_job import GenerationJobStatus
+
+
+class GenerationJobRead(BaseModel):
+    id: int
+    status: GenerationJobStatus
+    progress: int
+    route_id: Optional[int] = None
+    error_message: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
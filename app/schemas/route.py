@@ -38,7 +38,8 @@ class ActivityCreate(ActivityBase):
 
 
 class ActivityRead(ActivityBase):
-    id: int
+    # None for days of a route that is not materialized yet
+    id: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -65,8 +66,17 @@ class RouteDayCreate(RouteDayBase):
         return value
 
 
+class RouteDayUpdate(BaseModel):
+    date: Optional[date]
+    description: Optional[str] = None
+    activities: List[ActivityCreate] = []
+
+
 class RouteDayRead(RouteDayBase):
-    id: int
+    # None for days of a route that is not materialized yet
+    id: Optional[int] = None
+    total_cost: float = 0.0
+    activity_count: int = 0
     # date: Optional[date]
     activities: List[ActivityRead] = []
 
@@ -111,10 +121,11 @@ class RouteCreate(RouteGenerateRequest):
     name: str
     share_code: str
     owner_id: int
-    route_data: dict
+    route_data: Optional[dict] = None
     days: List[RouteDayCreate] = []
     ai_cache_id: Optional[int] = None
     last_edited_by: Optional[int] = None
+    materialized: bool = True
 
     @field_validator("origin", "destination")
     @classmethod
@@ -155,19 +166,26 @@ class RouteShort(BaseModel):
     duration_days: int
     budget: float
     interests: List[str]
+    # aggregates of the itinerary
+    total_cost: float = 0.0
+    activity_count: int = 0
+    activity_types: dict[str, int] = {}
+    first_date: Optional[date] = None
+    last_date: Optional[date] = None
 
     class Config:
         from_attributes = True
 
 
 class RouteRead(RouteShort):
-    route_data: dict
+    route_data: Optional[dict] = None
     days: List[RouteDayRead] = []
     ai_cache_id: Optional[int]
     last_edited_by: Optional[int]
     access_list: List[RouteAccessRead] = []
     exports: List[ExportRead] = []
     is_public: bool
+    materialized: bool = True
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,44 @@
+# app/schemas/route_import.py
+
+from typing import List
+from pydantic import BaseModel, Field, model_validator
+
+from constants.roles import RouteRole
+from utils.utils import generate_nanoid_code
+from .route import RouteCreate
+
+
+class RouteImportAccess(BaseModel):
+    user_id: int
+    role: RouteRole = RouteRole.VIEWER
+
+
+class RouteImportRecord(RouteCreate):
+    """
+    One NDJSON line of a bulk import: a RouteCreate whose share_code may be omitted,
+    plus access grants besides the owner's CREATOR entry.
+    """
+
+    share_code: str = Field(default_factory=generate_nanoid_code)
+    access: List[RouteImportAccess] = []
+
+    @model_validator(mode="after")
+    def validate_plan(self) -> "RouteImportRecord":
+        if not self.materialized and self.route_data is None and self.ai_cache_id is None:
+            raise ValueError("A route that isn't materialized needs route_data or ai_cache_id")
+        return self
+
+
+class RouteImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class RouteImportReport(BaseModel):
+    received: int = 0
+    imported: int = 0
+    failed: int = 0
+    # rows written to routes, route_days, activities and route_access
+    rows: int = 0
+    # the first ROUTE_IMPORT_MAX_ERRORS failures
+    errors: List[RouteImportError] = []
@@ -0,0 +1 @@
+# app/scripts/__init__.py
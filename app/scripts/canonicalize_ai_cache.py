@@ -0,0 +1,42 @@
+# app/scripts/canonicalize_ai_cache.py
+
+"""
+Backfill: rewrite ai_cache rows to canonical cache keys and collapse duplicates
+("NYC" / "New York" / "Нью-Йорк" entries become one).
+
+Run from the app directory:
+
+    python -m scripts.canonicalize_ai_cache [--dry-run]
+"""
+
+import argparse
+import asyncio
+import logging
+
+from db.sessions import async_session_factory
+from repositories.ai_cache import AICacheRepository
+from services.cache_service import AICacheService
+from utils.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+async def main(dry_run: bool) -> dict:
+    async with async_session_factory() as session:
+        report = await AICacheService(AICacheRepository(session)).canonicalize_keys(dry_run=dry_run)
+    logger.info(
+        "%s: scanned %s entries, %s keys rewritten, %s duplicates collapsed",
+        "Dry run" if dry_run else "Done",
+        report["scanned"],
+        report["rekeyed"],
+        report["collapsed"],
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    args = parser.parse_args()
+    setup_logging()
+    asyncio.run(main(args.dry_run))
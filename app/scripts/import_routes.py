@@ -0,0 +1,62 @@
+# app/scripts/import_routes.py
+
+"""
+Bulk import of routes from NDJSON, one RouteImportRecord (a RouteCreate whose
+share_code may be omitted, plus optional "access" grants) per line.
+
+Run from the app directory:
+
+    python -m scripts.import_routes routes.ndjson [--chunk-size N] [--errors errors.ndjson]
+    cat routes.ndjson | python -m scripts.import_routes -
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from db.sessions import async_session_factory
+from repositories.route_import import RouteImportRepository
+from services.crud.route_import_service import RouteImportService
+from utils.logging_config import setup_logging
+from utils.ndjson import aiter_sync
+
+logger = logging.getLogger(__name__)
+
+
+async def main(path: str, chunk_size: int | None, errors_path: str | None) -> dict:
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        async with async_session_factory() as session:
+            # the CLI keeps every error, the report is written to a file rather than returned over HTTP
+            svc = RouteImportService(RouteImportRepository(session), chunk_size=chunk_size, max_errors=sys.maxsize)
+            report = await svc.import_ndjson(aiter_sync(source))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    if errors_path:
+        with open(errors_path, "w", encoding="utf-8") as f:
+            for error in report.errors:
+                f.write(error.model_dump_json() + "\n")
+    else:
+        for error in report.errors:
+            logger.warning("Line %s: %s", error.line, error.detail)
+    logger.info(
+        "Done: %s of %s routes imported (%s rows), %s failed",
+        report.imported,
+        report.received,
+        report.rows,
+        report.failed,
+    )
+    return report.model_dump(exclude={"errors"})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="NDJSON file, - for stdin")
+    parser.add_argument("--chunk-size", type=int, default=None, help="records per COPY (ROUTE_IMPORT_CHUNK_SIZE)")
+    parser.add_argument("--errors", default=None, help="write failed lines as NDJSON here instead of logging them")
+    args = parser.parse_args()
+    setup_logging()
+    asyncio.run(main(args.path, args.chunk_size, args.errors))
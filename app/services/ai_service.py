@@ -0,0 +1,182 @@
+# app/services/ai_service.py
+
+import hashlib
+import json
+import logging
+from typing import AsyncIterator, List, Optional
+
+import httpx
+
+from schemas.route import RouteDayCreate
+from utils.config import settings
+from utils.json_stream import JSONArrayStream
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = (
+    "You are a travel planner. Answer with a single JSON object and nothing else: "
+    '{"name": str, "days": [{"day_number": int, "date": null, "description": str, '
+    '"activities": [{"name": str, "description": str, "start_time": "HH:MM", "end_time": "HH:MM", '
+    '"location": str, "cost": float, "activity_type": str}]}]}. '
+    'Put "name" first and list the days in order.'
+)
+
+
+def hash_prompt(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class RouteStreamParser:
+    """
+    Builds validated RouteDayCreate objects from a streamed completion, one day at a time.
+    """
+
+    def __init__(self):
+        self._stream = JSONArrayStream("days")
+        self.days: List[RouteDayCreate] = []
+        self.result: Optional[dict] = None
+
+    def feed(self, chunk: str) -> List[RouteDayCreate]:
+        """
+        Consume a piece of the completion and return the days it completed.
+        Raises:
+            pydantic.ValidationError: If a completed day is not a valid RouteDayCreate.
+        """
+        new_days = [RouteDayCreate(**day) for day in self._stream.feed(chunk)]
+        self.days.extend(new_days)
+        return new_days
+
+    def close(self) -> dict:
+        """
+        Finish parsing and return the whole plan.
+        Raises:
+            ValueError: If the completion is incomplete or has no days.
+        """
+        result = self._stream.close()
+        if not isinstance(result, dict) or not result.get("name") or not result.get("days"):
+            raise ValueError("AI response is not a route plan")
+        self.result = result
+        return result
+
+
+class AIService:
+    """
+    Client for an OpenAI-compatible chat completions API.
+    Completions are always streamed, so the plan can be consumed day by day.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        model: str,
+        timeout: float = 120.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                transport=self._transport,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def build_prompt(
+        origin: str,
+        destination: str,
+        duration_days: int,
+        budget: float,
+        interests: Optional[List[str]] = None,
+    ) -> str:
+        prompt = (
+            f"Plan a {duration_days}-day trip from {origin} to {destination} "
+            f"with a total budget of {budget:g} USD."
+        )
+        if interests:
+            prompt += f" Interests: {', '.join(interests)}."
+        return prompt
+
+    async def stream_completion(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yield content deltas of a streamed chat completion.
+        Raises:
+            httpx.HTTPError: On transport errors or a non-2xx response.
+        """
+        body = {
+            "model": self.model,
+            "stream": True,
+            "response_format": {"type": "json_object"},
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+        }
+        async with self.client.stream("POST", "/chat/completions", json=body) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                content = choices[0].get("delta", {}).get("content") if choices else None
+                if content:
+                    yield content
+
+    async def stream_route(self, prompt: str, parser: Optional[RouteStreamParser] = None) -> AsyncIterator[RouteDayCreate]:
+        """
+        Yield RouteDayCreate objects as soon as each day of the plan is complete.
+        The whole plan is available as `parser.result` once the iteration finishes.
+        """
+        parser = parser or RouteStreamParser()
+        async for chunk in self.stream_completion(prompt):
+            for day in parser.feed(chunk):
+                yield day
+        parser.close()
+        logger.info("AI service: received plan with %s days", len(parser.days))
+
+    async def generate_route(self, prompt: str) -> dict:
+        """
+        Generate a whole plan.
+        """
+        parser = RouteStreamParser()
+        async for _ in self.stream_route(prompt, parser):
+            pass
+        return parser.result
+
+
+_ai_service: Optional[AIService] = None
+
+
+def get_ai_service() -> Optional[AIService]:
+    """
+    Process-wide AIService (sharing one connection pool), or None if AI is disabled.
+    """
+    global _ai_service
+    if not settings.AI_ENABLED:
+        return None
+    if _ai_service is None:
+        _ai_service = AIService(
+            api_key=settings.CHATGPT_API_KEY,
+            base_url=settings.AI_API_BASE_URL,
+            model=settings.AI_MODEL,
+            timeout=settings.AI_TIMEOUT,
+        )
+    return _ai_service
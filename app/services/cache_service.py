@@ -0,0 +1,401 @@
+# app/services/cache_service.py
+
+import copy
+import logging
+import time
+from datetime import datetime, timezone
+from collections import defaultdict
+from typing import Iterable, List, Optional
+
+from repositories.ai_cache import AICacheRepository
+from schemas.ai_cache import AICacheCreate, AICacheRead
+from utils.cache import TTLCache
+from utils.cache_keys import build_cache_key, normalize_budget, normalize_location
+from utils.config import settings
+from utils.invalidation import InvalidationBus, invalidation_bus
+from utils.metrics import register_metrics
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class RedisCacheTier:
+    """
+    Redis-backed L2 tier storing JSON strings under a key prefix.
+    Any Redis error is logged and treated as a miss; after an error the tier
+    is skipped for `backoff` seconds so a dead Redis doesn't slow down every lookup.
+    """
+
+    def __init__(self, prefix: str, ttl: int, client=None, backoff: float = 5.0):
+        """
+        :param prefix: namespace for keys of this tier
+        :param ttl: default time-to-live in seconds
+        :param client: asyncio Redis client, by default the shared one from utils.redis_client
+        :param backoff: seconds to skip Redis after a failure
+        """
+        self.prefix = prefix
+        self.ttl = ttl
+        self._client = client
+        self.backoff = backoff
+        self._disabled_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def client(self):
+        if self._client is not None:
+            return self._client
+        return get_redis()
+
+    def _available(self):
+        client = self.client
+        if client is None or time.monotonic() < self._disabled_until:
+            return None
+        return client
+
+    def _failed(self, action: str, e: Exception) -> None:
+        self.errors += 1
+        self._disabled_until = time.monotonic() + self.backoff
+        logger.warning("Cache L2: %s failed, skipping Redis for %ss: %s", action, self.backoff, e)
+
+    async def get(self, key: str) -> Optional[str]:
+        client = self._available()
+        if client is None:
+            return None
+        try:
+            value = await client.get(self.prefix + key)
+        except Exception as e:
+            self._failed("get", e)
+            return None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        client = self._available()
+        ttl = self.ttl if ttl is None else ttl
+        if client is None or ttl <= 0:
+            return
+        try:
+            await client.set(self.prefix + key, value, ex=ttl)
+        except Exception as e:
+            self._failed("set", e)
+
+    async def delete(self, *keys: str) -> None:
+        client = self._available()
+        if client is None or not keys:
+            return
+        try:
+            await client.delete(*(self.prefix + key for key in keys))
+        except Exception as e:
+            self._failed("delete", e)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.client is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# process-wide tiers, shared by every AICacheService instance
+ai_cache_l1: TTLCache[AICacheRead] = TTLCache(maxsize=settings.AI_CACHE_L1_SIZE, ttl=settings.AI_CACHE_L1_TTL)
+ai_cache_l2 = RedisCacheTier(prefix="ai_cache:", ttl=settings.AI_CACHE_L2_TTL)
+ai_cache_db_stats = {"hits": 0, "near_hits": 0, "adapted": 0, "misses": 0, "collapsed": 0}
+
+# invalidations of L1 entries in every process: by cache_key, and by id of the entry
+# they were read from - near matches are kept under the requested key, only their id
+# ties them to the entry
+AI_CACHE_KEY_TOPIC = "ai_cache:key"
+AI_CACHE_ID_TOPIC = "ai_cache:id"
+
+
+def drop_l1_keys(l1: TTLCache, cache_keys: Optional[list]) -> None:
+    if cache_keys is None:
+        l1.clear()
+        return
+    for cache_key in cache_keys:
+        l1.pop(cache_key)
+
+
+def drop_l1_ids(l1: TTLCache, cache_ids: Optional[list]) -> None:
+    if cache_ids is None:
+        l1.clear()
+        return
+    cache_ids = set(cache_ids)
+    for cache_key, entry in l1.items():
+        if entry.id in cache_ids:
+            l1.pop(cache_key)
+
+
+invalidation_bus.subscribe(AI_CACHE_KEY_TOPIC, lambda keys: drop_l1_keys(ai_cache_l1, keys))
+invalidation_bus.subscribe(AI_CACHE_ID_TOPIC, lambda ids: drop_l1_ids(ai_cache_l1, ids))
+
+register_metrics(
+    "ai_cache",
+    lambda: {"l1": ai_cache_l1.stats(), "l2": ai_cache_l2.stats(), "db": dict(ai_cache_db_stats)},
+)
+
+
+def interest_overlap(a: Optional[List[str]], b: Optional[List[str]]) -> float:
+    """
+    Jaccard similarity of two interest lists (case-insensitive), 0 if either is empty.
+    """
+    left = {i.strip().lower() for i in a or []}
+    right = {i.strip().lower() for i in b or []}
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def adapt_plan(result: dict, duration_days: int) -> dict:
+    """
+    Fit a cached plan to another duration: extra days are trimmed from the end,
+    missing days are appended as free days without activities.
+    """
+    days = result.get("days", [])
+    if len(days) == duration_days:
+        return result
+    adapted = copy.deepcopy(result)
+    adapted["days"] = adapted["days"][:duration_days]
+    for day_number in range(len(adapted["days"]) + 1, duration_days + 1):
+        adapted["days"].append(
+            {"day_number": day_number, "date": None, "description": "Free day", "activities": []}
+        )
+    return adapted
+
+
+class AICacheService:
+    """
+    Tiered lookup in front of AICacheRepository.find_similar:
+    L1 - bounded in-process LRU/TTL cache, L2 - Redis, then Postgres.
+    Entries are keyed by the normalized cache_key and kept as AICacheRead snapshots,
+    so a cache hit never touches the database session; deleted and merged entries
+    are dropped from L1 of every process through the invalidation bus.
+    """
+
+    def __init__(
+        self,
+        repo: AICacheRepository,
+        l1: Optional[TTLCache] = None,
+        l2: Optional[RedisCacheTier] = None,
+        near_match: Optional[bool] = None,
+        bus: Optional[InvalidationBus] = None,
+    ):
+        self.repo = repo
+        self.l1 = ai_cache_l1 if l1 is None else l1
+        self.l2 = ai_cache_l2 if l2 is None else l2
+        self.bus = invalidation_bus if bus is None else bus
+        self.near_match = settings.AI_CACHE_NEAR_MATCH if near_match is None else near_match
+
+    @staticmethod
+    def _ttl_for(entry: AICacheRead, default: int) -> int:
+        """
+        Never keep an entry in a tier longer than its own expires_at.
+        """
+        if entry.expires_at is None:
+            return default
+        expires_at = entry.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        remaining = int((expires_at - datetime.now(timezone.utc)).total_seconds())
+        return max(0, min(default, remaining))
+
+    async def _store(self, entry: AICacheRead) -> None:
+        self.l1.set(entry.cache_key, entry, ttl=self._ttl_for(entry, self.l1.ttl))
+        await self.l2.set(entry.cache_key, entry.model_dump_json(), ttl=self._ttl_for(entry, self.l2.ttl))
+
+    @staticmethod
+    def _places(origin: str, destination: str) -> list[tuple[str, str]]:
+        """
+        (origin, destination) as entries are stored - exact names and aliases resolved -
+        and then, if it differs, with misspellings fuzzy matched to known places.
+        Fuzzy matches are only looked up, never written into an entry.
+        """
+        exact = (normalize_location(origin, fuzzy=False), normalize_location(destination, fuzzy=False))
+        fuzzy = (normalize_location(origin), normalize_location(destination))
+        return [exact] if fuzzy == exact else [exact, fuzzy]
+
+    async def find_similar(
+        self,
+        origin: str,
+        destination: str,
+        duration_days: int,
+        budget: float,
+        interests: Optional[List[str]] = None,
+    ) -> Optional[AICacheRead]:
+        """
+        Find a cache entry for the given parameters, checking L1, L2 and the database in order,
+        for the places as given and then as fuzzy matched (see _places).
+        Without an exact entry, falls back to a near match (see find_near).
+        """
+        for place_origin, place_destination in self._places(origin, destination):
+            cache_key = build_cache_key(place_origin, place_destination, duration_days, budget, fuzzy=False)
+
+            entry = self.l1.get(cache_key)
+            if entry is not None:
+                logger.debug("AICache service: L1 hit key=%s", cache_key)
+                return entry
+
+            raw = await self.l2.get(cache_key)
+            if raw is not None:
+                logger.debug("AICache service: L2 hit key=%s", cache_key)
+                entry = AICacheRead.model_validate_json(raw)
+                self.l1.set(cache_key, entry, ttl=self._ttl_for(entry, self.l1.ttl))
+                return entry
+
+            cached = await self.repo.find_similar(
+                origin=place_origin,
+                destination=place_destination,
+                duration_days=duration_days,
+                budget=normalize_budget(budget),
+            )
+            if cached is not None:
+                ai_cache_db_stats["hits"] += 1
+                entry = AICacheRead.model_validate(cached)
+                await self._store(entry)
+                return entry
+
+        return await self.find_near(origin, destination, duration_days, budget, interests)
+
+    async def find_near(
+        self,
+        origin: str,
+        destination: str,
+        duration_days: int,
+        budget: float,
+        interests: Optional[List[str]] = None,
+    ) -> Optional[AICacheRead]:
+        """
+        Best entry within the configured budget/duration tolerance bands, ranked by
+        duration distance, interest overlap and budget distance. Its plan is adapted
+        to the requested duration; the id stays that of the source entry.
+        The result is kept in L1 under the requested key only, so it is never
+        mistaken for a real entry in Redis and expires with the L1 TTL.
+        """
+        if not self.near_match:
+            ai_cache_db_stats["misses"] += 1
+            return None
+
+        candidates = []
+        for place_origin, place_destination in self._places(origin, destination):
+            candidates += await self.repo.find_near(
+                origin=place_origin,
+                destination=place_destination,
+                duration_days=duration_days,
+                budget=normalize_budget(budget),
+                budget_tolerance=settings.AI_CACHE_BUDGET_TOLERANCE,
+                duration_tolerance=settings.AI_CACHE_DURATION_TOLERANCE,
+                limit=settings.AI_CACHE_NEAR_CANDIDATES,
+            )
+        if not candidates:
+            ai_cache_db_stats["misses"] += 1
+            return None
+
+        best = min(
+            candidates,
+            key=lambda c: (
+                abs(c.duration_days - duration_days),
+                -interest_overlap(c.interests, interests),
+                abs(c.budget - budget),
+            ),
+        )
+        ai_cache_db_stats["near_hits"] += 1
+        entry = AICacheRead.model_validate(best)
+        if entry.duration_days != duration_days:
+            ai_cache_db_stats["adapted"] += 1
+            entry = entry.model_copy(update={"result": adapt_plan(entry.result, duration_days)})
+        cache_key = build_cache_key(origin, destination, duration_days, budget, fuzzy=False)
+        logger.info("AICache service: near match key=%s for key=%s", entry.cache_key, cache_key)
+        self.l1.set(cache_key, entry, ttl=self._ttl_for(entry, self.l1.ttl))
+        return entry
+
+    async def create(self, obj_in: AICacheCreate) -> AICacheRead:
+        """
+        Create a cache entry and write it through to L1 and L2.
+        """
+        cached = await self.repo.create(obj_in)
+        entry = AICacheRead.model_validate(cached)
+        await self._store(entry)
+        return entry
+
+    async def increment_hit_count(self, cache_id: int, commit: bool = True) -> None:
+        await self.repo.increment_hit_count(cache_id, commit=commit)
+
+    async def invalidate(self, *cache_keys: str, cache_ids: Iterable[int] = ()) -> None:
+        """
+        Drop entries from L2 and, through the invalidation bus, from L1 of every process:
+        by cache_key, and by id (`cache_ids`) for entries that were deleted or merged.
+        """
+        cache_ids = list(cache_ids)
+        if self.l1 is not ai_cache_l1:  # only the shared L1 is subscribed to the bus
+            drop_l1_keys(self.l1, list(cache_keys))
+            drop_l1_ids(self.l1, cache_ids)
+        await self.l2.delete(*cache_keys)
+        if cache_keys:
+            await self.bus.publish(AI_CACHE_KEY_TOPIC, *cache_keys)
+        if cache_ids:
+            await self.bus.publish(AI_CACHE_ID_TOPIC, *cache_ids)
+
+    async def delete_expired(self, before: Optional[datetime] = None) -> int:
+        """
+        Delete expired entries from the database and drop them from both tiers.
+        """
+        deleted = await self.repo.delete_expired_entries(before)
+        await self.invalidate(*(cache_key for _, cache_key in deleted), cache_ids=(cache_id for cache_id, _ in deleted))
+        return len(deleted)
+
+    async def canonicalize_keys(self, dry_run: bool = False) -> dict:
+        """
+        Rewrite every entry to its canonical cache_key (see utils.places) and collapse
+        entries that turn out to be duplicates: the most used one is kept, hit counts
+        are summed and routes are repointed to it. Runs in a single transaction.
+        Collapsing can't be undone, so only exact names and aliases are resolved here,
+        never fuzzy matches. Stale keys and merged duplicates are invalidated in every worker.
+        Returns counts of scanned, rekeyed and collapsed entries.
+        """
+        rows = await self.repo.get_key_fields()
+        groups = defaultdict(list)
+        for row in rows:
+            groups[build_cache_key(row.origin, row.destination, row.duration_days, row.budget, fuzzy=False)].append(row)
+
+        rekeyed = collapsed = 0
+        stale_keys, merged_ids = [], []
+        for cache_key, group in groups.items():
+            keeper = max(group, key=lambda r: (r.hit_count, -r.id))
+            duplicates = [r for r in group if r is not keeper]
+            if keeper.cache_key == cache_key and not duplicates:
+                continue
+            rekeyed += 1
+            collapsed += len(duplicates)
+            stale_keys.extend(r.cache_key for r in group if r.cache_key != cache_key)
+            merged_ids.extend(r.id for r in duplicates)
+            logger.info(
+                "AICache service: %s -> %s (%s duplicates)",
+                [r.cache_key for r in group],
+                cache_key,
+                len(duplicates),
+            )
+            if dry_run:
+                continue
+            await self.repo.merge_into(
+                keeper.id,
+                [r.id for r in duplicates],
+                cache_key=cache_key,
+                origin=normalize_location(keeper.origin, fuzzy=False),
+                destination=normalize_location(keeper.destination, fuzzy=False),
+                hit_count=sum(r.hit_count for r in group),
+            )
+
+        if not dry_run:
+            await self.repo.session.commit()
+            # other workers may still hold the deleted duplicates, also under near-match keys
+            await self.invalidate(*stale_keys, cache_ids=merged_ids)
+            ai_cache_db_stats["collapsed"] += collapsed
+        return {"scanned": len(rows), "rekeyed": rekeyed, "collapsed": collapsed}
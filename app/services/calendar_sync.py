@@ -0,0 +1,62 @@
+# app/services/calendar_sync.py
+
+import logging
+import os
+from typing import AsyncIterable, Optional
+
+from models.export import Export
+from utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CalendarSyncBackend:
+    """
+    Destination of calendar exports. A backend receives the route's iCalendar
+    stream (RouteService.export_route_calendar) and returns the id of what it
+    created - an event list, a calendar, a file - which is stored as Export.external_id.
+    New backends are added to CALENDAR_BACKENDS and selected with CALENDAR_SYNC_BACKEND.
+    """
+
+    name = "base"
+
+    async def push(self, export: Export, calendar: AsyncIterable[bytes]) -> str:
+        raise NotImplementedError
+
+
+class FileCalendarBackend(CalendarSyncBackend):
+    """
+    Writes the calendar to <directory>/route-<route_id>.ics, replacing the previous
+    sync of the route (as a calendar service would update its events).
+    Works offline: for development, tests, and as a drop folder for other tools.
+    """
+
+    name = "file"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    async def push(self, export: Export, calendar: AsyncIterable[bytes]) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"route-{export.route_id}.ics")
+        tmp_path = f"{path}.{export.id}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                async for chunk in calendar:
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        logger.debug("File calendar backend: Route (id=%s) written to %s", export.route_id, path)
+        return path
+
+
+CALENDAR_BACKENDS = {"file": lambda: FileCalendarBackend(settings.CALENDAR_SYNC_DIR)}
+
+
+def get_calendar_backend() -> Optional[CalendarSyncBackend]:
+    """The configured backend, None if calendar sync is off."""
+    if settings.CALENDAR_SYNC_BACKEND == "none":
+        return None
+    return CALENDAR_BACKENDS[settings.CALENDAR_SYNC_BACKEND]()
@@ -0,0 +1,81 @@
+# app/services/crud/export_service.py
+
+import asyncio
+import logging
+from typing import BinaryIO, List
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from models.export import Export, ExportStatus, ExportType
+from repositories.export import ExportRepository
+from exceptions.export import ExportNotFoundError, ExportNotReadyError
+from services.export_worker import export_workers
+
+logger = logging.getLogger(__name__)
+
+
+class ExportService:
+    """
+    Service layer for route exports, rendered asynchronously by the export workers.
+    Route access is checked by the caller.
+    Throws ExportNotFoundError, ExportNotReadyError.
+    """
+
+    def __init__(self, export_repo: ExportRepository, session_factory: async_sessionmaker[AsyncSession]):
+        self.export_repo = export_repo
+        self.session_factory = session_factory
+
+    async def enqueue_export(self, route_id: int, user_id: int, export_type: ExportType) -> Export:
+        """
+        Store a QUEUED export and wake up the local worker pool.
+        """
+        export = await self.export_repo.create(route_id=route_id, user_id=user_id, export_type=export_type)
+        export_workers.start(self.session_factory)
+        export_workers.submit(export.id)
+        logger.info(
+            "Export service: Export (id=%s) of Route (id=%s) queued by user_id=%s", export.id, route_id, user_id
+        )
+        return export
+
+    async def list_exports(self, route_id: int) -> List[Export]:
+        return await self.export_repo.list_by_route(route_id)
+
+    async def get_export(self, route_id: int, export_id: int) -> Export:
+        """
+        Get an export of the route.
+        Raises:
+            ExportNotFoundError: If export does not exist or belongs to another route.
+        """
+        export = await self.export_repo.get(export_id)
+        if not export or export.route_id != route_id:
+            message = "Export service: Export (id=%s) of Route (id=%s) not found"
+            logger.warning(message, export_id, route_id)
+            raise ExportNotFoundError(message % (export_id, route_id))
+        return export
+
+    async def open_export_file(self, route_id: int, export_id: int) -> BinaryIO:
+        """
+        Open the rendered file of an export. It is opened right away, so a file evicted
+        from the artifact store afterwards is still sent in full; the caller closes it.
+        Raises:
+            ExportNotFoundError: If export does not exist or belongs to another route.
+            ExportNotReadyError: If export has not been rendered (yet) or its file is gone.
+        A SUCCESS PDF export whose file was evicted from the artifact store is queued to be
+        rendered again, from the current version of the route; it can be downloaded once done.
+        """
+        export = await self.get_export(route_id, export_id)
+        if export.status == ExportStatus.SUCCESS and export.file_path:
+            try:
+                return await asyncio.to_thread(open, export.file_path, "rb")
+            except FileNotFoundError:
+                pass
+        if export.status == ExportStatus.SUCCESS and export.export_type == ExportType.PDF:
+            if await self.export_repo.requeue(export_id):
+                export_workers.start(self.session_factory)
+                export_workers.submit(export_id)
+            message = "Export service: file of Export (id=%s) was evicted, rendering it again"
+            logger.warning(message, export_id)
+            raise ExportNotReadyError(message % export_id)
+        message = "Export service: Export (id=%s) has no file (status %s)"
+        logger.warning(message, export_id, export.status.value)
+        raise ExportNotReadyError(message % (export_id, export.status.value))
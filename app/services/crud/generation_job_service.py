@@ -0,0 +1,94 @@
+# app/services/crud/generation_job_service.py
+
+import json
+import logging
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db.routing import use_primary
+from models.generation_job import GenerationJob, GenerationJobStatus
+from repositories.generation_job import GenerationJobRepository
+from schemas.generation_job import GenerationJobRead
+from schemas.route import RouteGenerateRequest, RouteRead
+from exceptions.generation_job import GenerationJobNotFoundError
+from exceptions.route import RouteNotFoundError
+from services.crud.route_service import build_route_service
+from services.generation_worker import generation_workers
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = (GenerationJobStatus.SUCCESS, GenerationJobStatus.FAILED)
+
+
+class GenerationJobService:
+    """
+    Service layer for asynchronous route generation jobs.
+    Throws GenerationJobNotFoundError.
+    """
+
+    def __init__(self, job_repo: GenerationJobRepository, session_factory: async_sessionmaker[AsyncSession]):
+        self.job_repo = job_repo
+        self.session_factory = session_factory
+
+    async def enqueue_route(self, payload: RouteGenerateRequest, owner_id: int) -> GenerationJob:
+        """
+        Store a QUEUED job and hand it over to the local worker pool.
+        """
+        job = await self.job_repo.create(user_id=owner_id, params=payload.model_dump())
+        generation_workers.start(self.session_factory)
+        generation_workers.submit(job.id)
+        logger.info("Generation job service: GenerationJob (id=%s) queued for user_id=%s", job.id, owner_id)
+        return job
+
+    async def get_job(self, job_id: int, user_id: int) -> GenerationJob:
+        """
+        Get a job owned by the user.
+        Raises:
+            GenerationJobNotFoundError: If job does not exist or belongs to another user.
+        """
+        job = await self.job_repo.get(job_id)
+        if not job or job.user_id != user_id:
+            message = "Generation job service: GenerationJob (id=%s) not found"
+            logger.warning(message, job_id)
+            raise GenerationJobNotFoundError(message % job_id)
+        return job
+
+    async def stream_events(self, job_id: int, poll_interval: float = 1.0) -> AsyncIterator[str]:
+        """
+        Server-sent events for a job: `progress` on every change,
+        then `result` with the RouteRead (or `error`) once the job is finished.
+        Uses its own sessions, as the stream outlives the request-scoped one.
+        """
+        last_seen = None
+        while True:
+            async with self.session_factory() as session:
+                job = await GenerationJobRepository(session).get(job_id)
+                if job is None:
+                    yield _sse("error", json.dumps({"detail": "Generation job no longer exists"}))
+                    return
+                state = GenerationJobRead.model_validate(job)
+                if (state.status, state.progress) != last_seen:
+                    last_seen = (state.status, state.progress)
+                    yield _sse("progress", state.model_dump_json())
+
+                if state.status == GenerationJobStatus.SUCCESS:
+                    # just written by a worker: a replica may not have it yet
+                    use_primary(session)
+                    try:
+                        # as GET /routes/{id}: days and route_data of routes sharing a cached plan attached
+                        route = await build_route_service(session).get_route_by_id(state.route_id)
+                    except RouteNotFoundError:
+                        yield _sse("error", json.dumps({"detail": "Generated route no longer exists"}))
+                    else:
+                        yield _sse("result", RouteRead.model_validate(route).model_dump_json())
+                    return
+                if state.status == GenerationJobStatus.FAILED:
+                    yield _sse("error", json.dumps({"detail": state.error_message}))
+                    return
+
+            await generation_workers.wait_for_update(job_id, timeout=poll_interval)
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
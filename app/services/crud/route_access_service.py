@@ -8,6 +8,7 @@ from models.route_access import RouteAccess
 from schemas.route_access import RouteAccessCreate
 from repositories.route_access import RouteAccessRepository
 from repositories.route import RouteRepository
+from services.permissions import RoutePermissions
 from exceptions.route_access import (
     RouteAccessAlreadyExistsError,
     RouteAccessNotFoundError,
@@ -32,9 +33,10 @@ class RouteAccessService:
     ):
         self.access_repo = access_repo
         self.route_repo = route_repo
+        self.permissions = RoutePermissions(access_repo)
 
     async def _ensure_route_exists(self, route_id: int):
-        route = await self.route_repo.get(route_id)
+        route = await self.route_repo.get(route_id, load="bare")
         if not route:
             msg = "Route access service: Route (id=%s) not found"
             logger.warning(msg, route_id)
@@ -48,14 +50,13 @@ class RouteAccessService:
         allowed: List[RouteRole],
         action: str = "",
     ) -> bool:
-        for role in allowed:
-            access = await self.access_repo.get_by_user_and_route_and_role(user_id, route_id, role)
-            if access:
-                return True
+        if await self.permissions.has_any(user_id, route_id, allowed):
+            return True
         # User has no access
+        roles = "/".join(role.value for role in allowed)
         msg = "Route access service: User (id=%s) has no %s access to route (id=%s)"
-        logger.warning(msg, user_id, role, route_id)
-        raise PermissionDeniedError(msg % (user_id, role, route_id))
+        logger.warning(msg, user_id, roles, route_id)
+        raise PermissionDeniedError(msg % (user_id, roles, route_id))
 
     async def check_user_has_access(self, user_id: int, route_id: int, required_roles: List[RouteRole]) -> bool:
         return await self._ensure_has_role(user_id, route_id, required_roles, action="access route")
@@ -85,6 +86,7 @@ class RouteAccessService:
             logger.warning(message, data.user_id, data.role, data.route_id)
             raise RouteAccessAlreadyExistsError(message % (data.user_id, data.role, data.route_id))
         access = await self.access_repo.create(data, commit=commit)
+        await self.permissions.forget(data.user_id, data.route_id)
         logger.info(
             "Route access service: granted %s access to user_id=%s for route_id=%s",
             data.role,
@@ -97,7 +99,7 @@ class RouteAccessService:
         """
         Accept invitation by share code → grant VIEWER access.
         """
-        route = await self.route_repo.get_by_share_code(share_code)
+        route = await self.route_repo.get_by_share_code(share_code, load="bare")
         if not route:
             msg = "Route access service: Route with share_code='%s' not found"
             logger.warning(msg, share_code)
@@ -168,6 +170,7 @@ class RouteAccessService:
             raise RouteAccessNotFoundError(msg % (target_user_id, role_to_revoke, route_id))
 
         await self.access_repo.delete_by_user_and_route_and_role(target_user_id, route_id, role_to_revoke)
+        await self.permissions.forget(target_user_id, route_id)
         logger.info(
             "Revoked %s access for user (id=%s) on route (id=%s)",
             role_to_revoke,
@@ -0,0 +1,134 @@
+# app/services/crud/route_import_service.py
+
+import logging
+from typing import AsyncIterable, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from repositories.route_import import RouteImportRepository
+from schemas.route_import import RouteImportError, RouteImportRecord, RouteImportReport
+from services.permissions import route_acl
+from utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (line number, record)
+NumberedRecord = Tuple[int, RouteImportRecord]
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'record'}: {e['msg']}" for e in error.errors())
+
+
+class RouteImportService:
+    """
+    Bulk import of routes from NDJSON, one RouteImportRecord per line.
+
+    Lines are validated as they are read and collected into chunks; references of a chunk
+    (users, cache entries, share codes) are checked with one query each, then the chunk is
+    written by RouteImportRepository and committed. A chunk the database still rejects is
+    retried record by record, so one bad record never fails its neighbours.
+    Failures are reported per line, they don't stop the import.
+    """
+
+    def __init__(
+        self,
+        import_repo: RouteImportRepository,
+        chunk_size: Optional[int] = None,
+        max_errors: Optional[int] = None,
+    ):
+        self.import_repo = import_repo
+        self.session = import_repo.session
+        self.chunk_size = chunk_size or settings.ROUTE_IMPORT_CHUNK_SIZE
+        self.max_errors = settings.ROUTE_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+
+    async def import_ndjson(self, lines: AsyncIterable[Union[bytes, str]]) -> RouteImportReport:
+        report = RouteImportReport()
+        chunk: List[NumberedRecord] = []
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            report.received += 1
+            try:
+                chunk.append((line_number, RouteImportRecord.model_validate_json(line)))
+            except ValidationError as e:
+                self._fail(report, line_number, _describe(e))
+                continue
+            if len(chunk) >= self.chunk_size:
+                await self._import_chunk(chunk, report)
+                chunk = []
+        if chunk:
+            await self._import_chunk(chunk, report)
+        logger.info(
+            "Route import service: %s of %s routes imported (%s rows), %s failed",
+            report.imported,
+            report.received,
+            report.rows,
+            report.failed,
+        )
+        return report
+
+    def _fail(self, report: RouteImportReport, line: int, detail: str) -> None:
+        report.failed += 1
+        if len(report.errors) < self.max_errors:
+            report.errors.append(RouteImportError(line=line, detail=detail))
+
+    async def _check_references(self, chunk: List[NumberedRecord], report: RouteImportReport) -> List[NumberedRecord]:
+        records = [record for _, record in chunk]
+        user_ids = await self.import_repo.existing_user_ids(
+            {r.owner_id for r in records}
+            | {r.last_edited_by for r in records if r.last_edited_by is not None}
+            | {grant.user_id for r in records for grant in r.access}
+        )
+        cache_ids = await self.import_repo.existing_cache_ids(
+            {r.ai_cache_id for r in records if r.ai_cache_id is not None}
+        )
+        taken = await self.import_repo.existing_share_codes({r.share_code for r in records})
+
+        valid = []
+        for line, record in chunk:
+            missing_users = (
+                {record.owner_id, record.last_edited_by, *(grant.user_id for grant in record.access)} - {None}
+            ) - user_ids
+            if missing_users:
+                self._fail(report, line, f"Users {sorted(missing_users)} do not exist")
+            elif record.ai_cache_id is not None and record.ai_cache_id not in cache_ids:
+                self._fail(report, line, f"AICache reference (id={record.ai_cache_id}) does not exist")
+            elif record.share_code in taken:
+                self._fail(report, line, f"share_code {record.share_code!r} is already taken")
+            else:
+                taken.add(record.share_code)
+                valid.append((line, record))
+        return valid
+
+    async def _import_chunk(self, chunk: List[NumberedRecord], report: RouteImportReport) -> None:
+        valid = await self._check_references(chunk, report)
+        if not valid:
+            return
+        try:
+            await self._write(valid, report)
+        except Exception as e:
+            if len(valid) == 1:
+                self._fail(report, valid[0][0], f"Failed to save: {e}")
+                return
+            logger.warning("Route import service: chunk of %s failed, retrying one by one: %s", len(valid), e)
+            for numbered in valid:
+                try:
+                    await self._write([numbered], report)
+                except Exception as e:
+                    self._fail(report, numbered[0], f"Failed to save: {e}")
+
+    async def _write(self, records: List[NumberedRecord], report: RouteImportReport) -> None:
+        try:
+            rows = await self.import_repo.insert([record for _, record in records])
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        report.imported += len(records)
+        report.rows += rows
+        user_ids = {record.owner_id for _, record in records}
+        user_ids.update(grant.user_id for _, record in records for grant in record.access)
+        await route_acl.invalidate_users(*user_ids)
@@ -1,24 +1,61 @@
 # app/services/crud/route_service.py
 
+import asyncio
+import csv
+import io
+import json
 import logging
-import math
-from typing import Optional, List
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterator, Callable, Literal, Optional, List, Tuple
+
+from pydantic_core import to_json
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from utils.utils import generate_nanoid_code
-from constants.roles import RouteRole
-from schemas.route import RouteCreate, RouteRead, RouteShort, RouteGenerateRequest, RouteDayCreate
-from schemas.route_access import RouteAccessCreate
+from utils.cache_keys import build_cache_key
+from utils.config import settings
+from utils.ical import CALENDAR_FOOTER, calendar_header, format_stamp, vevents
+from utils.locks import NullLock, PgAdvisoryLock, RedisLock
+from utils.metrics import register_metrics
+from utils.redis_client import get_redis
+from utils.pagination import decode_cursor, encode_cursor
+from utils.route_json import route_to_dict
+from utils.single_flight import SingleFlight
+from schemas.ai_cache import AICacheCreate, AICacheRead
+from schemas.route import (
+    RouteCreate,
+    RouteRead,
+    RouteShort,
+    RouteGenerateRequest,
+    RouteDayCreate,
+    RouteDayRead,
+    RouteDayUpdate,
+)
 from repositories import *
+from repositories.route import RouteLoad
 from exceptions.route import (
     RouteAlreadyExistsError,
     RouteNotFoundError,
+    RouteDayNotFoundError,
     InvalidRouteDataError,
+    InvalidCursorError,
 )
-from services.crud.route_access_service import RouteAccessService
+from services.cache_service import AICacheService
+from services.permissions import route_acl
+from services.ai_service import RouteStreamParser, get_ai_service, hash_prompt
 
 
 logger = logging.getLogger(__name__)
 
+# columns of the CSV export, one row per route
+EXPORT_CSV_FIELDS = (*RouteShort.model_fields, "is_public", "created_at", "updated_at")
+
+# in-process coalescing of AI generations, keyed by the normalized cache_key
+route_generation_flight = SingleFlight()
+register_metrics("route_generation", route_generation_flight.stats)
+
 
 class RouteService:
     """
@@ -32,11 +69,15 @@ class RouteService:
         user_repo: UserRepository,
         cache_repo: AICacheRepository,
         access_repo: RouteAccessRepository,
+        cache_svc: Optional[AICacheService] = None,
+        ai_svc=None,
     ):
         self.route_repo = route_repo
         self.user_repo = user_repo
         self.cache_repo = cache_repo
         self.access_repo = access_repo
+        self.cache_svc = cache_svc or AICacheService(cache_repo)
+        self.ai_svc = ai_svc
 
     async def _check_foreign_keys(
         self,
@@ -50,22 +91,19 @@ class RouteService:
         """
         user_repo = self.user_repo
         cache_repo = self.cache_repo
-        owner = await user_repo.get(new_data.owner_id)
-        if not owner:
+        if not await user_repo.exists(new_data.owner_id):
             message = "Owner (user_id=%s) does not exist"
             logger.warning(message, new_data.owner_id)
             raise InvalidRouteDataError(message % new_data.owner_id)
 
         if new_data.ai_cache_id is not None:
-            ai_cache = await cache_repo.get(new_data.ai_cache_id)
-            if not ai_cache:
+            if not await cache_repo.exists(new_data.ai_cache_id):
                 message = "AICache reference (id=%s) does not exist"
                 logger.warning(message, new_data.ai_cache_id)
                 raise InvalidRouteDataError(message % new_data.ai_cache_id)
 
         if getattr(new_data, "last_edited_by", None) is not None:
-            editor = await user_repo.get(new_data.last_edited_by)
-            if not editor:
+            if not await user_repo.exists(new_data.last_edited_by):
                 message = "Last editor (user_id=%s) does not exist"
                 logger.warning(message, new_data.last_edited_by)
                 raise InvalidRouteDataError(message % new_data.last_edited_by)
@@ -74,51 +112,35 @@ class RouteService:
         self,
         payload: RouteGenerateRequest,
         owner_id: int,
+        on_day: Optional[Callable[[RouteDayCreate], None]] = None,
     ) -> RouteCreate:
-        result = None
-
-        # first check cache
-        cached = await self.cache_repo.find_similar(
-            origin=payload.origin.strip().lower(),
-            destination=payload.destination.strip().lower(),
+        """
+        Build RouteCreate from a cached plan or a new AI generation.
+        If this call generates the plan, `on_day` is called with every day as soon as it is parsed.
+        """
+        # first check cache (in-process L1 -> Redis L2 -> database)
+        cached = await self.cache_svc.find_similar(
+            origin=payload.origin,
+            destination=payload.destination,
             duration_days=payload.duration_days,
-            budget=math.ceil(payload.budget),
+            budget=payload.budget,
+            interests=payload.interests,
         )
         if cached:
             logger.info("Cache hit: using cached plan id=%s", cached.id)
-            result = cached.result
-            cached.hit_count += 1
-            # await self.cache_repo.session.commit()
+            # committed together with the new route
+            await self.cache_svc.increment_hit_count(cached.id, commit=False)
         else:
-            pass
-            # TODO: no cache -> ask AI
-            # try:
-            #     result = await self.ai_svc.generate_route(
-            #         origin=payload.origin,
-            #         destination=payload.destination,
-            #         duration_days=payload.duration_days,
-            #         interests=payload.interests,
-            #         budget=payload.budget,
-            #     )
-            # except Exception as e:
-            #     logger.error("AI generation failed: %s", e)
-            #     raise InvalidRouteDataError("Failed to generate route via AI")
+            # no cache -> ask AI; concurrent requests for the same cache key share one generation
+            cached = await self._generate_coalesced(payload, on_day)
 
-            # save new cache
-            # cache_entry = AICacheCreate(
-            #     origin=payload.origin,
-            #     destination=payload.destination,
-            #     duration_days=payload.duration_days,
-            #     budget=payload.budget,
-            #     interests=payload.interests or [],
-            #     original_prompt=result.get("original_prompt", ""),
-            #     prompt_hash=result.get("prompt_hash", ""),
-            #     result=result,
-            # )
-            # await self.cache_repo.create(cache_entry)
-
-        if result is None:
+        if cached is None:
             raise InvalidRouteDataError("Route service: failed to generate route, no data received from AI")
+        result = cached.result
+        # a near match adapted to another duration differs from the stored entry, keep its own copy
+        inline = settings.ROUTE_DATA_STORAGE == "inline" or cached.duration_days != payload.duration_days
+        # copy-on-write: a route sharing the cached plan is a single row until its first edit
+        copy_on_write = not inline and settings.ROUTE_COPY_ON_WRITE
 
         # build scheme RouteCreate
         new_data = RouteCreate(
@@ -128,10 +150,11 @@ class RouteService:
             duration_days=payload.duration_days,
             budget=payload.budget,
             interests=payload.interests or cached.interests,
-            route_data=result,
+            route_data=result if inline else None,
             days=[RouteDayCreate(**day) for day in result["days"]],
+            materialized=not copy_on_write,
             is_public=payload.is_public,
-            ai_cache_id=(cached.id if cached else None),
+            ai_cache_id=cached.id,
             share_code=generate_nanoid_code(),
             owner_id=owner_id,
         )
@@ -145,14 +168,124 @@ class RouteService:
 
         return new_data
 
+    def _generation_lock(self, cache_key: str):
+        """
+        Cross-process lock so that uvicorn workers coalesce generations as well.
+        """
+        if settings.AI_GENERATION_LOCK == "redis" and get_redis() is not None:
+            return RedisLock(
+                get_redis(),
+                f"lock:ai_generation:{cache_key}",
+                wait_timeout=settings.AI_GENERATION_LOCK_TIMEOUT,
+            )
+        if settings.AI_GENERATION_LOCK == "postgres":
+            return PgAdvisoryLock(
+                self.cache_repo.session,
+                f"ai_generation:{cache_key}",
+                wait_timeout=settings.AI_GENERATION_LOCK_TIMEOUT,
+            )
+        return NullLock()
+
+    async def _generate_coalesced(
+        self,
+        payload: RouteGenerateRequest,
+        on_day: Optional[Callable[[RouteDayCreate], None]] = None,
+    ) -> Optional[AICacheRead]:
+        """
+        Generate a plan via AI at most once per cache key: in-process callers await the leader
+        (single-flight), other processes wait on the generation lock and then find the entry in cache.
+        """
+        # the key the generated entry is stored under
+        cache_key = build_cache_key(
+            payload.origin, payload.destination, payload.duration_days, payload.budget, fuzzy=False
+        )
+        return await route_generation_flight.do(cache_key, self._generate_once, payload, cache_key, on_day)
+
+    async def _generate_once(
+        self,
+        payload: RouteGenerateRequest,
+        cache_key: str,
+        on_day: Optional[Callable[[RouteDayCreate], None]] = None,
+    ) -> Optional[AICacheRead]:
+        async with self._generation_lock(cache_key):
+            # another worker may have generated the plan while we were waiting for the lock
+            cached = await self.cache_svc.find_similar(
+                origin=payload.origin,
+                destination=payload.destination,
+                duration_days=payload.duration_days,
+                budget=payload.budget,
+                interests=payload.interests,
+            )
+            if cached:
+                logger.info("Route service: plan for key=%s generated by another worker", cache_key)
+                return cached
+
+            if self.ai_svc is None:
+                logger.warning("Route service: AI generation is not configured")
+                return None
+            prompt = self.ai_svc.build_prompt(
+                origin=payload.origin,
+                destination=payload.destination,
+                duration_days=payload.duration_days,
+                budget=payload.budget,
+                interests=payload.interests,
+            )
+            result = await self._ask_ai(prompt, on_day)
+
+            # save new cache
+            cache_entry = AICacheCreate(
+                cache_key=cache_key,
+                origin=payload.origin,
+                destination=payload.destination,
+                duration_days=payload.duration_days,
+                budget=payload.budget,
+                interests=payload.interests or [],
+                original_prompt=prompt,
+                prompt_hash=hash_prompt(prompt),
+                result=result,
+            )
+            try:
+                return await self.cache_svc.create(cache_entry)
+            except IntegrityError:
+                # lost the race on the unique cache_key (no cross-process lock configured)
+                logger.info("Route service: cache entry key=%s already created, reusing it", cache_key)
+                return await self.cache_svc.find_similar(
+                    origin=payload.origin,
+                    destination=payload.destination,
+                    duration_days=payload.duration_days,
+                    budget=payload.budget,
+                    interests=payload.interests,
+                )
+
+    async def _ask_ai(self, prompt: str, on_day: Optional[Callable[[RouteDayCreate], None]] = None) -> dict:
+        """
+        Stream a plan from AI, reporting every completed day to `on_day`.
+        Raises:
+            InvalidRouteDataError: If the AI call fails or returns an invalid plan.
+        """
+        parser = RouteStreamParser()
+        try:
+            async for day in self.ai_svc.stream_route(prompt, parser):
+                if on_day is not None:
+                    on_day(day)
+            return parser.result
+        except Exception as e:
+            logger.error("AI generation failed: %s", e)
+            raise InvalidRouteDataError("Failed to generate route via AI")
+
     async def create_route(
         self,
         payload: RouteGenerateRequest,
         owner_id: int,
+        on_day: Optional[Callable[[RouteDayCreate], None]] = None,
+        commit: bool = True,
     ) -> RouteShort:
         """
         Create a new Route and optionally RouteDays and Activities.
         Performs FK checks on owner_id, ai_cache_id, and last_edited_by (if provided).
+        If the plan is generated by this call, `on_day` is called with every day as it arrives.
+        With commit=False the route is only flushed: the caller commits it (together with
+        its own writes) and then invalidates route_acl for the owner.
         Raises:
             RouteAlreadyExistsError: If Route with the same share_code already exists.
             InvalidRouteDataError: If Route data is invalid.
@@ -160,72 +293,141 @@ class RouteService:
         logger.info("Route service: creating new route for %s → %s", payload.origin, payload.destination)
 
         # build new data
-        new_data = await self._get_new_data(payload, owner_id)
+        new_data = await self._get_new_data(payload, owner_id, on_day)
 
         # check foreign keys
         await self._check_foreign_keys(new_data)
 
         try:
-            new_route = await self.route_repo.create(new_data, commit=True)
-            # creating route days, if any
-            if hasattr(new_data, "days") and new_data.days:
-                for day in new_data.days:
-                    await self.route_repo.create_day(new_route.id, day, commit=True)
-
-            # add route access
-            access_svc = RouteAccessService(access_repo=self.access_repo)
-            await access_svc.grant_access(
-                RouteAccessCreate(
-                    user_id=new_data.owner_id,
-                    route_id=new_route.id,
-                    role=RouteRole.CREATOR,
-                ),
-                commit=True,
-            )
+            # route, days, activities and CREATOR access are written in one transaction
+            new_route = await self.route_repo.create_with_days(new_data, creator_id=new_data.owner_id, commit=commit)
         except Exception as e:
             message = "Route service: failed to save Route: %s. Check logs for details"
             logger.error(message, e)
             raise InvalidRouteDataError(message % e)
+        if commit:
+            await route_acl.invalidate_users(new_data.owner_id)
 
         logger.info(
             "Route service: Route (id=%s, code=%s) created",
             new_route.id,
             new_route.share_code,
         )
-        return await self.route_repo.get(new_route.id)
+        return new_route
 
-    async def list_routes(self) -> List[RouteShort]:
+    async def stream_route(
+        self,
+        payload: RouteGenerateRequest,
+        owner_id: int,
+    ) -> AsyncIterator[dict]:
         """
-        Return a short list of all routes.
+        Create a new Route like create_route, but yield its days while the plan is being generated:
+        {"event": "day", "data": RouteDayCreate} for every day, then {"event": "route", "data": RouteShort}.
+        Days of a cached plan (or of a generation led by another request) are yielded at once.
+        Raises:
+            InvalidRouteDataError: If Route data is invalid.
         """
-        routes = await self.route_repo.get_all()
-        logger.info("Route service: fetched %s Routes", len(routes))
-        return routes
+        logger.info("Route service: streaming new route for %s → %s", payload.origin, payload.destination)
+
+        days: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self._get_new_data(payload, owner_id, on_day=days.put_nowait))
+        task.add_done_callback(lambda _: days.put_nowait(None))
+        sent = 0
+        try:
+            while (day := await days.get()) is not None:
+                sent += 1
+                yield {"event": "day", "data": day.model_dump(mode="json")}
+            new_data = await task
+        finally:
+            # the client went away before the plan was ready
+            task.cancel()
+
+        for day in new_data.days[sent:]:
+            yield {"event": "day", "data": day.model_dump(mode="json")}
 
-    async def list_routes_for_user(self, user_id: int) -> List[RouteShort]:
+        await self._check_foreign_keys(new_data)
+        try:
+            new_route = await self.route_repo.create_with_days(new_data, creator_id=new_data.owner_id, commit=True)
+        except Exception as e:
+            message = "Route service: failed to save Route: %s. Check logs for details"
+            logger.error(message, e)
+            raise InvalidRouteDataError(message % e)
+        await route_acl.invalidate_users(new_data.owner_id)
+
+        logger.info("Route service: Route (id=%s, code=%s) created", new_route.id, new_route.share_code)
+        yield {"event": "route", "data": RouteShort.model_validate(new_route).model_dump(mode="json")}
+
+    async def list_routes(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        destination: Optional[str] = None,
+        is_public: Optional[bool] = None,
+    ) -> Tuple[List[RouteShort], Optional[str]]:
+        """
+        Return a page of all routes (short info) and the cursor of the next page.
+        Raises:
+            InvalidCursorError: If cursor is malformed.
+        """
+        return await self._list_page(None, limit, cursor, destination, is_public)
+
+    async def list_routes_for_user(
+        self,
+        user_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        destination: Optional[str] = None,
+        is_public: Optional[bool] = None,
+    ) -> Tuple[List[RouteShort], Optional[str]]:
         """
-        Return a short list of all routes for a specific user.
+        Return a page of routes the user has access to (short info) and the cursor of the next page.
+        Raises:
+            InvalidCursorError: If cursor is malformed.
         """
-        accessible_ids = await self.access_repo.get_route_ids_by_user(user_id)
-        routes = await self.route_repo.get_all_by_ids(accessible_ids)
+        return await self._list_page(user_id, limit, cursor, destination, is_public)
+
+    async def _list_page(
+        self,
+        user_id: Optional[int],
+        limit: int,
+        cursor: Optional[str],
+        destination: Optional[str],
+        is_public: Optional[bool],
+    ) -> Tuple[List[RouteShort], Optional[str]]:
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            logger.warning("Route service: %s", e)
+            raise InvalidCursorError(str(e))
+
+        # one extra row tells whether there is a next page
+        rows = await self.route_repo.list_page(
+            limit + 1, user_id=user_id, after=after, destination=destination, is_public=is_public
+        )
+        next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+        routes = [RouteShort.model_validate(row) for row in rows[:limit]]
         logger.info("Route service: fetched %s Routes", len(routes))
-        return routes
+        return routes, next_cursor
 
-    async def get_route_by_id(self, route_id: int) -> RouteRead:
+    async def get_route_by_id(self, route_id: int, load: RouteLoad = "full", with_route_data: bool = True) -> RouteRead:
         """
-        Get a route by its ID.
+        Get a route by its ID, loading as much of the graph as `load` says.
+        With the "full" load route_data is attached unless `with_route_data` is False
+        (days of a route that isn't materialized are attached anyway).
         Raises:
             RouteNotFoundError: If route does not exist.
         """
         logger.info("Route service: getting Route (id=%s)", route_id)
-        route = await self.route_repo.get(route_id)
+        route = await self.route_repo.get(route_id, load=load)
         if not route:
             message = "Route service: Route (id=%s) not found"
             logger.warning(message, route_id)
             raise RouteNotFoundError(message % route_id)
+        if load == "full" and (with_route_data or not route.materialized):
+            await self.route_repo.attach_route_data([route])
         return route
 
-    async def get_route_by_code(self, share_code: str) -> Optional[RouteRead]:
+    async def get_route_by_code(self, share_code: str, with_route_data: bool = True) -> Optional[RouteRead]:
         """
         Get a route by its share_code.
         Raises:
@@ -239,22 +441,144 @@ class RouteService:
             message = "Route service: Route (code=%s) not found"
             logger.warning(message, share_code)
             raise RouteNotFoundError(message % share_code)
+        if with_route_data or not route.materialized:
+            await self.route_repo.attach_route_data([route])
         return route
 
-    async def get_route_by_owner(self, owner_id: int) -> List[RouteRead]:
+    async def get_route_by_owner(self, owner_id: int, with_route_data: bool = True) -> List[RouteRead]:
         """
         Get all routes owned by a specific user.
         """
         logger.info("Route service: getting Routes by owner_id=%s", owner_id)
-        return await self.route_repo.get_by_owner_id(owner_id)
+        routes = await self.route_repo.get_by_owner_id(owner_id)
+        await self.route_repo.attach_route_data(
+            routes if with_route_data else [route for route in routes if not route.materialized]
+        )
+        return routes
+
+    async def update_day(
+        self,
+        route_id: int,
+        day_number: int,
+        day_data: RouteDayUpdate,
+        editor_id: int,
+    ) -> RouteDayRead:
+        """
+        Replace one day of a route. A route still sharing its cached plan is materialized
+        first (copy-on-write), so its other days keep their content.
+        Raises:
+            RouteNotFoundError: If route does not exist.
+            RouteDayNotFoundError: If the route has no such day.
+        """
+        logger.info("Route service: updating day %s of Route (id=%s)", day_number, route_id)
+        return await self.route_repo.transaction(self._update_day_tx, route_id, day_number, day_data, editor_id)
+
+    async def _update_day_tx(
+        self,
+        route_id: int,
+        day_number: int,
+        day_data: RouteDayUpdate,
+        editor_id: int,
+    ) -> RouteDayRead:
+        route = await self.route_repo.get(route_id, load="summary")
+        if not route:
+            message = "Route service: Route (id=%s) not found"
+            logger.warning(message, route_id)
+            raise RouteNotFoundError(message % route_id)
+        if not route.materialized:
+            await self.route_repo.attach_route_data([route])
+            await self.route_repo.materialize(route)
+        day = await self.route_repo.replace_day(route, day_number, day_data)
+        if day is None:
+            message = "Route service: Route (id=%s) has no day %s"
+            logger.warning(message, route_id, day_number)
+            raise RouteDayNotFoundError(message % (route_id, day_number))
+        route.last_edited_by = editor_id
+        return RouteDayRead.model_validate(day)
+
+    async def export_routes_by_owner(
+        self,
+        owner_id: int,
+        format: Literal["ndjson", "csv"] = "ndjson",
+        fields: Optional[frozenset[str]] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        All routes of an owner as a byte stream with memory bounded by ROUTE_EXPORT_BATCH_SIZE:
+        NDJSON - one RouteRead (restricted to `fields`) per line,
+        CSV - one row of EXPORT_CSV_FIELDS per route, lists and dicts JSON-encoded.
+        Yields one chunk per server-side cursor batch.
+        """
+        logger.info("Route service: exporting Routes of owner_id=%s as %s", owner_id, format)
+        batch_size = settings.ROUTE_EXPORT_BATCH_SIZE
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_CSV_FIELDS)
+            async for rows in self.route_repo.stream_rows_by_owner(owner_id, EXPORT_CSV_FIELDS, batch_size):
+                writer.writerows(
+                    [json.dumps(value) if isinstance(value, (list, dict)) else value for value in row] for row in rows
+                )
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            return
+
+        with_route_data = fields is None or "route_data" in fields
+        async for routes in self.route_repo.stream_by_owner(owner_id, batch_size=batch_size):
+            await self.route_repo.attach_route_data(
+                routes if with_route_data else [route for route in routes if not route.materialized]
+            )
+            yield b"".join(to_json(route_to_dict(route, fields)) + b"\n" for route in routes)
+
+    async def export_route_calendar(self, route_id: int, start: Optional[date] = None) -> AsyncIterator[bytes]:
+        """
+        The route as an iCalendar byte stream, one VEVENT per activity, yielded per batch of
+        ICAL_EXPORT_BATCH_SIZE activities. Activities of a materialized route are read through
+        a server-side cursor as plain rows; a route still sharing its plan is read from the plan.
+        Days without a date are placed from `start` on (day N on start + N - 1), today by default.
+        Raises:
+            RouteNotFoundError: If route does not exist (on the first iteration).
+        """
+        route = await self.get_route_by_id(route_id, load="bare")
+        logger.info("Route service: exporting Route (id=%s) as iCalendar", route_id)
+        start = start or date.today()
+        stamp = format_stamp(datetime.now(timezone.utc))
+        batch_size = settings.ICAL_EXPORT_BATCH_SIZE
+        yield calendar_header(route.name).encode()
+
+        def day_of(day_number: int, day_date: Optional[date]) -> date:
+            return day_date or start + timedelta(days=day_number - 1)
+
+        if route.materialized:
+            async for rows in self.route_repo.stream_activities(route_id, batch_size):
+                yield vevents(
+                    ((f"activity-{row.id}@route-{route_id}", day_of(row.day_number, row.date), row) for row in rows),
+                    stamp,
+                )
+        else:
+            plan = await self.route_repo.get_plan(route) or {}
+            batch = []
+            for day in plan.get("days") or []:
+                day_number = day.get("day_number")
+                day_date = date.fromisoformat(day["date"]) if day.get("date") else None
+                for n, activity in enumerate(day.get("activities") or []):
+                    batch.append((f"day-{day_number}-{n}@route-{route_id}", day_of(day_number, day_date), activity))
+                if len(batch) >= batch_size:
+                    yield vevents(batch, stamp)
+                    batch = []
+            if batch:
+                yield vevents(batch, stamp)
+        yield CALENDAR_FOOTER.encode()
 
     async def delete_route(self, route_id: int) -> bool:
         """
         Delete a route and all related data.
         """
         logger.info("Route service: deleting Route (id=%s)", route_id)
-        await self.get_route_by_id(route_id)
+        await self.get_route_by_id(route_id, load="bare")
+        # delete loads the full graph for the ORM cascade
         await self.route_repo.delete(route_id)
+        await route_acl.invalidate_routes(route_id)
         return True
 
     async def rebuild_route(
@@ -271,11 +595,14 @@ class RouteService:
         """
         logger.info("Route service: rebuilding Route (id=%s)", old_route_id)
 
-        return await self.route_repo.transaction(self._rebuild_route_tx, old_route_id, payload, owner_id)
+        new_route = await self.route_repo.transaction(self._rebuild_route_tx, old_route_id, payload, owner_id)
+        await route_acl.invalidate_routes(old_route_id)
+        await route_acl.invalidate_users(owner_id)
+        return new_route
 
     async def _rebuild_route_tx(self, old_route_id: int, payload: RouteGenerateRequest, owner_id: int) -> RouteShort:
         # check if route exists
-        existing = await self.route_repo.get(old_route_id)
+        existing = await self.route_repo.get(old_route_id, load="bare")
         if not existing:
             message = "Route service: Route (id=%s) not found"
             logger.warning(message, old_route_id)
@@ -290,26 +617,24 @@ class RouteService:
         try:
             # delete existing route
             await self.route_repo.delete(old_route_id, commit=False)
-            # create new route
-            new_route = await self.route_repo.create(new_data, commit=False)
-            # creating route days, if any
-            if hasattr(new_data, "days") and new_data.days:
-                for day in new_data.days:
-                    await self.route_repo.create_day(new_route.id, day, commit=False)
-
-            # add route access
-            access_service = RouteAccessService(access_repo=self.access_repo)
-            await access_service.grant_access(
-                RouteAccessCreate(
-                    user_id=new_data.owner_id,
-                    route_id=new_route.id,
-                    role=RouteRole.CREATOR,
-                ),
-                commit=False,
-            )
+            # create new route with days, activities and CREATOR access
+            new_route = await self.route_repo.create_with_days(new_data, creator_id=new_data.owner_id, commit=False)
         except Exception as e:
             message = "Route service: Route can't be rebuild: %s. Check logs for details"
             logger.error(message, e)
             raise InvalidRouteDataError(message % e)
 
-        return await self.route_repo.get(new_route.id)
+        return new_route
+
+
+def build_route_service(session: AsyncSession) -> RouteService:
+    """
+    Wire a RouteService with repositories bound to the given session.
+    """
+    return RouteService(
+        route_repo=RouteRepository(session),
+        user_repo=UserRepository(session),
+        cache_repo=AICacheRepository(session),
+        access_repo=RouteAccessRepository(session),
+        ai_svc=get_ai_service(),
+    )
@@ -1,8 +1,9 @@
 # app/services/crud/user_service.py
 
 import logging
-from typing import List
+from typing import List, Optional
 
+from db.routing import use_primary
 from repositories.user import UserRepository
 from schemas.user import UserCreate, UserRead, UserShort
 from exceptions.user import (
@@ -11,11 +12,32 @@ from exceptions.user import (
     InvalidUserDataError,
     AuthenticationError,
 )
-from utils.security import hash_password, verify_password, create_access_token
+from services.permissions import route_acl
+from utils.cache import TTLCache
+from utils.config import settings
+from utils.invalidation import invalidation_bus
+from utils.metrics import register_metrics
+from utils.security import create_access_token, password_hasher
 from schemas.token import Token
 
 logger = logging.getLogger(__name__)
 
+# authenticated principals by user id, dropped in every worker when a user is deleted or deactivated
+USER_TOPIC = "user"
+user_principals: TTLCache[UserRead] = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+
+def _drop_principals(user_ids: Optional[list]) -> None:
+    if user_ids is None:
+        user_principals.clear()
+        return
+    for user_id in user_ids:
+        user_principals.pop(user_id)
+
+
+invalidation_bus.subscribe(USER_TOPIC, _drop_principals)
+register_metrics("user_principals", user_principals.stats)
+
 
 class UserService:
     """
@@ -33,6 +55,8 @@ class UserService:
             UserAlreadyExistsError: If user already exists.
             InvalidUserDataError: If user data is invalid.
         """
+        # a replica may not have the user yet
+        use_primary(self.repo.session)
         existing = await self.repo.get_by_telegram_id(user_in.telegram_id)
         if existing:
             message = "User service: User (telegram_id=%s) already exists"
@@ -51,12 +75,13 @@ class UserService:
     async def register(self, user_in: UserCreate) -> UserRead:
         # e-mail registration
         if user_in.email:
+            use_primary(self.repo.session)
             existing = await self.repo.get_by_email(user_in.email)
             if existing:
                 message = "User service: User (e-mail=%s) already exists"
                 logger.warning(message, user_in.email)
                 raise UserAlreadyExistsError(message % user_in.email)
-            hashed = hash_password(user_in.password)
+            hashed = await password_hasher.hash(user_in.password)
             try:
                 user = await self.repo.create(user_in, password_hash=hashed)
             except Exception as e:
@@ -81,10 +106,17 @@ class UserService:
         Authenticate user and return JWT.
         Raises:
             AuthenticationError: if user not found or password is incorrect
+            PasswordHasherBusyError: if too many password checks are in progress
         """
         user = await self.repo.get_by_email(email)
-        if not user or not user.password_hash or not verify_password(password, user.password_hash):
+        if not user or not user.is_active or not user.password_hash:
+            raise AuthenticationError()
+        ok, new_hash = await password_hasher.verify_and_update(password, user.password_hash)
+        if not ok:
             raise AuthenticationError()
+        if new_hash:
+            await self.repo.update_password_hash(user.id, new_hash)
+            logger.info("User service: User (id=%s) password rehashed", user.id)
         token = create_access_token(subject=str(user.id))
         return Token(access_token=token)
 
@@ -130,6 +162,33 @@ class UserService:
             raise UserNotFoundError(message % telegram_id)
         return user
 
+    async def get_principal(self, user_id: int) -> UserRead:
+        """
+        Get the authenticated user, from the principal cache when possible.
+        Raises:
+            UserNotFoundError: If user not found.
+        """
+        principal = user_principals.get(user_id)
+        if principal is None:
+            principal = UserRead.model_validate(await self.get_user_by_id(user_id))
+            user_principals.set(user_id, principal)
+        return principal
+
+    async def set_active(self, user_id: int, is_active: bool) -> UserRead:
+        """
+        Activate or deactivate a user.
+        Raises:
+            UserNotFoundError: If user not found.
+        """
+        user = await self.repo.set_active(user_id, is_active)
+        if not user:
+            message = "User service: User (id=%s) not found"
+            logger.warning(message, user_id)
+            raise UserNotFoundError(message % user_id)
+        await invalidation_bus.publish(USER_TOPIC, user_id)
+        logger.info("User service: User (id=%s) is_active=%s", user_id, is_active)
+        return user
+
     async def list_users(self) -> List[UserShort]:
         """List all users."""
         return await self.repo.get_all()
@@ -138,10 +197,14 @@ class UserService:
         """Delete a user by ID."""
         await self.get_user_by_id(user_id)
         await self.repo.delete(user_id)
+        await invalidation_bus.publish(USER_TOPIC, user_id)
+        await route_acl.invalidate_users(user_id)
         logger.info("User service: User (id=%s) deleted", user_id)
 
     async def delete_user_by_telegram_id(self, telegram_id: int) -> None:
         """Delete a user by Telegram ID."""
-        await self.get_user_by_telegram_id(telegram_id)
+        user = await self.get_user_by_telegram_id(telegram_id)
         await self.repo.delete_by_telegram_id(telegram_id)
+        await invalidation_bus.publish(USER_TOPIC, user.id)
+        await route_acl.invalidate_users(user.id)
         logger.info("User service: User (telegram_id=%s) deleted", telegram_id)
@@ -0,0 +1,250 @@
+# app/services/export_worker.py
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db.routing import use_primary
+from models.export import Export, ExportStatus, ExportType
+from repositories.export import ExportRepository
+from repositories.route import RouteRepository
+from services.calendar_sync import get_calendar_backend
+from services.crud.route_service import build_route_service
+from utils.config import settings
+from utils.artifacts import ArtifactStore, content_hash
+from utils.metrics import register_metrics
+from utils.pdf import ROUTE_PDF_FIELDS, TEMPLATE_VERSION, render_route_pdf, route_content
+from utils.route_json import route_to_dict
+
+logger = logging.getLogger(__name__)
+
+# window of the exports/minute figure in stats()
+THROUGHPUT_WINDOW = 60.0
+
+
+class ExportWorkerPool:
+    """
+    Local pool of asyncio workers processing Export rows.
+
+    Workers claim the oldest QUEUED export with SELECT ... FOR UPDATE SKIP LOCKED,
+    so any number of workers in any number of processes share the exports table
+    without handing rows over or waiting on each other's locks. Exports enqueued by
+    this process wake a worker up through an in-memory queue; when idle, workers poll.
+
+    PDF layout is CPU-bound, so it runs in a process pool and never blocks the
+    event loop; the worker then stores status and file_path with a single UPDATE.
+    Calendar exports stream the route's iCalendar into the configured CalendarSyncBackend.
+    Rendered files live in a content-addressed ArtifactStore: an export of a route
+    whose updated_at hasn't changed since an earlier export reuses that export's
+    file without loading the route, and identical content is never rendered twice.
+    """
+
+    def __init__(self, size: int, processes: int, poll_interval: float, stale_after: float, artifacts: ArtifactStore):
+        self.size = size
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.artifacts = artifacts
+        self.session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._active = 0
+        self._idle: Optional[asyncio.Event] = None
+        self._finished: deque[float] = deque()
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return (
+            self._loop is asyncio.get_running_loop()
+            and bool(self._workers)
+            and not all(worker.done() for worker in self._workers)
+        )
+
+    def start(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """
+        Start the workers on the current event loop (no-op if they are already running there).
+        The render processes are spawned with the first PDF.
+        """
+        self.session_factory = session_factory
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._workers = [asyncio.create_task(self._work(n), name=f"export-worker-{n}") for n in range(self.size)]
+        logger.info("Export workers: started %s workers", self.size)
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        logger.info("Export workers: stopped")
+
+    def submit(self, export_id: int) -> None:
+        """Wake a local worker up for a freshly queued export."""
+        self._queue.put_nowait(export_id)
+
+    async def join(self) -> None:
+        """Wait until every locally submitted export has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+            await self._idle.wait()
+
+    def _render_pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process with running threads (aiosqlite, the hasher pool) isn't safe
+            self._executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def _claim(self) -> Optional[Export]:
+        async with self.session_factory() as session:
+            return await ExportRepository(session).claim_next(self.stale_after)
+
+    async def _work(self, n: int) -> None:
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._queue.get(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    while (export := await self._claim()) is not None:
+                        await self._run(export)
+                else:
+                    try:
+                        export = await self._claim()
+                        if export is not None:
+                            await self._run(export)
+                    finally:
+                        self._queue.task_done()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Export worker %s: unexpected error: %s", n, e)
+                await asyncio.sleep(self.poll_interval)
+
+    async def _run(self, export: Export) -> None:
+        self._active += 1
+        self._idle.clear()
+        try:
+            logger.info("Export workers: processing Export (id=%s, type=%s)", export.id, export.export_type)
+            try:
+                result = await self._process(export)
+            except Exception as e:
+                logger.warning("Export workers: Export (id=%s) failed: %s", export.id, e)
+                await self._finish(export.id, ExportStatus.FAILED, error_message=getattr(e, "message", str(e)))
+                self.failed += 1
+            else:
+                await self._finish(export.id, ExportStatus.SUCCESS, **result)
+                self.completed += 1
+                self._finished.append(time.monotonic())
+        finally:
+            self._active -= 1
+            if not self._active:
+                self._idle.set()
+
+    async def _process(self, export: Export) -> dict:
+        """Run the export, return the values finish() stores with SUCCESS."""
+        if export.export_type == ExportType.PDF:
+            return await self._render(export)
+        if export.export_type == ExportType.GOOGLE_CALENDAR:
+            return await self._sync_calendar(export)
+        raise ValueError(f"Export type {export.export_type.value} is not supported yet")
+
+    async def _sync_calendar(self, export: Export) -> dict:
+        backend = get_calendar_backend()
+        if backend is None:
+            raise ValueError("Calendar sync is not configured (CALENDAR_SYNC_BACKEND)")
+        async with self.session_factory() as session:
+            # as in _render: the pushed calendar has to be the route as committed, not a lagging replica
+            use_primary(session)
+            calendar = build_route_service(session).export_route_calendar(export.route_id)
+            return {"external_id": await backend.push(export, calendar)}
+
+    async def _render(self, export: Export) -> dict:
+        """
+        Produce the export's PDF, return file_path, content_hash and route_version.
+        """
+        async with self.session_factory() as session:
+            # the content has to be that of the version read here, not of a lagging replica
+            use_primary(session)
+            exports = ExportRepository(session)
+            version = await exports.route_version(export.route_id)
+            if version is None:
+                raise ValueError(f"Route (id={export.route_id}) no longer exists")
+            # unchanged since an earlier export: its artifact, if still stored, is this one
+            known = await exports.artifact_key(export.route_id, version)
+            if known is not None and (path := self.artifacts.get(known)) is not None:
+                return {"file_path": path, "content_hash": known, "route_version": version}
+
+            repo = RouteRepository(session)
+            route = await repo.get(export.route_id, load="summary")
+            if route is None:
+                raise ValueError(f"Route (id={export.route_id}) no longer exists")
+            await repo.attach_route_data([route])
+            content = route_content(route_to_dict(route, ROUTE_PDF_FIELDS))
+
+        key = content_hash(content, TEMPLATE_VERSION)
+        # the same content as another route or an earlier version
+        path = self.artifacts.get(key) if key != known else None
+        if path is None:
+            path = self.artifacts.path(key)
+            await asyncio.to_thread(self.artifacts.prepare)
+            await self._render_pdf(content, path)
+            await asyncio.to_thread(self.artifacts.evict)
+        return {"file_path": path, "content_hash": key, "route_version": version}
+
+    async def _render_pdf(self, content: dict, file_path: str) -> None:
+        await asyncio.get_running_loop().run_in_executor(self._render_pool(), render_route_pdf, content, file_path)
+
+    async def _finish(self, export_id: int, status: ExportStatus, **values) -> None:
+        async with self.session_factory() as session:
+            if not await ExportRepository(session).finish(export_id, status, **values):
+                logger.warning("Export workers: Export (id=%s) was taken over or deleted, result dropped", export_id)
+
+    def exports_per_minute(self) -> float:
+        """Exports finished successfully by this pool during the last minute."""
+        horizon = time.monotonic() - THROUGHPUT_WINDOW
+        while self._finished and self._finished[0] < horizon:
+            self._finished.popleft()
+        return len(self._finished) * 60.0 / THROUGHPUT_WINDOW
+
+    def stats(self) -> dict:
+        return {
+            "workers": len([w for w in self._workers if not w.done()]),
+            "render_processes": self.processes,
+            "queued_locally": self._queue.qsize() if self._queue else 0,
+            "rendering": self._active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "exports_per_minute": self.exports_per_minute(),
+        }
+
+
+export_workers = ExportWorkerPool(
+    size=settings.EXPORT_WORKERS,
+    processes=settings.EXPORT_RENDER_PROCESSES,
+    poll_interval=settings.EXPORT_POLL_INTERVAL,
+    stale_after=settings.EXPORT_JOB_TIMEOUT,
+    artifacts=ArtifactStore(
+        settings.EXPORT_DIR,
+        suffix=".pdf",
+        max_bytes=settings.EXPORT_ARTIFACT_MAX_BYTES,
+        max_age=settings.EXPORT_ARTIFACT_MAX_AGE,
+    ),
+)
+register_metrics("export_workers", export_workers.stats)
+register_metrics("export_artifacts", export_workers.artifacts.stats)
@@ -0,0 +1,194 @@
+# app/services/generation_worker.py
+
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from models.generation_job import GenerationJobStatus
+from repositories.generation_job import GenerationJobRepository
+from schemas.route import RouteGenerateRequest
+from services.crud.route_service import build_route_service
+from services.permissions import route_acl
+from utils.config import settings
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationWorkerPool:
+    """
+    Local pool of asyncio workers executing GenerationJob rows.
+
+    Jobs enqueued by this process are handed over through an in-memory queue;
+    when idle, workers also poll the generation_jobs table, so jobs enqueued by
+    other processes (or left behind by a crashed one) are picked up as well.
+    Claiming is an atomic QUEUED -> RUNNING update, so a job runs only once; a
+    running job is refreshed by a heartbeat and is cut off after `stale_after`
+    seconds, so it is only requeued if its process died. Should a run outlive
+    its claim anyway, its route is rolled back with the result it can't store.
+    """
+
+    def __init__(self, size: int, poll_interval: float, stale_after: float):
+        self.size = size
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._events: dict[int, asyncio.Event] = {}
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return (
+            self._loop is asyncio.get_running_loop()
+            and bool(self._workers)
+            and not all(worker.done() for worker in self._workers)
+        )
+
+    def start(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """
+        Start the workers on the current event loop (no-op if they are already running there).
+        """
+        self.session_factory = session_factory
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._work(n), name=f"generation-worker-{n}") for n in range(self.size)]
+        logger.info("Generation workers: started %s workers", self.size)
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Generation workers: stopped")
+
+    def submit(self, job_id: int) -> None:
+        """Hand a freshly queued job to a local worker."""
+        self._queue.put_nowait(job_id)
+
+    async def join(self) -> None:
+        """Wait until every locally submitted job has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def wait_for_update(self, job_id: int, timeout: float) -> None:
+        """
+        Wait until a local worker changes the job or `timeout` elapses
+        (jobs run by other processes are only seen by polling).
+        """
+        event = self._events.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            event.clear()
+
+    def _notify(self, job_id: int) -> None:
+        event = self._events.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _poll(self) -> Optional[int]:
+        async with self.session_factory() as session:
+            return await GenerationJobRepository(session).next_pending_id(self.stale_after)
+
+    async def _work(self, n: int) -> None:
+        while True:
+            try:
+                try:
+                    job_id = await asyncio.wait_for(self._queue.get(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    job_id = await self._poll()
+                    if job_id is not None:
+                        await self._run(job_id)
+                else:
+                    try:
+                        await self._run(job_id)
+                    finally:
+                        self._queue.task_done()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Generation worker %s: unexpected error: %s", n, e)
+                await asyncio.sleep(self.poll_interval)
+
+    async def _run(self, job_id: int) -> None:
+        async with self.session_factory() as session:
+            jobs = GenerationJobRepository(session)
+            attempt = await jobs.claim(job_id)
+            if attempt is None:
+                return
+            self._notify(job_id)
+            job = await jobs.get(job_id)
+            user_id, params = job.user_id, job.params
+            logger.info("Generation workers: running GenerationJob (id=%s, attempt %s)", job_id, attempt)
+            days = []
+            heartbeat = asyncio.create_task(self._heartbeat(job_id, attempt, params.get("duration_days") or 1, days))
+            try:
+                payload = RouteGenerateRequest(**params)
+                # the run ends before the job could be requeued as stale;
+                # the route is committed by finish(), together with the job's result
+                route = await asyncio.wait_for(
+                    build_route_service(session).create_route(
+                        payload, owner_id=user_id, on_day=days.append, commit=False
+                    ),
+                    timeout=self.stale_after,
+                )
+            except Exception as e:
+                await session.rollback()
+                if isinstance(e, asyncio.TimeoutError):
+                    message = f"Generation timed out after {self.stale_after:g}s"
+                else:
+                    message = getattr(e, "message", str(e))
+                logger.warning("Generation workers: GenerationJob (id=%s) failed: %s", job_id, message)
+                finished = await jobs.finish(job_id, attempt, GenerationJobStatus.FAILED, error_message=message)
+                self.failed += 1
+            else:
+                # rolls the route back if the job was requeued (and maybe run again) meanwhile
+                finished = await jobs.finish(job_id, attempt, GenerationJobStatus.SUCCESS, route_id=route.id)
+                if finished:
+                    await route_acl.invalidate_users(user_id)
+                    self.completed += 1
+            finally:
+                heartbeat.cancel()
+            if not finished:
+                logger.warning("Generation workers: GenerationJob (id=%s) was requeued, result dropped", job_id)
+            self._notify(job_id)
+
+    async def _heartbeat(self, job_id: int, attempt: int, duration_days: int, days: list) -> None:
+        """
+        Refresh a running job every poll interval (at least three times per `stale_after`),
+        with the share of days generated so far as its progress (10..90).
+        """
+        interval = min(self.poll_interval, self.stale_after / 3)
+        while True:
+            await asyncio.sleep(interval)
+            progress = 10 + 80 * min(len(days), duration_days) // duration_days
+            async with self.session_factory() as session:
+                if not await GenerationJobRepository(session).touch(job_id, attempt, progress):
+                    return
+            self._notify(job_id)
+
+    def stats(self) -> dict:
+        return {
+            "workers": len([w for w in self._workers if not w.done()]),
+            "queued_locally": self._queue.qsize() if self._queue else 0,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+generation_workers = GenerationWorkerPool(
+    size=settings.GENERATION_WORKERS,
+    poll_interval=settings.GENERATION_POLL_INTERVAL,
+    stale_after=settings.GENERATION_JOB_TIMEOUT,
+)
+register_metrics("generation_workers", generation_workers.stats)
@@ -0,0 +1,116 @@
+# app/services/permissions.py
+
+import logging
+from typing import Iterable, Optional
+
+from constants.roles import RouteRole
+from repositories.route_access import RouteAccessRepository
+from utils.cache import TTLCache
+from utils.config import settings
+from utils.invalidation import InvalidationBus, invalidation_bus
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+NO_ROLES: frozenset[RouteRole] = frozenset()
+
+# route_id -> roles of one user
+ACLSnapshot = dict[int, frozenset[RouteRole]]
+
+
+class ACLCache:
+    """
+    Process-wide snapshots of users' route ACLs: the whole ACL of a user is loaded
+    with one query on the first check and every later check is a dict lookup.
+
+    Snapshots are dropped precisely through the invalidation bus - per user when
+    a grant changes, per route when a route is deleted - so all workers stay
+    consistent; the TTL only bounds staleness if an invalidation message is lost.
+    """
+
+    USER_TOPIC = "acl:user"
+    ROUTE_TOPIC = "acl:route"
+
+    def __init__(self, maxsize: int, ttl: float, bus: InvalidationBus):
+        self.bus = bus
+        self._snapshots: TTLCache[ACLSnapshot] = TTLCache(maxsize=maxsize, ttl=ttl)
+        # bumped on every invalidation, so a snapshot read before a concurrent change isn't stored
+        self._versions: dict[int, int] = {}
+        self.enabled = maxsize > 0 and ttl > 0
+        bus.subscribe(self.USER_TOPIC, self._drop_users)
+        bus.subscribe(self.ROUTE_TOPIC, self._drop_routes)
+
+    async def snapshot(self, user_id: int, access_repo: RouteAccessRepository) -> ACLSnapshot:
+        acl = self._snapshots.get(user_id)
+        if acl is not None:
+            return acl
+        version = self._versions.get(user_id, 0)
+        acl = {route_id: frozenset(roles) for route_id, roles in (await access_repo.get_acl(user_id)).items()}
+        if self._versions.get(user_id, 0) == version:
+            self._snapshots.set(user_id, acl)
+        return acl
+
+    def _drop_users(self, user_ids: Optional[list]) -> None:
+        if user_ids is None:
+            self._versions.clear()
+            self._snapshots.clear()
+            return
+        for user_id in user_ids:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._snapshots.pop(user_id)
+
+    def _drop_routes(self, route_ids: Optional[list]) -> None:
+        if route_ids is None:
+            self._drop_users(None)
+            return
+        route_ids = set(route_ids)
+        for user_id, acl in self._snapshots.items():
+            if not route_ids.isdisjoint(acl):
+                self._drop_users([user_id])
+
+    async def invalidate_users(self, *user_ids: int) -> None:
+        logger.debug("ACL cache: invalidating users %s", user_ids)
+        await self.bus.publish(self.USER_TOPIC, *user_ids)
+
+    async def invalidate_routes(self, *route_ids: int) -> None:
+        logger.debug("ACL cache: invalidating routes %s", route_ids)
+        await self.bus.publish(self.ROUTE_TOPIC, *route_ids)
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, **self._snapshots.stats()}
+
+
+route_acl = ACLCache(maxsize=settings.ACL_CACHE_SIZE, ttl=settings.ACL_CACHE_TTL, bus=invalidation_bus)
+register_metrics("acl_cache", route_acl.stats)
+
+
+class RoutePermissions:
+    """
+    Resolves a user's roles on a route. With the ACL cache enabled the check is
+    a lookup in the user's cached snapshot; otherwise the roles are read with
+    a single query and memoized for the lifetime of the instance (one request),
+    so repeated checks of the same (user, route) pair hit the database once.
+    """
+
+    def __init__(self, access_repo: RouteAccessRepository, acl: Optional[ACLCache] = None):
+        self.access_repo = access_repo
+        self.acl = acl if acl is not None else route_acl
+        self._roles: dict[tuple[int, int], frozenset[RouteRole]] = {}
+
+    async def roles(self, user_id: int, route_id: int) -> frozenset[RouteRole]:
+        if self.acl.enabled:
+            return (await self.acl.snapshot(user_id, self.access_repo)).get(route_id, NO_ROLES)
+        key = (user_id, route_id)
+        roles = self._roles.get(key)
+        if roles is None:
+            roles = frozenset(await self.access_repo.get_roles(user_id, route_id))
+            self._roles[key] = roles
+        return roles
+
+    async def has_any(self, user_id: int, route_id: int, allowed: Iterable[RouteRole]) -> bool:
+        return not (await self.roles(user_id, route_id)).isdisjoint(allowed)
+
+    async def forget(self, user_id: int, route_id: int) -> None:
+        """Drop the memoized roles and the user's ACL snapshot after they have been changed."""
+        self._roles.pop((user_id, route_id), None)
+        await self.acl.invalidate_users(user_id)
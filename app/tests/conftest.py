@@ -15,13 +15,16 @@ os.environ["POSTGRES_USER"] = "admin"
 os.environ["POSTGRES_PASSWORD"] = "password"
 os.environ["POSTGRES_DB"] = "travel_ai_db"
 os.environ["REDIS_URL"] = "redis://localhost:6379/0"
+os.environ["REDIS_ENABLED"] = "False"
 os.environ["TELEGRAM_TOKEN"] = "test_telegram_token"
 os.environ["CHATGPT_API_KEY"] = "test_chatgpt_key"
+os.environ["AI_ENABLED"] = "False"
 os.environ["JWT_SECRET_KEY"] = "some-very-secret-value"
+os.environ["PASSWORD_HASH_ROUNDS"] = "4"
 
 from main import app as fastapi_app
 from db.base_class import Base
-from db.sessions import get_session
+from db.sessions import get_session, get_session_factory
 import fixtures.load_with_services as seed_mod
 
 # create an engine and sessionmaker for SQLite in-memory
@@ -37,6 +40,7 @@ async def override_get_session() -> AsyncSession:
 
 
 fastapi_app.dependency_overrides[get_session] = override_get_session
+fastapi_app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
 
 
 # fixture to create all tables before any test
@@ -57,6 +61,19 @@ async def init_db():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+# session factory for service level tests that need several independent sessions
+@pytest.fixture
+def session_factory():
+    return TestingSessionLocal
+
+
+# a standalone session for service/repository level tests
+@pytest_asyncio.fixture
+async def db_session():
+    async with TestingSessionLocal() as session:
+        yield session
+
+
 # an asynchronous HTTP client that will “hook” into app
 # @pytest_asyncio.fixture
 @pytest_asyncio.fixture(scope="session")
@@ -0,0 +1,248 @@
+# app/tests/test_ai_cache.py
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models import AICache, Route
+from repositories.ai_cache import AICacheRepository
+from schemas.ai_cache import AICacheCreate
+from services.cache_service import AICacheService, RedisCacheTier
+from utils.cache import TTLCache
+from utils.cache_keys import build_cache_key, normalize_location
+from utils.places import PlaceIndex
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the asyncio Redis client."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def make_service(session):
+    return AICacheService(
+        AICacheRepository(session),
+        l1=TTLCache(maxsize=16, ttl=60),
+        l2=RedisCacheTier(prefix="test:", ttl=60, client=FakeRedis()),
+    )
+
+
+def cache_entry(**overrides) -> AICacheCreate:
+    data = {
+        "cache_key": "",
+        "original_prompt": "Plan a trip",
+        "prompt_hash": "hash",
+        "origin": "Lisbon",
+        "destination": "Porto",
+        "duration_days": 2,
+        "budget": 700.0,
+        "interests": ["food"],
+        "result": {"name": "Lisbon to Porto", "days": []},
+        "expires_at": datetime.now(timezone.utc) + timedelta(days=1),
+    }
+    data.update(overrides)
+    return AICacheCreate(**data)
+
+
+@pytest.mark.asyncio
+async def test_find_similar_fills_tiers(db_session):
+    svc = make_service(db_session)
+
+    # seeded entry: first lookup goes to the database and fills both tiers
+    first = await svc.find_similar("Rome", "Rome", 3, 1300.0)
+    assert first is not None
+    assert (svc.l1.misses, svc.l2.misses) == (1, 1)
+    assert "test:rome:rome:3:1300" in svc.l2.client.data
+
+    # second lookup with differently formatted params is served by L1
+    second = await svc.find_similar(" ROME ", "rome", 3, 1299.5)
+    assert second.id == first.id
+    assert svc.l1.hits == 1
+
+    # a cold L1 falls back to L2
+    svc.l1.clear()
+    third = await svc.find_similar("Rome", "Rome", 3, 1300.0)
+    assert third.id == first.id
+    assert svc.l2.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_create_writes_through_and_delete_expired_invalidates(db_session):
+    svc = make_service(db_session)
+
+    created = await svc.create(cache_entry())
+    assert created.cache_key == "lisbon:porto:2:700"
+    assert created.cache_key in svc.l1
+    assert "test:lisbon:porto:2:700" in svc.l2.client.data
+
+    expired = await svc.create(cache_entry(destination="Faro", expires_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+    assert expired.cache_key not in svc.l1  # already expired entries are not cached
+
+    deleted = await svc.delete_expired(before=datetime.now(timezone.utc))
+    assert deleted >= 1
+    assert await svc.find_similar("Lisbon", "Faro", 2, 700.0) is None
+    assert await svc.find_similar("Lisbon", "Porto", 2, 700.0) is not None
+
+
+@pytest.mark.asyncio
+async def test_deleted_entries_leave_l1_of_every_worker(db_session):
+    """
+    Deleted entries are published on the invalidation bus by key and by id, so the shared L1
+    of every worker drops them - near matches kept under the requested key included.
+    """
+    import json
+
+    from services.cache_service import AI_CACHE_ID_TOPIC, AI_CACHE_KEY_TOPIC, ai_cache_l1
+    from utils.invalidation import InvalidationBus, invalidation_bus
+
+    # this worker publishes on its own bus, what it sends is delivered to the shared L1 as another worker's
+    bus = InvalidationBus(client=None)
+    published = []
+    for topic in (AI_CACHE_KEY_TOPIC, AI_CACHE_ID_TOPIC):
+        bus.subscribe(topic, lambda keys, topic=topic: published.append((topic, keys)))
+    svc = AICacheService(AICacheRepository(db_session), l2=make_service(db_session).l2, bus=bus)
+
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    entry = await svc.create(cache_entry(destination="Tomar", expires_at=expires_at))
+    near = await svc.find_similar("Lisbon", "Tomar", 3, 700.0)
+    assert near.id == entry.id and {entry.cache_key, "lisbon:tomar:3:700"} <= set(dict(ai_cache_l1.items()))
+
+    assert await svc.delete_expired(before=expires_at) >= 1
+    topics = dict(published)
+    assert entry.cache_key in topics[AI_CACHE_KEY_TOPIC] and entry.id in topics[AI_CACHE_ID_TOPIC]
+    for topic, keys in published:
+        invalidation_bus.deliver(json.dumps({"origin": "other-worker", "topic": topic, "keys": keys}))
+    assert entry.cache_key not in ai_cache_l1 and "lisbon:tomar:3:700" not in ai_cache_l1
+
+
+@pytest.mark.asyncio
+async def test_near_match_within_tolerance_bands(db_session):
+    svc = make_service(db_session)
+    days = [{"day_number": n, "date": None, "description": f"Day {n}", "activities": []} for n in (1, 2, 3)]
+    source = await svc.create(
+        cache_entry(destination="Sintra", duration_days=3, budget=1000.0, result={"name": "Sintra", "days": days})
+    )
+    await svc.create(
+        cache_entry(
+            destination="Sintra",
+            duration_days=3,
+            budget=1050.0,
+            interests=["hiking"],
+            result={"name": "Sintra hikes", "days": days},
+        )
+    )
+
+    # budget within ±10%: closest by interests wins, plan is used as is
+    near = await svc.find_similar("Lisbon", "Sintra", 3, 1001.0, interests=["Food"])
+    assert near.id == source.id
+    assert near.result["days"] == days
+    near = await svc.find_similar("Lisbon", "Sintra", 3, 1002.0, interests=["hiking"])
+    assert near.result["name"] == "Sintra hikes"
+
+    # a day shorter or longer: the plan is trimmed or extended
+    shorter = await svc.find_similar("Lisbon", "Sintra", 2, 1000.0)
+    assert [d["day_number"] for d in shorter.result["days"]] == [1, 2]
+    longer = await svc.find_similar("Lisbon", "Sintra", 4, 1000.0)
+    assert [d["day_number"] for d in longer.result["days"]] == [1, 2, 3, 4]
+    assert longer.result["days"][3]["activities"] == []
+    assert source.result["days"] == days  # the source entry is untouched
+
+    # outside of the bands
+    assert await svc.find_similar("Lisbon", "Sintra", 5, 1000.0) is None
+    assert await svc.find_similar("Lisbon", "Sintra", 3, 1300.0) is None
+    assert await AICacheService(svc.repo, l1=TTLCache(16, 60), l2=svc.l2, near_match=False).find_similar(
+        "Lisbon", "Sintra", 3, 1001.0
+    ) is None
+
+
+def test_place_aliases_share_one_cache_key():
+    assert {normalize_location(name) for name in ("NYC", "New York", " new york city", "Нью-Йорк")} == {"new york"}
+    # typos are caught by the trigram index above the similarity threshold, never in the backfill
+    index = PlaceIndex({"lisbon": ["lisboa"], "vienna": []}, fuzzy_threshold=0.5)
+    assert index.canonicalize("Lisabon") == "lisbon" and index.canonicalize("Lisabon", fuzzy=False) == "lisabon"
+    assert normalize_location("Lisabon") == "lisabon"  # the default threshold is stricter
+    assert normalize_location("  Some   Village ") == "some village"
+    assert build_cache_key("St. Petersburg", "Roma", 3, 999.2) == "saint petersburg:rome:3:1000"
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_matches_are_looked_up_never_stored(db_session, monkeypatch):
+    import utils.cache_keys as cache_keys_mod
+
+    index = PlaceIndex({"lisbon": ["lisboa"]}, fuzzy_threshold=0.5)
+    monkeypatch.setattr(cache_keys_mod, "get_place_index", lambda: index)
+    svc = make_service(db_session)
+
+    typo = await svc.create(cache_entry(origin="Lisabon", destination="Braga", duration_days=5))
+    assert (typo.cache_key, typo.origin) == ("lisabon:braga:5:700", "lisabon")
+    assert (await svc.find_similar("Lisabon", "Braga", 5, 700.0)).id == typo.id
+
+    # without an entry of its own, a misspelling finds the entry of the place it is matched to
+    exact = await svc.create(cache_entry(origin="Lisboa", destination="Braga", duration_days=8))
+    assert exact.cache_key == "lisbon:braga:8:700"
+    assert (await svc.find_similar("Lisabon", "Braga", 8, 700.0)).id == exact.id
+
+
+@pytest.mark.asyncio
+async def test_canonicalize_keys_collapses_duplicates(db_session):
+    # rows written before canonicalization existed
+    legacy = [
+        AICache(
+            cache_key=f"{origin}:tallinn:2:500",
+            origin=origin,
+            destination="tallinn",
+            duration_days=2,
+            budget=500,
+            hit_count=hits,
+            original_prompt="p",
+            prompt_hash="h",
+            result={"name": origin, "days": []},
+        )
+        for origin, hits in (("nyc", 3), ("new york city", 1))
+    ]
+    db_session.add_all(legacy)
+    await db_session.flush()
+    route = await db_session.get(Route, 1)
+    route.ai_cache_id = legacy[1].id
+    await db_session.commit()
+
+    from services.cache_service import AI_CACHE_ID_TOPIC
+    from utils.invalidation import InvalidationBus
+
+    svc = make_service(db_session)
+    svc.bus = InvalidationBus(client=None)
+    merged = []
+    svc.bus.subscribe(AI_CACHE_ID_TOPIC, merged.extend)
+    dry = await svc.canonicalize_keys(dry_run=True)
+    assert dry["collapsed"] >= 1
+    assert await svc.repo.get_by_cache_key("new york:tallinn:2:500") is None
+
+    report = await svc.canonicalize_keys()
+    assert report["collapsed"] == dry["collapsed"]
+    db_session.expire_all()
+    kept = await svc.repo.get_by_cache_key("new york:tallinn:2:500")
+    assert kept.id == legacy[0].id
+    assert (kept.origin, kept.hit_count) == ("new york", 4)
+    assert (await db_session.get(Route, 1)).ai_cache_id == kept.id
+    assert legacy[1].id in merged and kept.id not in merged  # the duplicate leaves L1 of other workers
+    assert (await svc.canonicalize_keys())["rekeyed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_internal_metrics_expose_cache_tiers(async_client):
+    resp = await async_client.get("/internal/metrics")
+    assert resp.status_code == 200
+    tiers = resp.json()["ai_cache"]
+    assert {"l1", "l2", "db"} <= tiers.keys()
+    assert tiers["l2"]["enabled"] is False
@@ -0,0 +1,105 @@
+# app/tests/test_ai_stream.py
+
+import json
+
+import httpx
+import pytest
+
+import services.crud.route_service as route_service_mod
+from fixtures.fake_llm import create_fake_llm_app, load_recorded_completion
+from services.ai_service import AIService, RouteStreamParser
+from utils.json_stream import JSONArrayStream
+
+
+def fake_ai_service(chunks) -> AIService:
+    fake = create_fake_llm_app(chunks)
+    return AIService(
+        api_key="test",
+        base_url="http://fake-llm",
+        model="gpt-4o-mini",
+        transport=httpx.ASGITransport(app=fake),
+    )
+
+
+def test_parser_emits_each_day_as_soon_as_it_closes():
+    chunks = load_recorded_completion("rome_3_days")
+    parser = RouteStreamParser()
+    emitted_at = []
+    for n, chunk in enumerate(chunks):
+        for day in parser.feed(chunk):
+            emitted_at.append((n, day.day_number))
+
+    assert [day for _, day in emitted_at] == [1, 2, 3]
+    # day 1 is ready long before the completion ends
+    assert emitted_at[0][0] < len(chunks) // 2
+
+    text = "".join(chunks)
+    expected = json.loads(text[text.index("{") : text.rindex("}") + 1])
+    assert parser.close() == expected
+    assert parser.days[0].activities[2].description == 'Try the "cacio e pepe" {house special}'
+
+
+def test_json_array_stream_handles_any_chunk_boundaries():
+    doc = {"name": "x", "meta": {"days": [{"no": "nested key"}]}, "days": [{"a": "}]\\\"{["}, {"b": [1, {"c": 2}]}]}
+    text = "Sure! " + json.dumps(doc) + " Enjoy."
+    for size in (1, 2, 3, 7):
+        stream = JSONArrayStream("days")
+        items = []
+        for i in range(0, len(text), size):
+            items.extend(stream.feed(text[i : i + size]))
+        assert items == doc["days"]
+        assert stream.close() == doc
+
+    stream = JSONArrayStream("days")
+    stream.feed('{"name": "cut", "days": [{"day_number": 1}')
+    with pytest.raises(ValueError):
+        stream.close()
+
+
+@pytest.mark.asyncio
+async def test_ai_service_streams_days_from_recorded_completion():
+    ai = fake_ai_service(load_recorded_completion("rome_3_days"))
+    prompt = ai.build_prompt("Paris", "Rome", 3, 900.0, ["food"])
+
+    parser = RouteStreamParser()
+    days = [day async for day in ai.stream_route(prompt, parser)]
+    assert [day.day_number for day in days] == [1, 2, 3]
+    assert parser.result["name"].startswith("Rome in 3 days")
+
+    plan = await ai.generate_route(prompt)
+    assert len(plan["days"]) == 3
+    await ai.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_route_endpoint(async_client, auth_headers, monkeypatch):
+    ai = fake_ai_service(load_recorded_completion("rome_3_days"))
+    monkeypatch.setattr(route_service_mod, "get_ai_service", lambda: ai)
+    payload = {"origin": "Paris", "destination": "Rome (stream)", "duration_days": 3, "budget": 900.0}
+
+    resp = await async_client.post("/routes/stream", json=payload, headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    events = [json.loads(line) for line in resp.text.splitlines()]
+    assert [e["event"] for e in events] == ["day", "day", "day", "route"]
+    assert [e["data"]["day_number"] for e in events[:3]] == [1, 2, 3]
+
+    route = (await async_client.get(f"/routes/{events[-1]['data']['id']}", headers=auth_headers)).json()
+    assert len(route["days"]) == 3
+    assert route["route_data"]["name"] == route["name"]
+
+    # now cached: the days are replayed without calling the model again
+    requests_before = len(ai._transport.app.state.requests)
+    resp = await async_client.post("/routes/stream", json=payload, headers=auth_headers)
+    assert [json.loads(line)["event"] for line in resp.text.splitlines()] == ["day", "day", "day", "route"]
+    assert len(ai._transport.app.state.requests) == requests_before
+    await ai.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_route_endpoint_reports_errors(async_client, auth_headers):
+    # AI is disabled in tests and nothing is cached for these parameters
+    payload = {"origin": "Nowhere", "destination": "Atlantis (stream)", "duration_days": 2, "budget": 100.0}
+    resp = await async_client.post("/routes/stream", json=payload, headers=auth_headers)
+    events = [json.loads(line) for line in resp.text.splitlines()]
+    assert events[-1]["event"] == "error"
@@ -29,3 +29,162 @@ async def test_register_and_login(async_client):
     bad = {"username": payload["email"], "password": "wrong"}
     resp4 = await async_client.post("/auth/login", data=bad)
     assert resp4.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_cached_until_deactivated(async_client, db_session):
+    from sqlalchemy import update
+
+    from models import User
+    from utils.query_counter import count_queries
+
+    payload = {"email": "cached@example.com", "password": "pass"}
+    user_id = (await async_client.post("/auth/register", json=payload)).json()["id"]
+    login = {"username": payload["email"], "password": payload["password"]}
+    headers = {"Authorization": f"Bearer {(await async_client.post('/auth/login', data=login)).json()['access_token']}"}
+
+    assert (await async_client.get("/auth/me", headers=headers)).status_code == 200
+    # the principal is cached: the request doesn't touch the database
+    with count_queries() as queries:
+        resp = await async_client.get("/auth/me", headers=headers)
+    assert resp.status_code == 200 and resp.json()["id"] == user_id
+    assert queries.value == 0
+
+    # only superusers deactivate users
+    assert (await async_client.post(f"/users/{user_id}/deactivate")).status_code == 401
+    assert (await async_client.post(f"/users/{user_id}/deactivate", headers=headers)).status_code == 403
+    admin = {"email": "deactivator@example.com", "password": "pass"}
+    await async_client.post("/auth/register", json=admin)
+    await db_session.execute(update(User).where(User.email == admin["email"]).values(is_superuser=True))
+    await db_session.commit()
+    tok = (await async_client.post("/auth/login", data={"username": admin["email"], "password": "pass"})).json()
+    admin_headers = {"Authorization": f"Bearer {tok['access_token']}"}
+
+    # deactivation drops the cached principal: the token and the password are rejected
+    resp = await async_client.post(f"/users/{user_id}/deactivate", headers=admin_headers)
+    assert resp.json()["is_active"] is False
+    assert (await async_client.get("/auth/me", headers=headers)).status_code == 401
+    assert (await async_client.post("/auth/login", data=login)).status_code == 401
+
+    # so is a deleted user's token
+    payload = {"email": "deleted@example.com", "password": "pass"}
+    user_id = (await async_client.post("/auth/register", json=payload)).json()["id"]
+    login = {"username": payload["email"], "password": payload["password"]}
+    headers = {"Authorization": f"Bearer {(await async_client.post('/auth/login', data=login)).json()['access_token']}"}
+    assert (await async_client.get("/auth/me", headers=headers)).status_code == 200
+    assert (await async_client.delete(f"/users/{user_id}")).status_code == 204
+    assert (await async_client.get("/auth/me", headers=headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_backpressure_and_rehash(async_client, monkeypatch):
+    import asyncio
+
+    from passlib.context import CryptContext
+
+    from exceptions.user import PasswordHasherBusyError
+    from utils.security import PasswordHasher, password_hasher
+
+    # one running hash, nothing queued: a concurrent one is rejected
+    hasher = PasswordHasher(CryptContext(schemes=["bcrypt"], bcrypt__rounds=6, bcrypt__min_rounds=6), 1, 0)
+    results = await asyncio.gather(hasher.hash("a"), hasher.hash("b"), return_exceptions=True)
+    assert isinstance(results[1], PasswordHasherBusyError) and hasher.stats()["rejected"] == 1
+
+    # a hash with outdated cost is upgraded on successful verification only
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+    assert await hasher.verify_and_update("wrong", old_hash) == (False, None)
+    ok, new_hash = await hasher.verify_and_update("secret", old_hash)
+    assert ok and "$06$" in new_hash
+    assert await hasher.verify_and_update("secret", new_hash) == (True, None)
+    hasher.shutdown()
+
+    # a saturated pool turns logins away with 503 instead of stalling
+    payload = {"email": "busy@example.com", "password": "pass"}
+    await async_client.post("/auth/register", json=payload)
+    monkeypatch.setattr(password_hasher, "max_queue", -password_hasher.workers)
+    resp = await async_client.post("/auth/login", data={"username": payload["email"], "password": payload["password"]})
+    assert resp.status_code == 503 and resp.headers["retry-after"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_counts_hashes_of_cancelled_callers():
+    """
+    A hash keeps its slot until the executor is done with it, even if its caller is gone.
+    """
+    import asyncio
+    import threading
+
+    from exceptions.user import PasswordHasherBusyError
+    from utils.security import PasswordHasher
+
+    release = threading.Event()
+
+    class BlockingContext:
+        def hash(self, plain):
+            release.wait(5)
+            return plain
+
+    hasher = PasswordHasher(BlockingContext(), workers=1, max_queue=1)
+    try:
+        callers = [asyncio.create_task(hasher.hash(str(n))) for n in range(2)]
+        await asyncio.sleep(0.05)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        # the queued hash is cancelled with its caller, the running one still takes a worker
+        assert hasher.stats()["in_flight"] == 1
+        queued = asyncio.create_task(hasher.hash("queued"))
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHasherBusyError):
+            await hasher.hash("rejected")
+
+        release.set()
+        assert await queued == "queued"
+        for _ in range(100):
+            if hasher.stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert hasher.stats()["in_flight"] == 0 and hasher.stats()["completed"] == 3
+    finally:
+        release.set()
+        hasher.shutdown()
+
+
+def test_jwt_backends_are_interchangeable():
+    import time
+
+    from jose import JWTError
+
+    from utils.security import HMACJWTBackend, JoseJWTBackend, verified_tokens, verify_access_token
+
+    jose_backend, lean = JoseJWTBackend("secret", "HS256"), HMACJWTBackend("secret", "HS256")
+    claims = {"sub": "42", "telegram": False, "exp": int(time.time()) + 60}
+    assert lean.decode(jose_backend.encode(claims)) == claims
+    assert jose_backend.decode(lean.encode(claims)) == claims
+
+    token = lean.encode(claims)
+    header, payload, signature = token.split(".")
+    forged = lean._b64encode(b'{"sub":"1","exp":9999999999}').decode()
+    bad_tokens = [
+        f"{header}.{forged}.{signature}",
+        HMACJWTBackend("other", "HS256").encode(claims),
+        lean.encode({**claims, "exp": int(time.time()) - 1}),
+        JoseJWTBackend("secret", "HS512").encode(claims),
+        f"{header}.{payload}",
+        "garbage",
+    ]
+    for bad in bad_tokens:
+        for backend in (jose_backend, lean):
+            with pytest.raises(JWTError):
+                backend.decode(bad)
+
+    # verified tokens are served from the cache, keyed by the whole token
+    from utils.security import create_access_token
+
+    token = create_access_token("7")
+    hits = verified_tokens.hits
+    assert verify_access_token(token).sub == "7"
+    assert verify_access_token(token).sub == "7"
+    assert verified_tokens.hits == hits + 1
+    with pytest.raises(JWTError):
+        verify_access_token(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
@@ -0,0 +1,63 @@
+# app/tests/test_db_pool.py
+
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from db.pool import PoolMetrics, pool_options
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics(tmp_path):
+    """
+    Checkouts are timed, a full pool counts as saturated and waits beyond
+    the pool timeout are counted as timeouts, in both pool modes.
+    """
+    url = f"sqlite+aiosqlite:///{tmp_path}/pool.db"
+    metrics = PoolMetrics("queue", capacity=2, log_interval=60)
+    options = pool_options("queue", metrics, size=1, max_overflow=1, timeout=0.2, recycle=-1, pre_ping=False)
+    engine = create_async_engine(url, **options)
+    try:
+        async with engine.connect() as first, engine.connect() as second:
+            for conn in (first, second):
+                await conn.execute(text("SELECT 1"))
+            stats = metrics.stats(engine.pool)
+            assert (stats["checked_out"], stats["overflow"], stats["saturated_checkouts"]) == (2, 1, 1)
+            with pytest.raises(exc.TimeoutError):
+                await engine.connect().start()
+
+        # a waiting checkout gets the connection returned meanwhile
+        async with engine.connect():
+            waiting = asyncio.create_task(engine.connect().start())
+            await asyncio.sleep(0.05)
+        await (await waiting).close()
+
+        stats = metrics.stats(engine.pool)
+        assert stats["checked_out"] == 0 and stats["timeouts"] == 1
+        assert stats["checkouts"] == sum(stats["wait_histogram"].values()) - 1 == 4
+        assert stats["wait_max_ms"] >= 200
+        await engine.dispose()  # the recreated pool reports to the same metrics
+        async with engine.connect():
+            assert metrics.stats(engine.pool)["checked_out"] == 1
+    finally:
+        await engine.dispose()
+
+    metrics = PoolMetrics("null", capacity=0, log_interval=60)
+    engine = create_async_engine(url, **pool_options("null", metrics, 1, 0, 0.2, -1, False))
+    try:
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        stats = metrics.stats(engine.pool)
+        assert (stats["checkouts"], stats["checked_out"], stats["saturated_checkouts"]) == (3, 0, 0)
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_endpoint(async_client):
+    stats = (await async_client.get("/internal/metrics")).json()["db_pool"]
+    assert stats["mode"] == "queue" and stats["capacity"] > 0
+    assert set(stats["wait_histogram"]) >= {"1ms", "5000ms", "inf"}
@@ -0,0 +1,218 @@
+# app/tests/test_exports.py
+
+import pytest
+
+from services.export_worker import export_workers
+
+
+# as with generation jobs, the tests wait for the local workers before touching the shared database again
+
+
+@pytest.mark.asyncio
+async def test_pdf_export(async_client, auth_headers, route_data1, monkeypatch, tmp_path):
+    monkeypatch.setattr(export_workers.artifacts, "directory", str(tmp_path))
+    route = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()
+
+    resp = await async_client.post(f"/routes/{route['id']}/exports", json={"export_type": "pdf"}, headers=auth_headers)
+    assert resp.status_code == 202, resp.text
+    export = resp.json()
+    assert export["status"] == "queued"
+
+    await export_workers.join()
+    export = (await async_client.get(f"/routes/{route['id']}/exports/{export['id']}", headers=auth_headers)).json()
+    assert export["status"] == "success", export
+    assert export["file_path"].startswith(str(tmp_path))
+
+    resp = await async_client.get(f"/routes/{route['id']}/exports/{export['id']}/file", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/pdf"
+    assert resp.content.startswith(b"%PDF-1.4") and resp.content.rstrip().endswith(b"%%EOF")
+    # one page object per rendered page, the three-day plan fits on the first one at least
+    assert resp.content.count(b"/Type /Page ") >= 1
+
+    listed = (await async_client.get(f"/routes/{route['id']}/exports", headers=auth_headers)).json()
+    assert [e["id"] for e in listed] == [export["id"]]
+    assert export_workers.stats()["completed"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_failed_and_foreign_exports(async_client, auth_headers, route_data1, monkeypatch, tmp_path):
+    monkeypatch.setattr(export_workers.artifacts, "directory", str(tmp_path))
+    route = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()
+    other_route = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()
+
+    # no calendar backend is configured -> the export fails, not the request
+    resp = await async_client.post(
+        f"/routes/{route['id']}/exports", json={"export_type": "google_calendar"}, headers=auth_headers
+    )
+    export = resp.json()
+    await export_workers.join()
+    export = (await async_client.get(f"/routes/{route['id']}/exports/{export['id']}", headers=auth_headers)).json()
+    assert export["status"] == "failed" and export["error_message"]
+    resp = await async_client.get(f"/routes/{route['id']}/exports/{export['id']}/file", headers=auth_headers)
+    assert resp.status_code == 409
+
+    # exports are addressed through their own route only
+    resp = await async_client.get(f"/routes/{other_route['id']}/exports/{export['id']}", headers=auth_headers)
+    assert resp.status_code == 404
+
+    # users without access to the route can neither queue nor see exports
+    reg = {"email": "exports-other@example.com", "password": "pass"}
+    await async_client.post("/auth/register", json=reg)
+    tok = (await async_client.post("/auth/login", data={"username": reg["email"], "password": reg["password"]})).json()
+    other = {"Authorization": f"Bearer {tok['access_token']}"}
+    assert (await async_client.post(f"/routes/{route['id']}/exports", json={}, headers=other)).status_code == 403
+    assert (await async_client.get(f"/routes/{route['id']}/exports/{export['id']}", headers=other)).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_claim_next_export(async_client, auth_headers, route_data1, db_session, session_factory):
+    """
+    Claims hand out every queued export once, oldest first, and reclaim exports
+    whose worker stopped updating them.
+    """
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import update
+
+    from models.export import Export, ExportStatus, ExportType
+    from repositories.export import ExportRepository
+
+    route = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()
+    repo = ExportRepository(db_session)
+    queued = [await repo.create(route["id"], route["owner_id"], ExportType.PDF) for _ in range(3)]
+
+    claimed = []
+    for _ in range(4):
+        async with session_factory() as session:
+            export = await ExportRepository(session).claim_next(stale_after=60)
+            claimed.append(export and (export.id, export.status))
+    assert claimed == [(e.id, ExportStatus.PROCESSING) for e in queued] + [None]
+
+    stale = datetime.now(timezone.utc) - timedelta(seconds=120)
+    await db_session.execute(update(Export).where(Export.id == queued[1].id).values(updated_at=stale))
+    await db_session.commit()
+    async with session_factory() as session:
+        assert (await ExportRepository(session).claim_next(stale_after=60)).id == queued[1].id
+
+    for export in queued:
+        assert await repo.finish(export.id, ExportStatus.FAILED, error_message="test")
+    assert not await repo.finish(queued[0].id, ExportStatus.SUCCESS, file_path="/nowhere.pdf")
+
+
+@pytest.mark.asyncio
+async def test_export_artifacts_reused(async_client, auth_headers, route_data1, monkeypatch, tmp_path, session_factory):
+    """
+    Exports of unchanged content share one rendered file; editing the route renders a new one;
+    the store evicts least recently used files beyond its size limit.
+    """
+    import os
+
+    from repositories.export import ExportRepository
+    from services.crud.export_service import ExportService
+    from utils.artifacts import ArtifactStore
+    from utils.streaming import file_stream
+
+    monkeypatch.setattr(export_workers.artifacts, "directory", str(tmp_path))
+    route = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()
+    twin = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()
+
+    async def export(route_id: int) -> dict:
+        resp = await async_client.post(f"/routes/{route_id}/exports", json={}, headers=auth_headers)
+        await export_workers.join()
+        export_id = resp.json()["id"]
+        export = (await async_client.get(f"/routes/{route_id}/exports/{export_id}", headers=auth_headers)).json()
+        assert export["status"] == "success", export
+        return export
+
+    stats = export_workers.artifacts.stats()
+    first = await export(route["id"])
+    again = await export(route["id"])  # same route version
+    same = await export(twin["id"])  # same content
+    assert first["file_path"] == again["file_path"] == same["file_path"]
+    after = export_workers.artifacts.stats()
+    assert (after["hits"] - stats["hits"], after["misses"] - stats["misses"]) == (2, 1)
+
+    edit = {"date": None, "description": "Rest day", "activities": [{"name": "Sleep in"}]}
+    resp = await async_client.put(f"/routes/{route['id']}/days/1", json=edit, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    edited = await export(route["id"])
+    assert edited["file_path"] != first["file_path"]
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(e["file_path"]) for e in (first, edited))
+
+    # a successful export whose file was evicted is rendered again on download
+    os.remove(edited["file_path"])
+    url = f"/routes/{route['id']}/exports/{edited['id']}"
+    assert (await async_client.get(f"{url}/file", headers=auth_headers)).status_code == 409
+    await export_workers.join()
+    resp = await async_client.get(f"{url}/file", headers=auth_headers)
+    assert resp.status_code == 200 and resp.content.startswith(b"%PDF")
+    assert resp.headers["content-disposition"] == f'attachment; filename="route-{route["id"]}-{edited["id"]}.pdf"'
+
+    # a file evicted while it is being sent is sent in full: it was opened before
+    async with session_factory() as session:
+        svc = ExportService(ExportRepository(session), session_factory)
+        file = await svc.open_export_file(route["id"], edited["id"])
+    os.remove(file.name)
+    assert b"".join([chunk async for chunk in file_stream(file, chunk_size=256)]) == resp.content
+    assert file.closed
+
+    # eviction: oldest first, down to the size limit
+    store = ArtifactStore(str(tmp_path / "store"), suffix=".pdf", max_bytes=250, max_age=0)
+    store.prepare()
+    for n, key in enumerate("abc"):
+        with open(store.path(key), "wb") as f:
+            f.write(b"x" * 100)
+        os.utime(store.path(key), (1000 + n, 1000 + n))
+    assert store.get("a") is not None  # used again: now the most recent one
+    assert store.evict() == 1
+    assert store.get("b") is None and store.get("a") and store.get("c")
+    assert store.stats()["bytes"] == 200
+
+
+@pytest.mark.asyncio
+async def test_route_calendar(async_client, auth_headers, route_data1, monkeypatch, tmp_path):
+    """
+    The iCalendar export has one event per activity, for routes sharing their plan and
+    materialized ones alike, and is what a calendar sync backend receives.
+    """
+    from utils.config import settings
+
+    route = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()
+
+    async def calendar() -> str:
+        resp = await async_client.get(f"/routes/{route['id']}/calendar.ics", headers=auth_headers)
+        assert resp.status_code == 200, resp.text
+        assert resp.headers["content-type"].startswith("text/calendar")
+        text = resp.text
+        assert text.startswith("BEGIN:VCALENDAR\r\n") and text.endswith("END:VCALENDAR\r\n")
+        assert all(len(line.encode()) <= 75 for line in text.split("\r\n"))
+        return text
+
+    shared = await calendar()
+    assert shared.count("BEGIN:VEVENT\r\n") == route["activity_count"] > 0
+
+    # an activity running past midnight ends on the next day
+    night = {"name": "Night; out", "start_time": "23:00", "end_time": "01:30"}
+    edit = {"date": "2030-01-01", "description": "Late", "activities": [night]}
+    resp = await async_client.put(f"/routes/{route['id']}/days/1", json=edit, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    materialized = await calendar()
+    count = (await async_client.get(f"/routes/{route['id']}", headers=auth_headers)).json()["activity_count"]
+    assert materialized.count("BEGIN:VEVENT\r\n") == count
+    assert "DTSTART:20300101T230000\r\nDTEND:20300102T013000\r\nSUMMARY:Night\\; out\r\n" in materialized
+
+    # calendar exports go to the configured sync backend
+    monkeypatch.setattr(settings, "CALENDAR_SYNC_BACKEND", "file")
+    monkeypatch.setattr(settings, "CALENDAR_SYNC_DIR", str(tmp_path))
+    resp = await async_client.post(
+        f"/routes/{route['id']}/exports", json={"export_type": "google_calendar"}, headers=auth_headers
+    )
+    await export_workers.join()
+    export_id = resp.json()["id"]
+    export = (await async_client.get(f"/routes/{route['id']}/exports/{export_id}", headers=auth_headers)).json()
+    assert export["status"] == "success", export
+    with open(export["external_id"], encoding="utf-8", newline="") as f:
+        synced = f.read()
+    strip = lambda text: [line for line in text.split("\r\n") if not line.startswith("DTSTAMP")]  # noqa: E731
+    assert strip(synced) == strip(materialized)
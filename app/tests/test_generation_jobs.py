@@ -0,0 +1,168 @@
+# app/tests/test_generation_jobs.py
+
+import json
+
+import pytest
+
+from services.generation_worker import generation_workers
+
+
+# the test database is a single shared in-memory connection, so the tests let the
+# local workers finish before touching the database again instead of polling concurrently
+
+
+@pytest.mark.asyncio
+async def test_enqueue_and_poll_generation_job(async_client, auth_headers, route_data1):
+    resp = await async_client.post("/routes/jobs", json=route_data1, headers=auth_headers)
+    assert resp.status_code == 202, resp.text
+    job = resp.json()
+    assert job["status"] == "queued"
+
+    await generation_workers.join()
+    resp = await async_client.get(f"/routes/jobs/{job['id']}", headers=auth_headers)
+    assert resp.status_code == 200
+    job = resp.json()
+    assert job["status"] == "success", job
+    assert job["progress"] == 100
+
+    route = await async_client.get(f"/routes/{job['route_id']}", headers=auth_headers)
+    assert route.status_code == 200
+    assert route.json()["origin"] == route_data1["origin"]
+
+
+@pytest.mark.asyncio
+async def test_generation_job_events_stream(async_client, auth_headers, route_data1):
+    job = (await async_client.post("/routes/jobs", json=route_data1, headers=auth_headers)).json()
+    await generation_workers.join()
+
+    resp = await async_client.get(f"/routes/jobs/{job['id']}/events", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    blocks = [block.splitlines() for block in resp.text.strip().split("\n\n")]
+    assert [block[0] for block in blocks] == ["event: progress", "event: result"], resp.text
+
+    # the result is the route as GET /routes/{id} returns it: a route sharing the cached plan
+    # has no days of its own, they and route_data come from the plan
+    result = json.loads(blocks[-1][1].removeprefix("data: "))
+    route = (await async_client.get(f"/routes/{result['id']}", headers=auth_headers)).json()
+    assert result["route_data"] and result["route_data"] == route["route_data"]
+    assert len(result["days"]) == len(route["days"]) == route_data1["duration_days"]
+
+
+@pytest.mark.asyncio
+async def test_failed_generation_job_and_foreign_job(async_client, auth_headers):
+    # no cache entry and no AI configured -> the job fails instead of the request
+    payload = {"origin": "Nowhere", "destination": "Atlantis", "duration_days": 2, "budget": 100.0}
+    job = (await async_client.post("/routes/jobs", json=payload, headers=auth_headers)).json()
+    await generation_workers.join()
+
+    job = (await async_client.get(f"/routes/jobs/{job['id']}", headers=auth_headers)).json()
+    assert job["status"] == "failed"
+    assert job["error_message"]
+
+    # jobs of other users are not visible
+    reg = {"email": "jobs-other@example.com", "password": "pass"}
+    await async_client.post("/auth/register", json=reg)
+    tok = (await async_client.post("/auth/login", data={"username": reg["email"], "password": reg["password"]})).json()
+    other = {"Authorization": f"Bearer {tok['access_token']}"}
+    resp = await async_client.get(f"/routes/jobs/{job['id']}", headers=other)
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_generation_job_heartbeat_and_timeout(auth_headers, route_data1, session_factory, monkeypatch):
+    """
+    A running job reports the days generated so far and stays claimed;
+    a generation running past the job timeout fails instead of being run again.
+    """
+    import asyncio
+
+    from models.generation_job import GenerationJobStatus
+    from models.user import User
+    from repositories.generation_job import GenerationJobRepository
+    from services.crud.route_service import RouteService
+    from services.generation_worker import GenerationWorkerPool
+    from sqlalchemy import select
+
+    async def slow_create_route(self, payload, owner_id, on_day=None, commit=True):
+        on_day({"day_number": 1})
+        on_day({"day_number": 2})
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(RouteService, "create_route", slow_create_route)
+    async with session_factory() as session:
+        user_id = await session.scalar(select(User.id).where(User.email == "test@example.com"))
+        job = await GenerationJobRepository(session).create(user_id=user_id, params=route_data1)
+
+    pool = GenerationWorkerPool(1, poll_interval=0.05, stale_after=0.5)
+    pool.start(session_factory)
+    try:
+        pool.submit(job.id)
+        await asyncio.sleep(0.3)
+        async with session_factory() as session:
+            running = await GenerationJobRepository(session).get(job.id)
+        # refreshed by the heartbeat with the days received so far
+        assert running.status == GenerationJobStatus.RUNNING
+        assert running.progress == 10 + 80 * 2 // route_data1["duration_days"]
+        await pool.join()
+    finally:
+        await pool.stop()
+
+    async with session_factory() as session:
+        job = await GenerationJobRepository(session).get(job.id)
+    assert job.status == GenerationJobStatus.FAILED and "timed out" in job.error_message
+
+
+@pytest.mark.asyncio
+async def test_requeued_generation_job_creates_one_route(auth_headers, route_data1, session_factory, monkeypatch):
+    """
+    A run that lost its claim - the job was requeued as stale and run again meanwhile -
+    drops its route together with its result: the job ends up with exactly one route.
+    """
+    from sqlalchemy import func, select, update
+
+    from models.generation_job import GenerationJob, GenerationJobStatus
+    from models.route import Route
+    from models.user import User
+    from repositories.generation_job import GenerationJobRepository
+    from services.crud.route_service import RouteService
+    from services.generation_worker import GenerationWorkerPool
+
+    # no heartbeat during the test: on the single test connection its commits would commit the run as well
+    pool = GenerationWorkerPool(1, poll_interval=10, stale_after=30)
+    create_route = RouteService.create_route
+    runs = []
+
+    async def requeued_create_route(self, payload, owner_id, on_day=None, commit=True):
+        runs.append(owner_id)
+        if len(runs) == 1:
+            # the job looked stale: it is requeued and run to the end by another worker
+            await self.route_repo.session.commit()  # nothing written yet, frees the single test connection
+            async with session_factory() as session:
+                await session.execute(
+                    update(GenerationJob).where(GenerationJob.id == job.id).values(status=GenerationJobStatus.QUEUED)
+                )
+                await session.commit()
+            await pool._run(job.id)
+        return await create_route(self, payload, owner_id, on_day=on_day, commit=commit)
+
+    monkeypatch.setattr(RouteService, "create_route", requeued_create_route)
+    async with session_factory() as session:
+        user_id = await session.scalar(select(User.id).where(User.email == "test@example.com"))
+        routes_before = await session.scalar(select(func.count(Route.id)).where(Route.owner_id == user_id))
+        job = await GenerationJobRepository(session).create(user_id=user_id, params=route_data1)
+
+    pool.start(session_factory)
+    try:
+        pool.submit(job.id)
+        await pool.join()
+    finally:
+        await pool.stop()
+
+    async with session_factory() as session:
+        job = await GenerationJobRepository(session).get(job.id)
+        routes = await session.scalar(select(func.count(Route.id)).where(Route.owner_id == user_id))
+    assert len(runs) == 2
+    assert job.status == GenerationJobStatus.SUCCESS and job.attempt == 2 and job.route_id is not None
+    assert routes == routes_before + 1
+    assert pool.stats()["completed"] == 1
@@ -0,0 +1,81 @@
+# app/tests/test_read_replicas.py
+
+import pytest
+from sqlalchemy import exc, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from db.routing import READ_ONLY, Replica, ReplicaSet, RoutingSession, read_only, use_primary
+from models.user import User
+from repositories.user import UserRepository
+
+
+class UserStream:
+    def __init__(self, session):
+        self.session = session
+
+    @read_only
+    async def names(self):
+        result = await self.session.stream(select(User.username))
+        async for batch in result.partitions():
+            yield [name for name, in batch]
+
+
+@pytest.mark.asyncio
+async def test_read_replica_routing(tmp_path):
+    """
+    Read-only methods go to healthy replicas in turn, other reads and sessions that
+    have written go to the primary; replicas that fail are skipped until checked again.
+    """
+    engines = {name: create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/{name}.db") for name in ("primary", "a", "b")}
+    # the same user in every database, with the database's name to tell where a read went
+    for name, engine in engines.items():
+        async with engine.begin() as conn:
+            await conn.run_sync(User.__table__.create)
+            await conn.execute(User.__table__.insert().values(email="user@example.com", username=name))
+    missing = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/c.db")
+    replicas = ReplicaSet([Replica("a", engines["a"]), Replica("b", engines["b"]), Replica("c", missing)])
+    factory = async_sessionmaker(
+        bind=engines["primary"], class_=AsyncSession, sync_session_class=RoutingSession, replicas=replicas
+    )
+
+    async def read(session) -> str:
+        user = await UserRepository(session).get_by_email("user@example.com")
+        session.expunge_all()
+        return user.username
+
+    try:
+        async with factory() as session:
+            assert [await read(session) for _ in range(2)] == ["a", "b"]
+            # c can't be reached: it is marked down and the read fails, the next one skips it
+            with pytest.raises(exc.OperationalError):
+                await read(session)
+            await session.rollback()
+            assert [await read(session) for _ in range(2)] == ["a", "b"]
+            # not a read-only method
+            assert (await UserRepository(session).get(1)).username == "primary"
+            # a read-only stream reads from a replica while it produces a batch, not in between
+            stream = UserStream(session).names()
+            assert await stream.__anext__() == ["a"]
+            assert not session.info.get(READ_ONLY)
+            await stream.aclose()
+
+        async with factory() as session:
+            await UserRepository(session).set_active(1, True)
+            assert await read(session) == "primary"
+        async with factory() as session:
+            use_primary(session)
+            assert await read(session) == "primary"
+
+        await replicas.check()
+        stats = replicas.stats()
+        assert [r["healthy"] for r in stats["replicas"]] == [True, True, False]
+        assert stats["replicas"][2]["last_error"] and stats["pinned_reads"] == 2
+
+        for replica in replicas.replicas[:2]:
+            replicas.mark_down(replica, OSError("test"))
+        async with factory() as session:
+            assert await read(session) == "primary"
+        assert replicas.stats()["fallback_reads"] == 1
+    finally:
+        for engine in (*engines.values(), missing):
+            await engine.dispose()
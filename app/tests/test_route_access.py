@@ -65,3 +65,63 @@ async def test_route_access_flow(async_client, auth_headers, route_data1):
     # 10) After revoke second user can't get share code again
     r3 = await async_client.get(f"/route-access/{rid}/get-share-code", headers=h2)
     assert r3.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_role_check_is_one_query_and_memoized(async_client, auth_headers, route_data1, db_session):
+    from api.dependencies.access import get_route_access_service
+    from constants.roles import RouteRole
+    from exceptions.route import PermissionDeniedError
+    from utils.query_counter import count_queries
+
+    rid = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()["id"]
+    owner_id = (await async_client.get(f"/routes/{rid}", headers=auth_headers)).json()["owner_id"]
+    svc = await get_route_access_service(db_session)
+    all_roles = [RouteRole.VIEWER, RouteRole.EDITOR, RouteRole.CREATOR]
+    await svc.permissions.acl.invalidate_users(owner_id)
+
+    with count_queries() as queries:
+        assert await svc.check_user_has_access(owner_id, rid, all_roles)
+    assert queries.value == 1
+
+    # later checks are served from the user's ACL snapshot
+    with count_queries() as queries:
+        assert await svc.check_user_has_access(owner_id, rid, [RouteRole.CREATOR])
+        with pytest.raises(PermissionDeniedError):
+            await svc.check_user_has_access(owner_id, rid, [RouteRole.VIEWER])
+    assert queries.value == 0
+
+
+@pytest.mark.asyncio
+async def test_acl_cache_is_invalidated_across_workers(async_client, auth_headers, route_data2, db_session):
+    import json
+
+    from api.dependencies.access import get_route_access_service
+    from constants.roles import RouteRole
+    from services.permissions import route_acl
+    from utils.query_counter import count_queries
+
+    rid = (await async_client.post("/routes/", json=route_data2, headers=auth_headers)).json()["id"]
+    owner_id = (await async_client.get(f"/routes/{rid}", headers=auth_headers)).json()["owner_id"]
+    svc = await get_route_access_service(db_session)
+
+    with count_queries() as queries:
+        assert await svc.permissions.roles(owner_id, rid) == {RouteRole.CREATOR}
+    assert queries.value == 0
+
+    # another worker revoked something of this user: the snapshot is reloaded
+    route_acl.bus.deliver(json.dumps({"origin": "other-worker", "topic": route_acl.USER_TOPIC, "keys": [owner_id]}))
+    with count_queries() as queries:
+        assert await svc.permissions.roles(owner_id, rid) == {RouteRole.CREATOR}
+    assert queries.value == 1
+
+    # our own messages echoed back by Redis are ignored
+    route_acl.bus.deliver(json.dumps({"origin": route_acl.bus.origin, "topic": route_acl.USER_TOPIC, "keys": [owner_id]}))
+    with count_queries() as queries:
+        await svc.permissions.roles(owner_id, rid)
+    assert queries.value == 0
+
+    # deleting the route drops it from every snapshot holding it
+    assert (await async_client.delete(f"/routes/{rid}", headers=auth_headers)).status_code == 204
+    assert await svc.permissions.roles(owner_id, rid) == frozenset()
+    assert (await async_client.get(f"/routes/{rid}", headers=auth_headers)).status_code in (403, 404)
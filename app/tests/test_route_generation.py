@@ -0,0 +1,101 @@
+# app/tests/test_route_generation.py
+
+import asyncio
+import json
+
+import pytest
+
+from repositories import AICacheRepository, RouteAccessRepository, RouteRepository, UserRepository
+from schemas.route import RouteGenerateRequest
+from services.ai_service import AIService
+from services.crud.route_service import RouteService
+from utils.single_flight import SingleFlight
+
+
+class FakeAIService:
+    """Counts calls and streams a fixed plan (one day per chunk) after a short delay."""
+
+    build_prompt = staticmethod(AIService.build_prompt)
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+
+    async def stream_route(self, prompt, parser):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        duration_days = int(prompt.split("-day")[0].rsplit(" ", 1)[-1])
+        plan = {
+            "name": "Express trip",
+            "days": [
+                {
+                    "day_number": day,
+                    "date": None,
+                    "description": f"Day {day}",
+                    "activities": [{"name": "Walk", "cost": 5.0}],
+                }
+                for day in range(1, duration_days + 1)
+            ],
+        }
+        text = json.dumps(plan)
+        for chunk in (text[i : i + 40] for i in range(0, len(text), 40)):
+            for day in parser.feed(chunk):
+                yield day
+        parser.close()
+
+
+def make_route_service(session, ai_svc=None) -> RouteService:
+    return RouteService(
+        route_repo=RouteRepository(session),
+        user_repo=UserRepository(session),
+        cache_repo=AICacheRepository(session),
+        access_repo=RouteAccessRepository(session),
+        ai_svc=ai_svc,
+    )
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work(value):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return value * 2
+
+    results = await asyncio.gather(*(flight.do("key", work, 21) for _ in range(10)))
+    assert results == [42] * 10
+    assert calls == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "followers": 9}
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    outcomes = await asyncio.gather(*(flight.do("bad", fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(o, ValueError) for o in outcomes)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_route_generation_calls_ai_once(session_factory):
+    ai = FakeAIService()
+    payload = RouteGenerateRequest(origin="Oslo", destination="Bergen", duration_days=2, budget=900.0)
+
+    async with session_factory() as session:
+        owner = await UserRepository(session).get_by_telegram_id(100002)
+
+    async def create():
+        async with session_factory() as session:
+            return await make_route_service(session, ai).create_route(payload, owner.id)
+
+    routes = await asyncio.gather(*(create() for _ in range(5)))
+    assert ai.calls == 1
+    assert len({route.id for route in routes}) == 5
+    assert len({route.ai_cache_id for route in routes}) == 1
+
+    # the generated plan was cached: later requests don't call AI at all
+    async with session_factory() as session:
+        await make_route_service(session, ai).create_route(payload, owner.id)
+    assert ai.calls == 1
@@ -68,6 +68,22 @@ async def test_create_get_list_by_id_and_code(async_client, auth_headers, route_
     assert bycode["share_code"] == share_code
 
 
+@pytest.mark.asyncio
+async def test_create_route_persists_full_graph(async_client, auth_headers, route_data1):
+    """
+    POST /routes/ writes the route, its days with activities and the CREATOR access in one go.
+    """
+    resp = await async_client.post("/routes/", json=route_data1, headers=auth_headers)
+    assert resp.status_code == 201, resp.text
+    route_id = resp.json()["id"]
+
+    full = (await async_client.get(f"/routes/{route_id}", headers=auth_headers)).json()
+    assert len(full["days"]) == len(full["route_data"]["days"])
+    assert [day["day_number"] for day in full["days"]] == [day["day_number"] for day in full["route_data"]["days"]]
+    assert all(day["activities"] for day in full["days"])
+    assert [access["role"] for access in full["access_list"]] == ["creator"]
+
+
 @pytest.mark.asyncio
 async def test_get_routes_by_owner(async_client, auth_headers, route_data1):
     """
@@ -123,3 +139,399 @@ async def test_rebuild_and_delete(async_client, auth_headers, route_data1, route
     # after delete GET should return 403
     missing = await async_client.get(f"/routes/{rb["id"]}", headers=auth_headers)
     assert missing.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_route_load_profiles(async_client, auth_headers, route_data1, db_session, monkeypatch):
+    """
+    "bare" loads the route row only and forbids lazy loads, "full" loads the whole graph,
+    and deleting a route first fetched bare still cascades to its days.
+    """
+    from sqlalchemy import event, func, select
+    from sqlalchemy.exc import InvalidRequestError
+
+    from models import RouteDay
+    from repositories import RouteRepository
+    from utils.config import settings
+
+    monkeypatch.setattr(settings, "ROUTE_COPY_ON_WRITE", False)  # the route gets its own days
+
+    repo = RouteRepository(db_session)
+    route_id = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()["id"]
+
+    statements = []
+    engine = db_session.bind.sync_engine
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        bare = await repo.get(route_id, load="bare")
+        assert len(statements) == 1
+        with pytest.raises(InvalidRequestError):
+            bare.days
+        db_session.expunge_all()
+
+        statements.clear()
+        full = await repo.get(route_id)
+        assert len(statements) == 5  # route, days, activities, access_list, exports
+        assert full.days and full.access_list is not None
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    db_session.expunge_all()
+    await repo.get(route_id, load="bare")
+    assert await repo.delete(route_id)
+    days_left = await db_session.scalar(select(func.count()).where(RouteDay.route_id == route_id))
+    assert days_left == 0
+
+
+@pytest.mark.asyncio
+async def test_list_routes_keyset_pagination(async_client, route_data1, route_data2):
+    """
+    GET /routes/ pages with limit/cursor (X-Next-Cursor header) and filters by destination and is_public.
+    """
+    reg = {"email": "pager@example.com", "password": "pass"}
+    await async_client.post("/auth/register", json=reg)
+    tok = (await async_client.post("/auth/login", data={"username": reg["email"], "password": reg["password"]})).json()
+    headers = {"Authorization": f"Bearer {tok['access_token']}"}
+
+    created = []
+    for payload in (route_data1, route_data2, {**route_data1, "is_public": True}, route_data2, route_data1):
+        resp = await async_client.post("/routes/", json=payload, headers=headers)
+        assert resp.status_code == 201, resp.text
+        created.append(resp.json()["id"])
+
+    seen, cursor = [], None
+    for _ in range(3):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = await async_client.get("/routes/", params=params, headers=headers)
+        assert resp.status_code == 200
+        seen += [r["id"] for r in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+    assert seen == created[::-1]  # newest first, no duplicates or gaps
+    assert cursor is None
+
+    tokyo = (await async_client.get("/routes/", params={"destination": "tokyo"}, headers=headers)).json()
+    assert [r["id"] for r in tokyo] == [created[3], created[1]]
+    public = (await async_client.get("/routes/", params={"is_public": True}, headers=headers)).json()
+    assert [r["id"] for r in public] == [created[2]]
+    # column projection: exactly the RouteShort fields
+    assert public[0].keys() == {
+        "id",
+        "name",
+        "owner_id",
+        "share_code",
+        "origin",
+        "destination",
+        "duration_days",
+        "budget",
+        "interests",
+        "total_cost",
+        "activity_count",
+        "activity_types",
+        "first_date",
+        "last_date",
+    }
+
+    bad = await async_client.get("/routes/", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_route_json_matches_response_model(async_client, auth_headers, route_data2, db_session):
+    import json
+
+    from models import Export, ExportType
+    from repositories import RouteRepository
+    from schemas.route import RouteRead
+    from utils.route_json import route_response
+
+    route_id = (await async_client.post("/routes/", json=route_data2, headers=auth_headers)).json()["id"]
+    repo = RouteRepository(db_session)
+    route = await repo.get(route_id)
+    db_session.add(Export(route_id=route_id, user_id=route.owner_id, export_type=ExportType.PDF))
+    await db_session.commit()
+    db_session.expunge_all()
+    route = await repo.get(route_id)
+    await repo.attach_route_data([route])
+    assert route.days and route.access_list and route.exports and route.route_data
+
+    expected = RouteRead.model_validate(route).model_dump(mode="json")
+    assert json.loads(route_response(route).body) == expected
+
+    resp = await async_client.get(f"/routes/{route_id}", headers=auth_headers)
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json() == expected
+
+
+@pytest.mark.asyncio
+async def test_route_data_references_cache_entry(async_client, auth_headers, route_data1, db_session, monkeypatch):
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import select, update
+
+    from models import AICache, Route
+    from repositories import AICacheRepository
+    from utils.config import settings
+
+    monkeypatch.setattr(settings, "ROUTE_COPY_ON_WRITE", False)  # the plan is rebuilt from the route's own days
+
+    created = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()
+    route_id = created["id"]
+    stmt = select(Route.route_data, Route.ai_cache_id).where(Route.id == route_id)
+    stored, cache_id = (await db_session.execute(stmt)).one()
+    cache_result = await db_session.scalar(select(AICache.result).where(AICache.id == cache_id))
+    assert stored is None
+
+    route = (await async_client.get(f"/routes/{route_id}", headers=auth_headers)).json()
+    assert route["route_data"] == cache_result
+
+    # only the requested fields are rendered
+    resp = await async_client.get(f"/routes/{route_id}?fields=id,name,days", headers=auth_headers)
+    assert list(resp.json()) == ["id", "name", "days"] and resp.json()["days"] == route["days"]
+    resp = await async_client.get(f"/routes/by_code/{created['share_code']}?fields=id,route_data", headers=auth_headers)
+    assert resp.json() == {"id": route_id, "route_data": cache_result}
+    assert (await async_client.get(f"/routes/{route_id}?fields=id,nope", headers=auth_headers)).status_code == 400
+
+    # a referenced entry survives expiry cleanup
+    past = datetime.utcnow() - timedelta(days=1)
+    await db_session.execute(update(AICache).where(AICache.id == cache_id).values(expires_at=past))
+    await db_session.commit()
+    assert cache_id not in await AICacheRepository(db_session).delete_expired_keys()
+    await db_session.execute(update(AICache).where(AICache.id == cache_id).values(expires_at=None))
+    await db_session.commit()
+
+    # without the entry the plan is rebuilt from the days
+    await db_session.execute(update(Route).where(Route.id == route_id).values(ai_cache_id=None))
+    await db_session.commit()
+    rebuilt = (await async_client.get(f"/routes/{route_id}", headers=auth_headers)).json()["route_data"]
+    assert rebuilt["name"] == route["name"]
+    assert [day["day_number"] for day in rebuilt["days"]] == [day["day_number"] for day in route["days"]]
+    assert rebuilt["days"][0]["activities"][0]["name"] == route["days"][0]["activities"][0]["name"]
+
+
+@pytest.mark.asyncio
+async def test_route_copy_on_write(async_client, auth_headers, route_data1, db_session):
+    """
+    A route created from a cached plan is a single row showing the plan's days;
+    editing a day gives it its own days and changes only that one.
+    """
+    from sqlalchemy import func, select
+
+    from models import Activity, Route, RouteDay
+
+    first = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()
+    second = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()
+    route_ids = [first["id"], second["id"]]
+    days_stored = select(func.count()).where(RouteDay.route_id.in_(route_ids))
+    assert await db_session.scalar(days_stored) == 0
+
+    before = (await async_client.get(f"/routes/{first['id']}", headers=auth_headers)).json()
+    assert before["materialized"] is False
+    assert before["days"] and all(day["id"] is None for day in before["days"])
+    resp = await async_client.get(f"/routes/{first['id']}?fields=days", headers=auth_headers)
+    assert resp.json()["days"] == before["days"]
+
+    edit = {"date": None, "description": "Rest day", "activities": [{"name": "Sleep in"}]}
+    resp = await async_client.put(f"/routes/{first['id']}/days/2", json=edit, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["id"] is not None and [a["name"] for a in resp.json()["activities"]] == ["Sleep in"]
+    resp = await async_client.put(f"/routes/{first['id']}/days/99", json=edit, headers=auth_headers)
+    assert resp.status_code == 404
+
+    after = (await async_client.get(f"/routes/{first['id']}", headers=auth_headers)).json()
+    assert after["materialized"] is True and after["last_edited_by"] is not None
+    assert all(day["id"] is not None for day in after["days"])
+    strip = lambda day: {**day, "id": None, "activities": [{**a, "id": None} for a in day["activities"]]}  # noqa: E731
+    assert [strip(day) for day in after["days"] if day["day_number"] != 2] == [
+        day for day in before["days"] if day["day_number"] != 2
+    ]
+    assert after["days"][1]["description"] == "Rest day"
+
+    # only the edited route was copied, the other one still shares the plan
+    assert await db_session.scalar(days_stored) == len(before["days"])
+    assert await db_session.scalar(select(Route.materialized).where(Route.id == second["id"])) is False
+    other = (await async_client.get(f"/routes/{second['id']}", headers=auth_headers)).json()
+    assert other["days"] == before["days"]
+
+    # deleting a materialized route removes its copy
+    assert (await async_client.delete(f"/routes/{first['id']}", headers=auth_headers)).status_code == 204
+    activity_ids = [a["id"] for day in after["days"] for a in day["activities"]]
+    assert await db_session.scalar(select(func.count()).where(Activity.id.in_(activity_ids))) == 0
+
+
+@pytest.mark.asyncio
+async def test_route_aggregates(async_client, auth_headers, route_data1, db_session):
+    """
+    Cost, activity counts and the date span are kept on routes/route_days and listed in RouteShort.
+    """
+    from collections import Counter
+
+    from repositories import RouteRepository
+    from schemas.route import ActivityCreate, RouteCreate, RouteDayCreate
+
+    route_id = (await async_client.post("/routes/", json=route_data1, headers=auth_headers)).json()["id"]
+    route = (await async_client.get(f"/routes/{route_id}", headers=auth_headers)).json()
+    activities = [a for day in route["days"] for a in day["activities"]]
+    assert route["total_cost"] == pytest.approx(sum(a["cost"] or 0 for a in activities))
+    assert route["activity_count"] == len(activities)
+    assert route["activity_types"] == dict(Counter(a["activity_type"] for a in activities if a["activity_type"]))
+    assert [day["activity_count"] for day in route["days"]] == [len(day["activities"]) for day in route["days"]]
+
+    listed = (await async_client.get("/routes/", params={"limit": 200}, headers=auth_headers)).json()
+    short = next(r for r in listed if r["id"] == route_id)
+    assert {k: short[k] for k in ("total_cost", "activity_count", "activity_types", "first_date", "last_date")} == {
+        k: route[k] for k in ("total_cost", "activity_count", "activity_types", "first_date", "last_date")
+    }
+
+    # editing a day re-aggregates
+    edit = {"date": "2030-01-01", "description": None, "activities": [{"name": "Opera", "cost": 200.5}]}
+    day_number = route["days"][-1]["day_number"]
+    day = (await async_client.put(f"/routes/{route_id}/days/{day_number}", json=edit, headers=auth_headers)).json()
+    assert day["total_cost"] == 200.5 and day["activity_count"] == 1
+    edited = (await async_client.get(f"/routes/{route_id}", headers=auth_headers)).json()
+    assert edited["total_cost"] == pytest.approx(sum(d["total_cost"] for d in edited["days"]))
+    assert edited["activity_count"] == sum(d["activity_count"] for d in edited["days"])
+    assert edited["last_date"] == "2030-01-01"
+
+    # create_day adds to them incrementally
+    repo = RouteRepository(db_session)
+    data = RouteCreate(**route_data1, name="Manual", share_code="manual-agg", owner_id=edited["owner_id"])
+    manual = await repo.create(data)
+    for number, cost in ((1, 10.0), (2, 5.5)):
+        await repo.create_day(
+            manual.id,
+            RouteDayCreate(
+                day_number=number,
+                date=f"2030-02-0{number}",
+                activities=[
+                    ActivityCreate(name="Walk", cost=cost, activity_type="Sightseeing"),
+                    ActivityCreate(name="Nap"),
+                ],
+            ),
+        )
+    db_session.expunge_all()
+    manual = await repo.get(manual.id, load="bare")
+    assert (manual.total_cost, manual.activity_count, manual.activity_types) == (15.5, 4, {"Sightseeing": 2})
+    assert (str(manual.first_date), str(manual.last_date)) == ("2030-02-01", "2030-02-02")
+
+
+@pytest.mark.asyncio
+async def test_bulk_import(async_client, auth_headers, route_data1, db_session, monkeypatch):
+    """
+    POST /routes/import writes valid NDJSON records in chunks and reports failed lines without stopping.
+    """
+    import json
+
+    from sqlalchemy import select, update
+
+    from models import Route, RouteAccess, User
+    from utils.config import settings
+
+    monkeypatch.setattr(settings, "ROUTE_IMPORT_CHUNK_SIZE", 2)
+    reg = {"email": "importer@example.com", "password": "pass"}
+    await async_client.post("/auth/register", json=reg)
+    await db_session.execute(update(User).where(User.email == reg["email"]).values(is_superuser=True))
+    await db_session.commit()
+    tok = (await async_client.post("/auth/login", data={"username": reg["email"], "password": reg["password"]})).json()
+    headers = {"Authorization": f"Bearer {tok['access_token']}"}
+    owner_id = await db_session.scalar(select(User.id).where(User.email == reg["email"]))
+    other_id = await db_session.scalar(select(User.id).where(User.email == "test@example.com"))
+
+    day = {"day_number": 1, "date": "2030-05-01", "activities": [{"name": "Louvre", "cost": 22.0}]}
+    record = {**route_data1, "name": "Imported", "owner_id": owner_id, "days": [day]}
+    lines = [
+        {**record, "share_code": "import-1", "access": [{"user_id": other_id, "role": "viewer"}]},
+        "{not json",
+        {**record, "owner_id": 10**9},
+        {**record, "share_code": "import-1"},
+        {**record, "materialized": False},
+        # the owner's CREATOR entry is added by the import, a second one violates the unique constraint
+        {**record, "share_code": "import-2", "access": [{"user_id": owner_id, "role": "creator"}]},
+        {**record, "share_code": "import-3"},
+    ]
+    body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n\n"
+
+    resp = await async_client.post("/routes/import", content=body, headers=auth_headers)
+    assert resp.status_code == 403
+    resp = await async_client.post("/routes/import", content=body, headers=headers)
+    assert resp.status_code == 200, resp.text
+    report = resp.json()
+    assert (report["received"], report["imported"], report["failed"]) == (7, 2, 5)
+    assert sorted(error["line"] for error in report["errors"]) == [2, 3, 4, 5, 6]
+    assert report["rows"] == 2 * 4 + 1  # route, day, activity and CREATOR access each, plus one grant
+
+    imported = (await db_session.scalars(select(Route).where(Route.share_code.in_(["import-1", "import-3"])))).all()
+    assert {route.total_cost for route in imported} == {22.0}
+    route_id = next(route.id for route in imported if route.share_code == "import-1")
+    stmt = select(RouteAccess.user_id, RouteAccess.role).where(RouteAccess.route_id == route_id)
+    roles = (await db_session.execute(stmt)).all()
+    assert {(user_id, role.value) for user_id, role in roles} == {(owner_id, "creator"), (other_id, "viewer")}
+    shared = (await async_client.get(f"/routes/{route_id}", headers=auth_headers)).json()
+    assert [a["name"] for a in shared["days"][0]["activities"]] == ["Louvre"]
+
+
+@pytest.mark.asyncio
+async def test_export_routes_by_owner_streams(async_client, auth_headers, route_data1, db_session, session_factory):
+    """
+    The export emits NDJSON/CSV per server-side cursor batch: memory stays bounded for 10k routes.
+    """
+    import csv
+    import io
+    import json
+    import logging
+    import tracemalloc
+
+    from sqlalchemy import select
+
+    from models import User
+    from repositories import RouteImportRepository
+    from services.crud.route_import_service import RouteImportService
+    from services.crud.route_service import build_route_service
+    from utils.ndjson import aiter_sync
+    from utils.config import settings
+    from utils.security import create_access_token
+
+    owner = User(email="exporter@example.com", username="exporter")
+    db_session.add(owner)
+    await db_session.commit()
+    day = {"day_number": 1, "date": None, "activities": [{"name": "Walk", "description": "x" * 200, "cost": 1.0}]}
+    record = {**route_data1, "name": "Exported", "owner_id": owner.id, "days": [day]}
+    lines = (json.dumps({**record, "share_code": f"export-{n}"}) for n in range(10_000))
+    svc = RouteImportService(RouteImportRepository(db_session), chunk_size=2000)
+    assert (await svc.import_ndjson(aiter_sync(lines))).imported == 10_000
+
+    async with session_factory() as session:
+        async for _ in build_route_service(session).export_routes_by_owner(owner.id):
+            break  # warm up: statement compilation and lazy imports are not part of the stream
+        # log records (SQL echo at INFO) kept by pytest's log capture would be measured as well
+        logging.disable(logging.INFO)
+        tracemalloc.start()
+        try:
+            total, count, samples = 0, 0, []
+            async for chunk in build_route_service(session).export_routes_by_owner(owner.id):
+                total += len(chunk)
+                count += chunk.count(b"\n")
+                samples.append(tracemalloc.get_traced_memory()[0])
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            logging.disable(logging.NOTSET)
+    assert count == 10_000 and len(samples) == 10_000 // settings.ROUTE_EXPORT_BATCH_SIZE
+    # one batch is alive at a time: memory doesn't grow with the routes streamed so far
+    assert max(samples[-10:]) < samples[9] * 1.25, (samples[9], max(samples[-10:]))
+    assert peak < total / 2, (peak, total)
+
+    # through HTTP: only the owner, gzip on request, CSV with one row per route
+    resp = await async_client.get(f"/routes/by_owner/{owner.id}/export", headers=auth_headers)
+    assert resp.status_code == 403
+    headers = {"Authorization": f"Bearer {create_access_token(str(owner.id))}", "Accept-Encoding": "gzip"}
+    resp = await async_client.get(f"/routes/by_owner/{owner.id}/export", params={"fields": "id,name"}, headers=headers)
+    assert resp.status_code == 200 and resp.headers["content-encoding"] == "gzip"
+    first = json.loads(resp.text.split("\n", 1)[0])
+    assert first.keys() == {"id", "name"}
+    headers["Accept-Encoding"] = "identity"
+    resp = await async_client.get(f"/routes/by_owner/{owner.id}/export", params={"format": "csv"}, headers=headers)
+    assert "content-encoding" not in resp.headers
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert len(rows) == 10_000 and rows[0]["total_cost"] == "1.0"
+    assert json.loads(rows[0]["interests"]) == route_data1["interests"]
@@ -0,0 +1,105 @@
+# app/utils/artifacts.py
+
+import hashlib
+import logging
+import os
+import time
+from typing import Optional
+
+from pydantic_core import to_json
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content, version: str) -> str:
+    """
+    Key of an artifact: SHA-256 of the JSON-encoded content and the version of whatever renders it.
+    Dict key order matters, so content must be built the same way every time.
+    """
+    digest = hashlib.sha256(version.encode())
+    digest.update(b"\0")
+    digest.update(to_json(content))
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """
+    Content-addressed files on disk: an artifact is stored once under its content
+    hash and shared by everything with the same content, across processes.
+
+    A hit refreshes the file's mtime, so eviction - files unused for `max_age`
+    seconds first, then the least recently used ones until the store fits into
+    `max_bytes` - works from the directory alone. 0 disables either limit.
+    Blocking file system calls: run evict() in a thread.
+    """
+
+    def __init__(self, directory: str, suffix: str, max_bytes: int, max_age: float):
+        self.directory = directory
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.files = 0
+        self.bytes = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of a stored artifact (marked as recently used), None if there is none."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def prepare(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+
+    def evict(self) -> int:
+        """
+        Apply the age and size limits, return the number of files removed.
+        """
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(self.suffix) and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()  # least recently used first
+        total = sum(size for _, size, _ in entries)
+        horizon = time.time() - self.max_age if self.max_age > 0 else None
+        removed = 0
+        for mtime, size, path in entries:
+            expired = horizon is not None and mtime < horizon
+            if not expired and (self.max_bytes <= 0 or total <= self.max_bytes):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # evicted by another process
+                pass
+            total -= size
+            removed += 1
+        self.files = len(entries) - removed
+        self.bytes = total
+        self.evictions += removed
+        if removed:
+            logger.info("Artifact store: evicted %s files from %s, %s bytes left", removed, self.directory, total)
+        return removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "files": self.files,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
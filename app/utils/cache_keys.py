@@ -0,0 +1,31 @@
+# app/utils/cache_keys.py
+
+import math
+
+from utils.places import get_place_index
+
+
+def normalize_location(value: str, fuzzy: bool = True) -> str:
+    """
+    Normalize a place name the same way it is stored in ai_cache:
+    known places and their aliases ("NYC", "Нью-Йорк") map to one canonical name,
+    and with `fuzzy` close misspellings of them as well.
+    """
+    return get_place_index().canonicalize(value, fuzzy)
+
+
+def normalize_budget(value: float | str) -> int:
+    """
+    Budgets are stored rounded up to a whole number.
+    """
+    return math.ceil(float(value) if isinstance(value, str) else value)
+
+
+def build_cache_key(
+    origin: str, destination: str, duration_days: int, budget: float | str, fuzzy: bool = True
+) -> str:
+    """
+    Build the ai_cache key: f"{origin}:{destination}:{duration_days}:{budget}".
+    """
+    origin, destination = normalize_location(origin, fuzzy), normalize_location(destination, fuzzy)
+    return f"{origin}:{destination}:{duration_days}:{normalize_budget(budget)}"
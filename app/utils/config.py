@@ -2,6 +2,7 @@
 
 import os
 import logging
+from typing import Literal
 from pydantic import Field, ValidationError, field_validator
 from pydantic_settings import BaseSettings
 
@@ -27,29 +28,114 @@ class Settings(BaseSettings):
     DB_HOST: str = Field(default="localhost")
     DB_PORT: int = Field(default=5432, ge=1)
     DB_ECHO: bool = Field(default=False)
-    DB_POOL_SIZE: int = Field(
-        default=50,
-    )
-    DB_MAX_OVERFLOW: int = Field(default=0)
+    # "queue" - a pool per process: N processes open up to N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections;
+    # "null" - a connection per checkout, for use behind PgBouncer (transaction pooling, no statement caches)
+    DB_POOL_MODE: Literal["queue", "null"] = Field(default="queue")
+    DB_POOL_SIZE: int = Field(default=10, ge=1)
+    DB_MAX_OVERFLOW: int = Field(default=5, ge=0)
+    # seconds a checkout waits for a free connection before failing
+    DB_POOL_TIMEOUT: float = Field(default=10.0, gt=0)
+    # connections older than this are replaced (-1 - never)
+    DB_POOL_RECYCLE: int = Field(default=1800, ge=-1)
+    DB_POOL_PRE_PING: bool = Field(default=False)
+    # asyncpg prepared statements cached per connection in "queue" mode (0 - none)
+    DB_STATEMENT_CACHE_SIZE: int = Field(default=100, ge=0)
+    # saturation and timeout warnings are logged at most once per interval
+    DB_POOL_LOG_INTERVAL: float = Field(default=60.0, ge=0)
     DB_CONNECT_TIMEOUT: int = Field(default=30)
+    # read replicas for read-only repository methods: comma-separated host[:port], same credentials and database
+    DB_REPLICA_HOSTS: str = Field(default="")
+    # seconds between replica health checks (also their timeout)
+    DB_REPLICA_CHECK_INTERVAL: float = Field(default=5.0, gt=0)
 
     # Redis settings
     REDIS_URL: str = Field(...)
+    REDIS_ENABLED: bool = Field(default=True)
+    REDIS_TIMEOUT: float = Field(default=0.5, gt=0)
+
+    # AI cache tiers (L1 - in-process, L2 - Redis)
+    AI_CACHE_L1_SIZE: int = Field(default=1024, ge=0)
+    AI_CACHE_L1_TTL: int = Field(default=300, ge=0)
+    AI_CACHE_L2_TTL: int = Field(default=3600, ge=0)
+    # near-match lookup when there is no exact entry: ±fraction of budget, ±days of duration
+    AI_CACHE_NEAR_MATCH: bool = Field(default=True)
+    AI_CACHE_BUDGET_TOLERANCE: float = Field(default=0.1, ge=0, lt=1)
+    AI_CACHE_DURATION_TOLERANCE: int = Field(default=1, ge=0)
+    AI_CACHE_NEAR_CANDIDATES: int = Field(default=20, ge=1)
+    # "reference": routes built from an unchanged cached plan point to AICache.result instead of copying it
+    ROUTE_DATA_STORAGE: Literal["inline", "reference"] = Field(default="reference")
+    # with "reference" storage: routes from a cached plan get their own days only when first edited
+    ROUTE_COPY_ON_WRITE: bool = Field(default=True)
+    # bulk import (POST /routes/import, scripts/import_routes.py): records per COPY/flush and commit
+    ROUTE_IMPORT_CHUNK_SIZE: int = Field(default=1000, ge=1)
+    # failures listed in the import report (all of them are counted)
+    ROUTE_IMPORT_MAX_ERRORS: int = Field(default=1000, ge=0)
+    # routes per server-side cursor batch of GET /routes/by_owner/{owner_id}/export
+    ROUTE_EXPORT_BATCH_SIZE: int = Field(default=200, ge=1)
+    # activities per server-side cursor batch of GET /routes/{id}/calendar.ics
+    ICAL_EXPORT_BATCH_SIZE: int = Field(default=1000, ge=1)
+    # place name canonicalization for cache keys (empty path - bundled data/place_aliases.json)
+    PLACE_ALIASES_PATH: str = Field(default="")
+    # trigram similarity of a fuzzy match: lower values merge different places spelled alike (Vienne/Vienna)
+    PLACE_FUZZY_THRESHOLD: float = Field(default=0.85, gt=0, le=1)
+
+    # per-user route ACL snapshots (0 - disabled, roles are read per request)
+    ACL_CACHE_SIZE: int = Field(default=10000, ge=0)
+    ACL_CACHE_TTL: int = Field(default=300, ge=0)
+
+    # authenticated user snapshots: a deleted or deactivated user is rejected within the TTL at worst
+    USER_CACHE_SIZE: int = Field(default=10000, ge=0)
+    USER_CACHE_TTL: int = Field(default=30, ge=0)
 
     # Bot settings
     TELEGRAM_TOKEN: str = Field(...)
 
     # AI settings
     CHATGPT_API_KEY: str = Field(...)
+    AI_ENABLED: bool = Field(default=True)
+    # any OpenAI-compatible chat completions API
+    AI_API_BASE_URL: str = Field(default="https://api.openai.com/v1")
+    AI_MODEL: str = Field(default="gpt-4o-mini")
+    AI_TIMEOUT: float = Field(default=120.0, gt=0)
+    # cross-process coalescing of AI generations: "none", "redis" or "postgres" (within a process
+    # single-flight coalesces anyway); "postgres" holds a pooled connection per holder and waiter
+    AI_GENERATION_LOCK: Literal["none", "redis", "postgres"] = Field(default="redis")
+    AI_GENERATION_LOCK_TIMEOUT: float = Field(default=60.0, gt=0)
+    # asynchronous generation jobs
+    GENERATION_WORKERS: int = Field(default=4, ge=1)
+    GENERATION_POLL_INTERVAL: float = Field(default=2.0, gt=0)
+    GENERATION_JOB_TIMEOUT: float = Field(default=600.0, gt=0)
+    # route exports: asyncio workers claiming exports, processes rendering PDFs, where the files go
+    EXPORT_WORKERS: int = Field(default=4, ge=1)
+    EXPORT_RENDER_PROCESSES: int = Field(default=2, ge=1)
+    EXPORT_POLL_INTERVAL: float = Field(default=2.0, gt=0)
+    EXPORT_JOB_TIMEOUT: float = Field(default=300.0, gt=0)
+    EXPORT_DIR: str = Field(default="exports")
+    # rendered files are shared by content hash; least recently used ones go beyond these limits (0 - no limit)
+    EXPORT_ARTIFACT_MAX_BYTES: int = Field(default=1024**3, ge=0)
+    EXPORT_ARTIFACT_MAX_AGE: float = Field(default=30 * 24 * 3600.0, ge=0)
+    # where GOOGLE_CALENDAR exports are pushed: "none" (they fail) or "file" (.ics files in CALENDAR_SYNC_DIR)
+    CALENDAR_SYNC_BACKEND: Literal["none", "file"] = Field(default="none")
+    CALENDAR_SYNC_DIR: str = Field(default="calendars")
 
     # API settings
     API_HOST: str = Field(default="0.0.0.0")
     API_PORT: int = Field(default=8000, ge=1, le=65535)
 
+    # password hashing: bcrypt cost and the thread pool it runs in
+    PASSWORD_HASH_ROUNDS: int = Field(default=12, ge=4, le=31)
+    PASSWORD_HASH_WORKERS: int = Field(default=2, ge=1)
+    PASSWORD_HASH_QUEUE: int = Field(default=32, ge=0)
+    PASSWORD_REHASH_ON_LOGIN: bool = Field(default=True)
+
     # JWT
     JWT_SECRET_KEY: str = Field(..., env="JWT_SECRET_KEY")
     JWT_ALGORITHM: str = Field("HS256", env="JWT_ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(60 * 24, env="ACCESS_TOKEN_EXPIRE_MINUTES")
+    # "jose" - python-jose, "hmac" - lean HS256/384/512 implementation
+    JWT_BACKEND: Literal["jose", "hmac"] = Field(default="jose")
+    # verified tokens kept until they expire (0 - verify every request)
+    JWT_CACHE_SIZE: int = Field(default=10000, ge=0)
 
     # DEBUG
     DEBUG: bool = False
@@ -67,6 +153,16 @@ class Settings(BaseSettings):
     def db_async_url(self) -> str:
         return f"postgresql+asyncpg://{self.db_credentials}"
 
+    @property
+    def db_replica_urls(self) -> dict[str, str]:
+        """Replica host[:port] -> URL"""
+        urls = {}
+        for entry in filter(None, (h.strip() for h in self.DB_REPLICA_HOSTS.split(","))):
+            host, _, port = entry.partition(":")
+            credentials = f"{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{host}:{port or self.DB_PORT}"
+            urls[entry] = f"postgresql+asyncpg://{credentials}/{self.POSTGRES_DB}"
+        return urls
+
     # Validator for Redis URL
     @field_validator("REDIS_URL")
     def validate_redis_url(cls, v: str) -> str:
@@ -0,0 +1,112 @@
+# app/utils/ical.py
+
+"""
+iCalendar (RFC 5545) serialization of itinerary activities, one VEVENT per
+activity. Events use floating local times - an itinerary's times are local to
+wherever the traveller is that day; activities without a valid start time
+become all-day events. Output is built per event, so a calendar can be
+streamed in pieces of any size.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Optional
+
+PRODID = "-//travel-ai-backend//Route calendar//EN"
+CALENDAR_FOOTER = "END:VCALENDAR\r\n"
+
+
+def escape_text(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """
+    Fold a content line into chunks of at most 75 octets (continuations start with a space),
+    never splitting a UTF-8 sequence.
+    """
+    if len(line) <= 75 and line.isascii():
+        return line + "\r\n"
+    parts, current, size, limit = [], [], 0, 75
+    for char in line:
+        width = len(char.encode())
+        if size + width > limit:
+            parts.append("".join(current))
+            current, size, limit = [], 0, 74  # the leading space counts
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def parse_time(value: Optional[str]) -> Optional[time]:
+    """Activity times are free-form "HH:MM" strings; anything else means no time."""
+    if not value:
+        return None
+    try:
+        return time.fromisoformat(value.strip())
+    except ValueError:
+        return None
+
+
+def format_stamp(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def calendar_header(name: str) -> str:
+    return "".join(
+        fold(line)
+        for line in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODID}",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{escape_text(name)}",
+        )
+    )
+
+
+def vevent(uid: str, day: date, activity, stamp: str) -> str:
+    """
+    One VEVENT of an activity on `day`; `activity` is anything with the Activity
+    attributes (an ORM object or a result row) or a plan dict.
+    """
+    get = activity.get if isinstance(activity, dict) else lambda key: getattr(activity, key, None)
+    lines = ["BEGIN:VEVENT", f"UID:{uid}", f"DTSTAMP:{stamp}"]
+    start, end = parse_time(get("start_time")), parse_time(get("end_time"))
+    if start is None:
+        lines.append(f"DTSTART;VALUE=DATE:{day:%Y%m%d}")
+        lines.append(f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}")
+    else:
+        lines.append(f"DTSTART:{datetime.combine(day, start):%Y%m%dT%H%M%S}")
+        if end is not None:
+            # ends past midnight belong to the next day
+            end_day = day + timedelta(days=1) if end <= start else day
+            lines.append(f"DTEND:{datetime.combine(end_day, end):%Y%m%dT%H%M%S}")
+    lines.append(f"SUMMARY:{escape_text(get('name') or 'Activity')}")
+    description = [get("description"), get("notes")]
+    if get("cost"):
+        description.append(f"Estimated cost: {get('cost'):.2f}")
+    description = "\n\n".join(part for part in description if part)
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    if get("location"):
+        lines.append(f"LOCATION:{escape_text(get('location'))}")
+    if get("activity_type"):
+        lines.append(f"CATEGORIES:{escape_text(get('activity_type'))}")
+    if get("external_link"):
+        lines.append(f"URL:{get('external_link')}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+
+def vevents(events: Iterable[tuple[str, date, object]], stamp: str) -> bytes:
+    """A batch of (uid, day, activity) as one encoded chunk."""
+    return "".join(vevent(uid, day, activity, stamp) for uid, day, activity in events).encode()
@@ -0,0 +1,138 @@
+# app/utils/invalidation.py
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from typing import Callable, Optional
+
+from utils.metrics import register_metrics
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# handler(keys): keys is None when everything under the topic must be dropped
+InvalidationHandler = Callable[[Optional[list]], None]
+
+
+class InvalidationBus:
+    """
+    Fan-out of cache invalidations to every process holding in-process caches.
+
+    `publish` applies the invalidation locally right away and broadcasts it over
+    a Redis pub/sub channel; the listener started with `start` applies messages
+    of other processes. Messages missed while the listener was disconnected can't
+    be replayed, so after every (re)connect all topics are flushed - the caches
+    then refill from the database. Without Redis the bus is process-local.
+    """
+
+    def __init__(self, channel: str = "invalidation", client=None, reconnect_delay: float = 1.0):
+        self.channel = channel
+        self._client = client
+        self.reconnect_delay = reconnect_delay
+        self.origin = uuid.uuid4().hex
+        self._handlers: dict[str, list[InvalidationHandler]] = defaultdict(list)
+        self._listener: Optional[asyncio.Task] = None
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    @property
+    def client(self):
+        if self._client is not None:
+            return self._client
+        return get_redis()
+
+    def subscribe(self, topic: str, handler: InvalidationHandler) -> None:
+        self._handlers[topic].append(handler)
+
+    def _apply(self, topic: str, keys: Optional[list]) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(keys)
+            except Exception as e:
+                logger.exception("Invalidation: handler for %s failed: %s", topic, e)
+
+    def flush(self) -> None:
+        """Drop everything held by local subscribers."""
+        for topic in list(self._handlers):
+            self._apply(topic, None)
+
+    async def publish(self, topic: str, *keys) -> None:
+        """
+        Invalidate `keys` of `topic` here and in every other process.
+        A Redis failure is logged; other processes then rely on their TTLs.
+        """
+        self._apply(topic, list(keys))
+        self.published += 1
+        client = self.client
+        if client is None:
+            return
+        message = json.dumps({"origin": self.origin, "topic": topic, "keys": list(keys)})
+        try:
+            await client.publish(self.channel, message)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Invalidation: failed to publish %s %s: %s", topic, keys, e)
+
+    def deliver(self, raw: str) -> None:
+        """Apply a message received from the channel, ignoring our own."""
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            logger.warning("Invalidation: malformed message %r", raw)
+            return
+        if message.get("origin") == self.origin:
+            return
+        self.received += 1
+        self._apply(message["topic"], message.get("keys"))
+
+    def start(self) -> None:
+        if self._listener is None and self.client is not None:
+            self._listener = asyncio.create_task(self._listen(), name="invalidation-listener")
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                logger.info("Invalidation: listening on %s", self.channel)
+                self.flush()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.deliver(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Invalidation: listener disconnected, retrying in %ss: %s", self.reconnect_delay, e)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            self.flush()
+            await asyncio.sleep(self.reconnect_delay)
+
+    def stats(self) -> dict:
+        return {
+            "listening": self._listener is not None and not self._listener.done(),
+            "topics": sorted(self._handlers),
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors,
+        }
+
+
+invalidation_bus = InvalidationBus()
+register_metrics("invalidation", invalidation_bus.stats)
@@ -0,0 +1,117 @@
+# app/utils/json_stream.py
+
+import json
+from typing import Any
+
+_OPENING = "{["
+_CLOSING = "}]"
+
+
+class JSONArrayStream:
+    """
+    Incremental scanner for a JSON document that arrives in chunks (e.g. a streamed LLM completion).
+
+    Every element of the top-level array `array_key` is returned by `feed` as soon as
+    its closing bracket arrives, without waiting for the rest of the document.
+    Text before the first "{" and after the matching "}" is ignored, so markdown
+    fences or a chatty preamble around the JSON do no harm.
+    """
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self._text = ""
+        self._pos = 0
+        # one frame per open container: [bracket, last key, expecting key, is target array]
+        self._stack: list[list] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._item_start = -1
+        self._root_start = -1
+        self._root_end = -1
+
+    @property
+    def done(self) -> bool:
+        return self._root_end >= 0
+
+    def feed(self, chunk: str) -> list[Any]:
+        """
+        Consume the next piece of text and return elements of the array that were completed by it.
+        """
+        items = []
+        if self.done or not chunk:
+            return items
+        self._text += chunk
+        text = self._text
+        i = self._pos
+        end = len(text)
+        stack = self._stack
+
+        while i < end:
+            if self._in_string:
+                # jump straight to the next quote or backslash
+                if self._escape:
+                    self._escape = False
+                    i += 1
+                    continue
+                quote = text.find('"', i)
+                backslash = text.find("\\", i, quote if quote >= 0 else end)
+                if backslash >= 0:
+                    self._escape = True
+                    i = backslash + 1
+                    continue
+                if quote < 0:
+                    i = end
+                    break
+                self._in_string = False
+                frame = stack[-1]
+                if frame[0] == "{" and frame[2]:
+                    frame[1] = json.loads(text[self._string_start : quote + 1])
+                    frame[2] = False
+                i = quote + 1
+                continue
+
+            ch = text[i]
+            if not stack:
+                # outside of the document: wait for the root object
+                if ch == "{":
+                    self._root_start = i
+                    stack.append(["{", None, True, False])
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in _OPENING:
+                parent = stack[-1]
+                if parent[3]:
+                    self._item_start = i
+                is_target = ch == "[" and len(stack) == 1 and parent[1] == self.array_key
+                stack.append([ch, None, ch == "{", is_target])
+            elif ch in _CLOSING:
+                stack.pop()
+                if not stack:
+                    self._root_end = i + 1
+                    break
+                if stack[-1][3] and self._item_start >= 0:
+                    items.append(json.loads(text[self._item_start : i + 1]))
+                    self._item_start = -1
+            elif ch == ",":
+                frame = stack[-1]
+                if frame[0] == "{":
+                    frame[2] = True
+            i += 1
+
+        self._pos = i
+        return items
+
+    def close(self) -> Any:
+        """
+        Parse and return the whole document.
+        Raises:
+            ValueError: If the document is incomplete or is not valid JSON.
+        """
+        if not self.done:
+            raise ValueError("JSON stream ended before the document was complete")
+        return json.loads(self._text[self._root_start : self._root_end])
@@ -0,0 +1,101 @@
+# app/utils/locks.py
+
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+class NullLock:
+    """
+    No-op lock, used when cross-process coordination is disabled or not supported.
+    """
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class RedisLock:
+    """
+    Cross-process mutex on top of Redis: SET NX PX with a random token,
+    released with a compare-and-delete script so only the owner can release it.
+    If the lock can't be taken within `wait_timeout` (or Redis is unavailable)
+    the caller proceeds without it: the lock is an optimization, not a correctness guarantee.
+    """
+
+    _RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+    def __init__(self, client, key: str, ttl: float = 120.0, wait_timeout: float = 60.0, poll_interval: float = 0.05):
+        self.client = client
+        self.key = key
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.token = uuid.uuid4().hex
+        self.acquired = False
+
+    async def __aenter__(self):
+        deadline = time.monotonic() + self.wait_timeout
+        try:
+            while True:
+                if await self.client.set(self.key, self.token, nx=True, px=int(self.ttl * 1000)):
+                    self.acquired = True
+                    return self
+                if time.monotonic() >= deadline:
+                    logger.warning("RedisLock: timed out waiting for %s, proceeding without lock", self.key)
+                    return self
+                await asyncio.sleep(self.poll_interval)
+        except Exception as e:
+            logger.warning("RedisLock: Redis unavailable, proceeding without lock %s: %s", self.key, e)
+            return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self.acquired:
+            try:
+                await self.client.eval(self._RELEASE_SCRIPT, 1, self.key, self.token)
+            except Exception as e:
+                logger.warning("RedisLock: failed to release %s (expires in %ss): %s", self.key, self.ttl, e)
+            self.acquired = False
+        return False
+
+
+class PgAdvisoryLock:
+    """
+    Transaction-level Postgres advisory lock keyed by a string.
+    It is released automatically when the session's transaction commits or rolls back,
+    so it can't leak if the holder crashes. On other dialects it is a no-op.
+
+    Taken with pg_try_advisory_xact_lock, polled until `wait_timeout`; after that the
+    caller proceeds without it, as with RedisLock. Costly: the holder and every waiter
+    keep a transaction and a pooled connection open while they hold or wait for the
+    lock, so many concurrent requests for one key can exhaust the connection pool.
+    """
+
+    def __init__(self, session: AsyncSession, key: str, wait_timeout: float = 60.0, poll_interval: float = 0.1):
+        self.session = session
+        self.key = key
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+    async def __aenter__(self):
+        if self.session.get_bind().dialect.name != "postgresql":
+            return self
+        deadline = time.monotonic() + self.wait_timeout
+        stmt = text("SELECT pg_try_advisory_xact_lock(hashtextextended(:key, 0))")
+        while not await self.session.scalar(stmt, {"key": self.key}):
+            if time.monotonic() >= deadline:
+                logger.warning("PgAdvisoryLock: timed out waiting for %s, proceeding without lock", self.key)
+                return self
+            await asyncio.sleep(self.poll_interval)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
@@ -4,12 +4,18 @@ import logging
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from utils.config import settings
+from utils.query_counter import count_queries
+
 logger = logging.getLogger(__name__)
 
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         logger.info("Request: %s %s", request.method, request.url)
-        response = await call_next(request)
-        logger.info("Response: %s", response.status_code)
+        with count_queries() as queries:
+            response = await call_next(request)
+        logger.info("Response: %s (%s queries)", response.status_code, queries.value)
+        if settings.DEBUG:
+            response.headers["X-Query-Count"] = str(queries.value)
         return response
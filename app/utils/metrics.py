@@ -0,0 +1,30 @@
+# app/utils/metrics.py
+
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+_providers: dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], dict]) -> None:
+    """
+    Register a callable returning a JSON-serializable dict under `name`.
+    Registering the same name again replaces the previous provider.
+    """
+    _providers[name] = provider
+
+
+def collect_metrics() -> dict:
+    """
+    Collect a snapshot from every registered provider.
+    """
+    snapshot = {}
+    for name, provider in _providers.items():
+        try:
+            snapshot[name] = provider()
+        except Exception as e:
+            logger.warning("Metrics: provider %s failed: %s", name, e)
+            snapshot[name] = {"error": str(e)}
+    return snapshot
@@ -0,0 +1,26 @@
+# app/utils/ndjson.py
+
+from typing import AsyncIterable, AsyncIterator, Iterable
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """
+    Split a byte stream (e.g. Request.stream()) into lines without reading it whole.
+    The last line may lack the trailing newline.
+    """
+    tail = b""
+    async for chunk in chunks:
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line
+    if tail:
+        yield tail
+
+
+async def aiter_sync(lines: Iterable) -> AsyncIterator:
+    """
+    Async view of a synchronous iterable (a file opened by a CLI).
+    """
+    for line in lines:
+        yield line
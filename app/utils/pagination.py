@@ -0,0 +1,26 @@
+# app/utils/pagination.py
+
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """
+    Opaque keyset cursor pointing at the last row of a page.
+    """
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Raises:
+        ValueError: If the cursor was not produced by encode_cursor.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
@@ -0,0 +1,241 @@
+# app/utils/pdf.py
+
+"""
+Minimal PDF writer for route exports: text-only A4 pages in the standard
+Helvetica fonts, so no font files or third-party libraries are needed.
+
+Text is laid out here - words are measured with the Helvetica metrics, wrapped
+and paginated - which is the CPU-heavy part of an export; the export workers
+call render_route_pdf in a process pool. The standard fonts only cover
+WinAnsi (cp1252): other characters are written as "?".
+"""
+
+import os
+import zlib
+from typing import List, Optional, Tuple
+
+PAGE_WIDTH, PAGE_HEIGHT = 595.0, 842.0  # A4 in points
+MARGIN = 56.0
+
+# bump whenever the layout changes: it is part of the export artifact key
+TEMPLATE_VERSION = "1"
+
+# what the template shows - and thus all that goes into an artifact's content hash
+ROUTE_KEYS = ("name", "origin", "destination", "duration_days", "budget", "total_cost", "first_date", "last_date")
+DAY_KEYS = ("day_number", "date", "description")
+ACTIVITY_KEYS = ("name", "description", "start_time", "end_time", "location", "cost")
+ROUTE_PDF_FIELDS = frozenset(ROUTE_KEYS) | {"days"}
+
+REGULAR, BOLD = "F1", "F2"
+_FONTS = {REGULAR: "Helvetica", BOLD: "Helvetica-Bold"}
+
+# advance widths (1/1000 em) of Helvetica for ASCII 32..126
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]  # fmt: skip
+_DEFAULT_WIDTH = 556
+# Helvetica-Bold is about 5% wider on average, close enough for wrapping
+_BOLD_FACTOR = 1.05
+
+
+def text_width(text: str, size: float, font: str = REGULAR) -> float:
+    units = 0
+    for char in text:
+        code = ord(char)
+        units += _HELVETICA_WIDTHS[code - 32] if 32 <= code <= 126 else _DEFAULT_WIDTH
+    width = units * size / 1000
+    return width * _BOLD_FACTOR if font == BOLD else width
+
+
+def wrap(text: str, size: float, width: float, font: str = REGULAR) -> List[str]:
+    """
+    Split text into lines no wider than `width`; words longer than a line are cut.
+    """
+    lines = []
+    for paragraph in text.splitlines() or [""]:
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}" if line else word
+            if text_width(candidate, size, font) <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            while text_width(word, size, font) > width:
+                cut = len(word) - 1
+                while cut > 1 and text_width(word[:cut], size, font) > width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+            line = word
+        lines.append(line)
+    return lines
+
+
+def _escape(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+class PDFDocument:
+    """
+    Flowing text document: headings and paragraphs are appended top to bottom,
+    a new page is started when the current one is full.
+    """
+
+    def __init__(self, title: str = "", margin: float = MARGIN):
+        self.title = title
+        self.margin = margin
+        self.pages: List[List[Tuple[str, float, float, float, str]]] = []
+        self._y = 0.0
+        self._new_page()
+
+    @property
+    def line_width(self) -> float:
+        return PAGE_WIDTH - 2 * self.margin
+
+    def _new_page(self) -> None:
+        self.pages.append([])
+        self._y = PAGE_HEIGHT - self.margin
+
+    def text(self, text: str, size: float = 10, font: str = REGULAR, indent: float = 0, leading: float = 1.35) -> None:
+        for line in wrap(text, size, self.line_width - indent, font):
+            if self._y - size < self.margin:
+                self._new_page()
+            self._y -= size * leading
+            if line:
+                self.pages[-1].append((font, size, self.margin + indent, self._y, line))
+
+    def heading(self, text: str, size: float = 14) -> None:
+        self.space(size / 2)
+        self.text(text, size=size, font=BOLD)
+
+    def space(self, height: float) -> None:
+        self._y -= height
+
+    def render(self) -> bytes:
+        """
+        Serialize the document; page content streams are Flate-compressed.
+        """
+        objects: List[bytes] = []
+        fonts = []
+        for name, base_font in _FONTS.items():
+            font = f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} /Encoding /WinAnsiEncoding >>"
+            objects.append(font.encode())
+            fonts.append(f"/{name} {len(objects)} 0 R")
+        resources = f"<< /Font << {' '.join(fonts)} >> >>"
+
+        pages_id = len(objects) + 1
+        objects.append(b"")  # the page tree, filled in once the pages are known
+        page_ids = []
+        for page in self.pages:
+            content = zlib.compress(self._content(page))
+            objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(content), content))
+            objects.append(
+                f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {PAGE_WIDTH:g} {PAGE_HEIGHT:g}] "
+                f"/Resources {resources} /Contents {len(objects)} 0 R >>".encode()
+            )
+            page_ids.append(len(objects))
+        kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+        objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+        objects.append(b"<< /Title (%s) /Producer (travel-ai-backend) >>" % _escape(self.title))
+        info_id = len(objects)
+        objects.append(f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode())
+        catalog_id = len(objects)
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            len(objects) + 1,
+            catalog_id,
+            info_id,
+            xref,
+        )
+        return bytes(out)
+
+    @staticmethod
+    def _content(page) -> bytes:
+        ops = [b"BT"]
+        for font, size, x, y, line in page:
+            ops.append(b"/%s %g Tf 1 0 0 1 %.2f %.2f Tm (%s) Tj" % (font.encode(), size, x, y, _escape(line)))
+        ops.append(b"ET")
+        return b"\n".join(ops)
+
+
+def _money(value: Optional[float]) -> str:
+    return f"{value:,.2f}" if value is not None else "-"
+
+
+def route_content(route: dict) -> dict:
+    """
+    The part of a RouteRead-shaped dict the template renders, in a fixed key order.
+    """
+    return {
+        **{key: route.get(key) for key in ROUTE_KEYS},
+        "days": [
+            {
+                **{key: day.get(key) for key in DAY_KEYS},
+                "activities": [{key: a.get(key) for key in ACTIVITY_KEYS} for a in day.get("activities") or []],
+            }
+            for day in route.get("days") or []
+        ],
+    }
+
+
+def route_document(route: dict) -> PDFDocument:
+    """
+    Lay out a RouteRead-shaped dict (see utils.route_json.route_to_dict) as a printable itinerary.
+    """
+    doc = PDFDocument(title=route.get("name") or "Route")
+    doc.text(route.get("name") or "Route", size=20, font=BOLD)
+    doc.text(f"{route.get('origin')} - {route.get('destination')}", size=12)
+    summary = [f"{route.get('duration_days')} days", f"budget {_money(route.get('budget'))}"]
+    if route.get("total_cost") is not None:
+        summary.append(f"planned cost {_money(route['total_cost'])}")
+    if route.get("first_date"):
+        summary.append(f"{route['first_date']} - {route.get('last_date') or route['first_date']}")
+    doc.text(" | ".join(summary), size=10)
+
+    for day in route.get("days") or []:
+        title = f"Day {day.get('day_number')}"
+        if day.get("date"):
+            title += f" – {day['date']}"
+        doc.heading(title)
+        if day.get("description"):
+            doc.text(day["description"], size=10)
+        for activity in day.get("activities") or []:
+            doc.space(4)
+            times = "-".join(str(t)[:5] for t in (activity.get("start_time"), activity.get("end_time")) if t)
+            line = f"{times}  {activity.get('name')}" if times else str(activity.get("name"))
+            if activity.get("cost"):
+                line += f"  ({_money(activity['cost'])})"
+            doc.text(line, size=11, font=BOLD, indent=12)
+            for detail in (activity.get("location"), activity.get("description")):
+                if detail:
+                    doc.text(detail, size=9, indent=24)
+    return doc
+
+
+def render_route_pdf(route: dict, path: str) -> int:
+    """
+    Render the route to a PDF file at `path` and return its size.
+    The file is written under a temporary name and renamed, so it never exists half-written.
+    Runs in a worker process: takes and returns only picklable values.
+    """
+    data = route_document(route).render()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
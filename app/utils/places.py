@@ -0,0 +1,144 @@
+# app/utils/places.py
+
+import json
+import logging
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Optional
+
+from utils.config import settings
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_ALIASES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "place_aliases.json")
+
+_SEPARATORS = re.compile(r"[\s\-_.,'’`/]+")
+
+
+def simplify(name: str) -> str:
+    """
+    Lowercase and collapse whitespace - how unknown places are stored.
+    """
+    return " ".join(name.split()).lower()
+
+
+def fold(name: str) -> str:
+    """
+    Aggressive matching form: case-folded, without diacritics and punctuation.
+    """
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _SEPARATORS.sub(" ", stripped).strip()
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class PlaceIndex:
+    """
+    In-memory gazetteer mapping place names and their aliases to a canonical name.
+
+    Exact aliases are resolved through a hash map of folded names; anything else
+    is matched against a trigram index (catches typos and transliteration variants)
+    and accepted above `fuzzy_threshold` Jaccard similarity. Different places are
+    often spelled alike, so the threshold is high and fuzzy matching can be turned
+    off per call. Unknown names are returned simplified, never dropped.
+    """
+
+    def __init__(self, aliases: dict[str, list[str]], fuzzy_threshold: float = 0.85, min_fuzzy_length: int = 4):
+        """
+        :param aliases: canonical name -> list of aliases
+        :param fuzzy_threshold: minimal trigram similarity of a fuzzy match
+        :param min_fuzzy_length: shorter names are matched exactly only
+        """
+        self.fuzzy_threshold = fuzzy_threshold
+        self.min_fuzzy_length = min_fuzzy_length
+        self._exact: dict[str, str] = {}
+        self._grams: dict[str, set[int]] = defaultdict(set)
+        self._names: list[tuple[str, int, str]] = []  # (folded name, trigram count, canonical)
+        for canonical, names in aliases.items():
+            canonical = simplify(canonical)
+            for name in (canonical, *names):
+                folded = fold(name)
+                if not folded:
+                    continue
+                self._exact.setdefault(folded, canonical)
+                grams = trigrams(folded)
+                for gram in grams:
+                    self._grams[gram].add(len(self._names))
+                self._names.append((folded, len(grams), canonical))
+        self.stats_counter = Counter()
+        self._memo = lru_cache(maxsize=4096)(self._canonicalize)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "PlaceIndex":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def _fuzzy(self, folded: str) -> Optional[str]:
+        grams = trigrams(folded)
+        shared = Counter()
+        for gram in grams:
+            for idx in self._grams.get(gram, ()):
+                shared[idx] += 1
+        best, best_score = None, 0.0
+        for idx, common in shared.items():
+            _, count, canonical = self._names[idx]
+            score = common / (len(grams) + count - common)
+            if score > best_score:
+                best, best_score = canonical, score
+        return best if best_score >= self.fuzzy_threshold else None
+
+    def canonicalize(self, name: str, fuzzy: bool = True) -> str:
+        """
+        Canonical name of a place; `fuzzy=False` resolves exact names and aliases only.
+        """
+        return self._memo(name, fuzzy)
+
+    def _canonicalize(self, name: str, fuzzy: bool) -> str:
+        folded = fold(name)
+        canonical = self._exact.get(folded)
+        if canonical is not None:
+            self.stats_counter["alias" if canonical != simplify(name) else "exact"] += 1
+            return canonical
+        if fuzzy and len(folded) >= self.min_fuzzy_length:
+            canonical = self._fuzzy(folded)
+            if canonical is not None:
+                logger.debug("Places: fuzzy match %r -> %r", name, canonical)
+                self.stats_counter["fuzzy"] += 1
+                return canonical
+        self.stats_counter["unknown"] += 1
+        return simplify(name)
+
+    def stats(self) -> dict:
+        info = self._memo.cache_info()
+        return {
+            "places": len(set(self._exact.values())),
+            "aliases": len(self._exact),
+            **{kind: self.stats_counter[kind] for kind in ("exact", "alias", "fuzzy", "unknown")},
+            "memo_hits": info.hits,
+        }
+
+
+_place_index: Optional[PlaceIndex] = None
+
+
+def get_place_index() -> PlaceIndex:
+    """
+    Process-wide index, loaded from PLACE_ALIASES_PATH (or the bundled dataset) on first use.
+    """
+    global _place_index
+    if _place_index is None:
+        path = settings.PLACE_ALIASES_PATH or BUNDLED_ALIASES
+        _place_index = PlaceIndex.from_file(path, fuzzy_threshold=settings.PLACE_FUZZY_THRESHOLD)
+        logger.info("Places: loaded %s aliases from %s", len(_place_index._exact), path)
+    return _place_index
+
+
+register_metrics("places", lambda: get_place_index().stats())
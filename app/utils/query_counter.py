@@ -0,0 +1,41 @@
+# app/utils/query_counter.py
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCount:
+    """Number of SQL statements executed within a counting scope (nested scopes count towards outer ones)."""
+
+    def __init__(self, parent: Optional["QueryCount"] = None):
+        self.value = 0
+        self.parent = parent
+
+
+# a mutable holder, so statements executed in child tasks are counted too
+_current: ContextVar[Optional[QueryCount]] = ContextVar("query_count", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    while counter is not None:
+        counter.value += 1
+        counter = counter.parent
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCount]:
+    """
+    Count statements sent to any engine by the current task (and tasks it starts) inside the block.
+    """
+    counter = QueryCount(parent=_current.get())
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
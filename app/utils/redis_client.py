@@ -0,0 +1,33 @@
+# app/utils/redis_client.py
+
+import logging
+
+from utils.config import settings
+
+try:
+    from redis import asyncio as redis_asyncio
+except ImportError:  # redis is optional: without it every Redis-backed feature degrades to in-process only
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def get_redis():
+    """
+    Return the shared asyncio Redis client, or None if Redis is disabled or not installed.
+    The connection is opened lazily on the first command.
+    """
+    global _client
+    if not settings.REDIS_ENABLED or redis_asyncio is None:
+        return None
+    if _client is None:
+        logger.info("Redis: creating client for %s", settings.REDIS_URL)
+        _client = redis_asyncio.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=settings.REDIS_TIMEOUT,
+            socket_timeout=settings.REDIS_TIMEOUT,
+        )
+    return _client
@@ -0,0 +1,86 @@
+# app/utils/route_json.py
+
+"""
+Fast JSON rendering of RouteRead straight from loaded ORM objects.
+
+The response_model path validates the whole graph into RouteRead models
+(from_attributes) and dumps it again; for long itineraries that is most of the
+request CPU. Here the loaded ORM attributes are copied into plain dicts - field
+lists are taken from the schemas, so the output stays identical to RouteRead -
+and pydantic_core.to_json encodes them in one pass.
+"""
+
+from typing import Iterable, Optional
+
+from fastapi.responses import Response
+from pydantic_core import to_json
+
+from models import Route
+from schemas.export import ExportRead
+from schemas.route import ActivityRead, RouteDayRead, RouteRead
+from schemas.route_access import RouteAccessRead
+
+_ACTIVITY_FIELDS = tuple(ActivityRead.model_fields)
+_DAY_FIELDS = tuple(name for name in RouteDayRead.model_fields if name != "activities")
+_ACCESS_FIELDS = tuple(RouteAccessRead.model_fields)
+_EXPORT_FIELDS = tuple(ExportRead.model_fields)
+_NESTED_FIELDS = ("days", "access_list", "exports")
+_ROUTE_FIELDS = tuple(name for name in RouteRead.model_fields if name not in _NESTED_FIELDS)
+ROUTE_READ_FIELDS = frozenset(RouteRead.model_fields)
+
+
+def _row(obj, fields: tuple) -> dict:
+    # loaded column values live in the instance __dict__, reading it skips the ORM descriptors
+    state = obj.__dict__
+    try:
+        return {name: state[name] for name in fields}
+    except KeyError:  # expired or deferred attribute: let the ORM load it
+        return {name: getattr(obj, name) for name in fields}
+
+
+def parse_fields(raw: Optional[str]) -> Optional[frozenset[str]]:
+    """
+    Parse a comma-separated list of RouteRead fields, None means all of them.
+    Raises:
+        ValueError: If a field is not a RouteRead field.
+    """
+    if raw is None:
+        return None
+    fields = frozenset(name.strip() for name in raw.split(",") if name.strip())
+    unknown = fields - ROUTE_READ_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+
+def route_to_dict(route: Route, fields: Optional[frozenset[str]] = None) -> dict:
+    """
+    RouteRead-shaped dict of a route loaded with the "full" profile,
+    restricted to `fields` (in RouteRead order) if given.
+    """
+    if fields is None:
+        data = _row(route, _ROUTE_FIELDS)
+    else:
+        data = _row(route, tuple(name for name in _ROUTE_FIELDS if name in fields))
+    if fields is None or "days" in fields:
+        data["days"] = [
+            {**_row(day, _DAY_FIELDS), "activities": [_row(activity, _ACTIVITY_FIELDS) for activity in day.activities]}
+            for day in route.days
+        ]
+    if fields is None or "access_list" in fields:
+        data["access_list"] = [_row(access, _ACCESS_FIELDS) for access in route.access_list]
+    if fields is None or "exports" in fields:
+        data["exports"] = [_row(export, _EXPORT_FIELDS) for export in route.exports]
+    return data
+
+
+class RouteJSONResponse(Response):
+    media_type = "application/json"
+
+
+def route_response(route: Route, fields: Optional[frozenset[str]] = None) -> RouteJSONResponse:
+    return RouteJSONResponse(to_json(route_to_dict(route, fields)))
+
+
+def routes_response(routes: Iterable[Route], fields: Optional[frozenset[str]] = None) -> RouteJSONResponse:
+    return RouteJSONResponse(to_json([route_to_dict(route, fields) for route in routes]))
@@ -1,14 +1,37 @@
 # app/core/security.py
 
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import threading
 import time
-from datetime import datetime, timedelta
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
 from jose import jwt, JWTError
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError
 from passlib.context import CryptContext
 
+from exceptions.user import PasswordHasherBusyError
+from schemas.token import TokenPayload
+from utils.cache import TTLCache
 from utils.config import settings
+from utils.metrics import register_metrics
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# hashes with fewer rounds than configured are flagged by needs_update and upgraded on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
 
 
 def hash_password(plain: str) -> str:
@@ -19,19 +42,213 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop in a dedicated, size-limited thread pool
+    (bcrypt releases the GIL, so hashes really run in parallel with request handling).
+
+    At most `workers` hashes run and `max_queue` more wait; beyond that the call
+    fails fast with PasswordHasherBusyError instead of piling up latency for everyone.
+    """
+
+    def __init__(self, context: CryptContext, workers: int, max_queue: int, rehash: bool = True):
+        self.context = context
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rehash = rehash
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # hashes submitted to the executor and not done yet; decremented from the executor's thread
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hasher")
+        return self._executor
+
+    def _done(self, _future) -> None:
+        # the executor is done with the hash - a caller that stopped waiting doesn't free its slot earlier
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            busy = self._pending >= self.workers + self.max_queue
+            if not busy:
+                self._pending += 1
+        if busy:
+            self.rejected += 1
+            logger.warning("Password hasher: %s hashes in flight, rejecting", self._pending)
+            raise PasswordHasherBusyError()
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        # cancelling the caller cancels a hash that is still queued, a running one completes
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, plain: str) -> str:
+        return await self._run(self.context.hash, plain)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(self.context.verify, plain, hashed)
+
+    async def verify_and_update(self, plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and, if its hash uses outdated parameters, return a new hash to store.
+        """
+        if not self.rehash:
+            return await self.verify(plain, hashed), None
+        ok, new_hash = await self._run(self.context.verify_and_update, plain, hashed)
+        if new_hash:
+            self.rehashed += 1
+        return ok, new_hash
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+        }
+
+
+password_hasher = PasswordHasher(
+    pwd_context,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE,
+    rehash=settings.PASSWORD_REHASH_ON_LOGIN,
+)
+register_metrics("password_hasher", password_hasher.stats)
+
+
+class JoseJWTBackend:
+    """
+    python-jose: every algorithm, full claim validation.
+    """
+
+    def __init__(self, secret: str, algorithm: str):
+        self.secret = secret
+        self.algorithm = algorithm
+
+    def encode(self, claims: dict) -> str:
+        return jwt.encode(claims, self.secret, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        return jwt.decode(token, self.secret, algorithms=[self.algorithm])
+
+
+class HMACJWTBackend:
+    """
+    Lean HS256/384/512 implementation on hashlib/hmac: checks the header algorithm,
+    the signature (constant-time) and the exp/nbf claims - all our tokens carry.
+    Raises the same jose exceptions, so both backends are interchangeable.
+    """
+
+    _DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+    def __init__(self, secret: str, algorithm: str):
+        if algorithm not in self._DIGESTS:
+            raise ValueError(f"HMAC JWT backend doesn't support {algorithm}")
+        self.secret = secret.encode("utf-8")
+        self.algorithm = algorithm
+        self.digest = self._DIGESTS[algorithm]
+        self._header = self._b64encode(json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":")).encode())
+
+    @staticmethod
+    def _b64encode(data: bytes) -> bytes:
+        return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+    @staticmethod
+    def _b64decode(data: bytes) -> bytes:
+        return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return hmac.new(self.secret, signing_input, self.digest).digest()
+
+    def encode(self, claims: dict) -> str:
+        payload = self._b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = self._header + b"." + payload
+        return (signing_input + b"." + self._b64encode(self._sign(signing_input))).decode("ascii")
+
+    def decode(self, token: str) -> dict:
+        try:
+            signing_input, _, signature = token.encode("ascii").rpartition(b".")
+            header_segment, _, payload_segment = signing_input.partition(b".")
+            header = json.loads(self._b64decode(header_segment))
+            signature = self._b64decode(signature)
+        except (ValueError, TypeError, binascii.Error):
+            raise JWTError("Invalid token")
+        if not payload_segment or not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise JWTError("Invalid token header")
+        if not hmac.compare_digest(signature, self._sign(signing_input)):
+            raise JWTError("Signature verification failed")
+        try:
+            claims = json.loads(self._b64decode(payload_segment))
+        except (ValueError, binascii.Error):
+            raise JWTError("Invalid payload")
+        if not isinstance(claims, dict):
+            raise JWTError("Invalid payload")
+        now = time.time()
+        if "exp" in claims:
+            if not isinstance(claims["exp"], int):
+                raise JWTClaimsError("Expiration Time claim (exp) must be an integer.")
+            if claims["exp"] < now:
+                raise ExpiredSignatureError("Signature has expired.")
+        if "nbf" in claims:
+            if not isinstance(claims["nbf"], int):
+                raise JWTClaimsError("Not Before claim (nbf) must be an integer.")
+            if claims["nbf"] > now:
+                raise JWTClaimsError("The token is not yet valid (nbf)")
+        return claims
+
+
+JWT_BACKENDS = {"jose": JoseJWTBackend, "hmac": HMACJWTBackend}
+jwt_backend = JWT_BACKENDS[settings.JWT_BACKEND](settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+
+# verified tokens by digest, each kept until its exp
+verified_tokens: TTLCache[TokenPayload] = TTLCache(maxsize=settings.JWT_CACHE_SIZE, ttl=0)
+register_metrics("jwt", lambda: {"backend": settings.JWT_BACKEND, "cache": verified_tokens.stats()})
+
+
 def create_access_token(subject: str, telegram: bool = False) -> str:
-    expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     payload = {
         "sub": str(subject),
         "telegram": telegram,
-        "exp": expire,
+        "exp": int(time.time()) + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
     }
-    encoded_jwt = jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    return encoded_jwt
+    return jwt_backend.encode(payload)
 
 
 def decode_access_token(token: str) -> dict:
-    try:
-        return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-    except JWTError as e:
-        raise
+    """
+    Raises:
+        JWTError: If the token is malformed, has a wrong signature or is expired.
+    """
+    return jwt_backend.decode(token)
+
+
+def verify_access_token(token: str) -> TokenPayload:
+    """
+    Decode and validate a token; a token that was already verified is served
+    from the cache until it expires.
+    Raises:
+        JWTError: If the token is malformed, has a wrong signature or is expired.
+        pydantic.ValidationError: If the claims are not a TokenPayload.
+    """
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    payload = verified_tokens.get(key)
+    if payload is None:
+        payload = TokenPayload(**decode_access_token(token))
+        verified_tokens.set(key, payload, ttl=payload.exp - time.time())
+    return payload
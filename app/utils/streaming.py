@@ -0,0 +1,30 @@
+# app/utils/streaming.py
+
+import asyncio
+import zlib
+from typing import AsyncIterable, AsyncIterator, BinaryIO
+
+
+async def gzip_stream(chunks: AsyncIterable[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """
+    Gzip a byte stream on the fly: every chunk is compressed and flushed as it comes,
+    so the client receives data as soon as it is produced.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 16+15: gzip header and trailer
+    async for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def file_stream(file: BinaryIO, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """
+    Read an open file in chunks off the event loop and close it at the end.
+    The file is already open, so it is sent in full even if its path is removed meanwhile.
+    """
+    try:
+        while chunk := await asyncio.to_thread(file.read, chunk_size):
+            yield chunk
+    finally:
+        file.close()